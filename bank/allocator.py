@@ -0,0 +1,87 @@
+import json
+import os
+import random
+
+
+class AccountNumberAllocator:
+    """Asigna números de cuenta únicos y no secuenciales en O(1).
+
+    Recorre el espacio de números con un contador y lo pasa por una
+    permutación con clave (red de Feistel + cycle-walking), de modo que
+    nunca repite un número y no necesita consultar las cuentas existentes.
+    """
+
+    RONDAS = 4
+
+    def __init__(self, ancho: int = 6, clave: int = None, posicion: int = 0):
+        if ancho < 1:
+            raise ValueError("El ancho del número de cuenta debe ser al menos 1.")
+        self.ancho = ancho
+        self.minimo = 10 ** (ancho - 1) if ancho > 1 else 0
+        self.capacidad = 10 ** ancho - self.minimo
+        self.clave = clave if clave is not None else random.getrandbits(64)
+        if not 0 <= posicion <= self.capacidad:
+            raise ValueError("Posición fuera del espacio de números.")
+        self.posicion = posicion
+
+        # Mitades de la red de Feistel: 2^(2*bits) >= capacidad
+        bits = 1
+        while 1 << (2 * bits) < self.capacidad:
+            bits += 1
+        self._bits = bits
+        self._mascara = (1 << bits) - 1
+        self._subclaves = [
+            (self.clave >> (16 * i)) & 0xFFFF | (i + 1) << 16 for i in range(self.RONDAS)
+        ]
+
+    def _ronda(self, x: int, subclave: int) -> int:
+        x = ((x ^ subclave) * 0x9E3779B1) & 0xFFFFFFFF
+        return (x ^ (x >> 15)) & self._mascara
+
+    def _feistel(self, x: int) -> int:
+        izq, der = x >> self._bits, x & self._mascara
+        for subclave in self._subclaves:
+            izq, der = der, izq ^ self._ronda(der, subclave)
+        return (izq << self._bits) | der
+
+    def _permutar(self, indice: int) -> int:
+        # cycle-walking: se reaplica hasta caer dentro del espacio válido
+        valor = self._feistel(indice)
+        while valor >= self.capacidad:
+            valor = self._feistel(valor)
+        return valor
+
+    @property
+    def disponibles(self) -> int:
+        return self.capacidad - self.posicion
+
+    def agotado(self) -> bool:
+        return self.posicion >= self.capacidad
+
+    def siguiente(self) -> int:
+        if self.agotado():
+            raise ValueError("No quedan números de cuenta disponibles.")
+        numero = self.minimo + self._permutar(self.posicion)
+        self.posicion += 1
+        return numero
+
+    # ---- Persistencia ----
+    def estado(self) -> dict:
+        return {"ancho": self.ancho, "clave": self.clave, "posicion": self.posicion}
+
+    @classmethod
+    def desde_estado(cls, estado: dict):
+        return cls(estado["ancho"], estado["clave"], estado["posicion"])
+
+    def guardar(self, ruta: str):
+        temporal = ruta + ".tmp"
+        with open(temporal, "w", encoding="utf-8") as f:
+            json.dump(self.estado(), f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporal, ruta)
+
+    @classmethod
+    def cargar(cls, ruta: str):
+        with open(ruta, encoding="utf-8") as f:
+            return cls.desde_estado(json.load(f))
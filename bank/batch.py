@@ -0,0 +1,127 @@
+try:
+    import numpy as np
+except ImportError:  # numpy es opcional: sin él se valida con dicts de Python
+    np = None
+
+from bank.money import MAXIMO
+
+LOTE_RECHAZADO = "No aplicado: el lote fue rechazado."
+_ERRORES = (
+    None,
+    "El monto debe ser mayor a cero.",
+    "No se puede transferir a la misma cuenta.",
+    "Cuenta inexistente.",
+    "Saldo insuficiente.",
+    "Monto inválido.",
+    "Monto fuera de rango.",
+    "Saldo fuera de rango.",
+)
+# Con saldos y montos por debajo de este margen el neteo en int64 no puede desbordar
+_MARGEN_NUMPY = 2**62
+
+
+def validar_lote(origenes, destinos, montos, saldos):
+    """Valida un lote de transferencias en una sola pasada.
+
+    `origenes`, `destinos` y `montos` (centavos) son secuencias paralelas;
+    `saldos` mapea número de cuenta -> saldo en centavos de las cuentas
+    existentes. Cada monto debe ser un entero en (0, MAXIMO]. Los fondos y
+    los saldos resultantes se controlan después de netear todo el lote por
+    cuenta. Devuelve (errores, netos): un mensaje o None por transferencia y
+    la variación neta de saldo de cada cuenta.
+    """
+    if np is not None and len(montos) and saldos:
+        resultado = _validar_numpy(origenes, destinos, montos, saldos)
+        if resultado is not None:
+            return resultado
+    return _validar_python(origenes, destinos, montos, saldos)
+
+
+def _validar_numpy(origenes, destinos, montos, saldos):
+    # None: el lote no entra en int64 sin riesgo (montos no enteros o enormes) y se valida en Python
+    m = np.asarray(montos)
+    if m.dtype.kind != "i":
+        return None
+    saldo = np.fromiter(saldos.values(), dtype=np.int64, count=len(saldos))
+    if float(np.abs(m).sum(dtype=np.float64)) + float(np.abs(saldo).max()) >= _MARGEN_NUMPY:
+        return None
+    m = m.astype(np.int64, copy=False)
+    o = np.asarray(origenes, dtype=np.int64)
+    d = np.asarray(destinos, dtype=np.int64)
+    numeros = np.fromiter(saldos.keys(), dtype=np.int64, count=len(saldos))
+    orden = np.argsort(numeros)
+    numeros, saldo = numeros[orden], saldo[orden]
+
+    # Posición densa de cada cuenta para netear con índices enteros
+    ultimo = max(len(numeros) - 1, 0)
+    io = np.minimum(np.searchsorted(numeros, o), ultimo)
+    id_ = np.minimum(np.searchsorted(numeros, d), ultimo)
+    existen = (numeros[io] == o) & (numeros[id_] == d)
+
+    codigos = np.zeros(len(m), dtype=np.int8)
+    codigos[~existen] = 3
+    codigos[o == d] = 2
+    codigos[m <= 0] = 1
+
+    validas = codigos == 0
+    neto = np.zeros(len(numeros), dtype=np.int64)
+    np.add.at(neto, id_[validas], m[validas])
+    np.subtract.at(neto, io[validas], m[validas])
+    deficit = saldo + neto < 0
+    codigos[validas & deficit[io]] = 4
+
+    errores = [_ERRORES[c] for c in codigos.tolist()] if codigos.any() else [None] * len(m)
+    netos = {int(n): int(v) for n, v in zip(numeros[neto != 0], neto[neto != 0])}
+    return errores, netos
+
+
+def _validar_python(origenes, destinos, montos, saldos):
+    errores = [None] * len(montos)
+    netos = {}
+    for k, (o, d, m) in enumerate(zip(origenes, destinos, montos)):
+        if not isinstance(m, int) or isinstance(m, bool):
+            errores[k] = _ERRORES[5]
+        elif m <= 0:
+            errores[k] = _ERRORES[1]
+        elif m > MAXIMO:
+            errores[k] = _ERRORES[6]
+        elif o == d:
+            errores[k] = _ERRORES[2]
+        elif o not in saldos or d not in saldos:
+            errores[k] = _ERRORES[3]
+        else:
+            netos[o] = netos.get(o, 0) - m
+            netos[d] = netos.get(d, 0) + m
+    sin_fondos = {n for n, v in netos.items() if saldos[n] + v < 0}
+    excedidas = {n for n, v in netos.items() if saldos[n] + v > MAXIMO}
+    if sin_fondos or excedidas:
+        for k, (o, d) in enumerate(zip(origenes, destinos)):
+            if errores[k] is None and o in sin_fondos:
+                errores[k] = _ERRORES[4]
+            elif errores[k] is None and d in excedidas:
+                errores[k] = _ERRORES[7]
+    return errores, {n: v for n, v in netos.items() if v}
+
+
+def repartir_filas(cuentas, origenes, destinos, primera):
+    """Agrega a cada cuenta los índices de sus filas en un lote recién escrito en el libro."""
+    n = len(origenes)
+    if np is None or n < 64:
+        fila = primera
+        for origen, destino in zip(origenes, destinos):
+            cuentas[origen].movimientos.append(fila)
+            cuentas[destino].movimientos.append(fila + 1)
+            fila += 2
+        return
+    numeros = np.empty(2 * n, dtype=np.int64)
+    numeros[0::2] = origenes
+    numeros[1::2] = destinos
+    # Orden estable: dentro de cada cuenta las filas quedan en orden de escritura
+    orden = np.argsort(numeros, kind="stable")
+    filas = (orden + primera).astype(np.uint64)
+    numeros = numeros[orden]
+    cortes = np.flatnonzero(numeros[1:] != numeros[:-1]) + 1
+    inicios = np.concatenate(([0], cortes))
+    finales = np.concatenate((cortes, [2 * n]))
+    for numero, inicio, fin in zip(numeros[inicios].tolist(), inicios.tolist(), finales.tolist()):
+        cuentas[numero].movimientos.frombytes(filas[inicio:fin].tobytes())
@@ -0,0 +1,100 @@
+"""Cierre diario: intereses y comisiones de mantenimiento de todas las cuentas en una pasada.
+
+Los saldos se leen a un array, las reglas se aplican vectorizadas (numpy si
+está disponible) y el resultado vuelve al libro mayor como un lote de
+movimientos por tipo. Ver BankManager.cerrar_dia.
+"""
+from array import array
+
+try:
+    import numpy as np
+except ImportError:  # numpy es opcional: sin él se calcula cuenta por cuenta
+    np = None
+
+from bank.money import formatear
+
+# Puntos básicos en una unidad (100 % = 10000 pb)
+PUNTOS_BASICOS = 10_000
+
+
+class ReglasCierre:
+    """Reglas del cierre diario; todos los importes en centavos.
+
+    Interés: saldo * tasa_anual_pb / (10000 * dias_anio), redondeado hacia
+    abajo, para saldos >= minimo_interes. Comisión: `comision` fija a las
+    cuentas cuyo saldo (ya con el interés) queda por debajo de
+    exento_comision (a todas si es None); nunca deja el saldo negativo.
+    """
+
+    def __init__(self, tasa_anual_pb: int = 0, dias_anio: int = 365, minimo_interes: int = 0,
+                 comision: int = 0, exento_comision: int = None):
+        if tasa_anual_pb < 0 or comision < 0 or dias_anio <= 0:
+            raise ValueError("Reglas de cierre inválidas.")
+        self.tasa_anual_pb = tasa_anual_pb
+        self.dias_anio = dias_anio
+        self.minimo_interes = max(minimo_interes, 1)
+        self.comision = comision
+        self.exento_comision = exento_comision
+
+    def calcular(self, saldos):
+        """Intereses y comisiones para `saldos` (secuencia de centavos).
+
+        Devuelve ((posiciones, montos), (posiciones, montos)): las posiciones
+        (list) de las cuentas con interés o comisión distinta de cero y los
+        importes (array "q"), en el orden de `saldos`.
+        """
+        if np is not None and len(saldos):
+            return self._calcular_numpy(np.frombuffer(array("q", saldos), dtype=np.int64))
+        return self._calcular_python(saldos)
+
+    def _calcular_numpy(self, saldos):
+        divisor = PUNTOS_BASICOS * self.dias_anio
+        # Cociente y resto por separado: saldo * tasa no desborda int64
+        intereses = (saldos // divisor) * self.tasa_anual_pb + (saldos % divisor) * self.tasa_anual_pb // divisor
+        intereses[saldos < self.minimo_interes] = 0
+        disponibles = saldos + intereses
+        comisiones = np.minimum(self.comision, np.maximum(disponibles, 0))
+        if self.exento_comision is not None:
+            comisiones[disponibles >= self.exento_comision] = 0
+        return _no_nulos(intereses), _no_nulos(comisiones)
+
+    def _calcular_python(self, saldos):
+        divisor = PUNTOS_BASICOS * self.dias_anio
+        intereses, comisiones = ([], array("q")), ([], array("q"))
+        for k, saldo in enumerate(saldos):
+            interes = saldo * self.tasa_anual_pb // divisor if saldo >= self.minimo_interes else 0
+            if interes:
+                intereses[0].append(k)
+                intereses[1].append(interes)
+            disponible = saldo + interes
+            if self.exento_comision is None or disponible < self.exento_comision:
+                comision = min(self.comision, max(disponible, 0))
+                if comision:
+                    comisiones[0].append(k)
+                    comisiones[1].append(comision)
+        return intereses, comisiones
+
+
+def _no_nulos(importes):
+    posiciones = np.flatnonzero(importes)
+    return posiciones.tolist(), array("q", importes[posiciones].tobytes())
+
+
+class Cierre:
+    """Resultado de un cierre diario: importes aplicados y rendimiento."""
+
+    def __init__(self, cuentas, intereses, comisiones, movimientos, segundos):
+        self.cuentas = cuentas
+        self.intereses = intereses  # total acreditado (centavos)
+        self.comisiones = comisiones  # total debitado (centavos)
+        self.movimientos = movimientos
+        self.segundos = segundos
+
+    @property
+    def cuentas_por_segundo(self) -> float:
+        return self.cuentas / self.segundos if self.segundos else 0.0
+
+    def __str__(self):
+        return (f"Cierre: {self.cuentas} cuentas en {self.segundos:.2f} s "
+                f"({self.cuentas_por_segundo / 1e6:.2f} M cuentas/s), {self.movimientos} movimientos; "
+                f"intereses {formatear(self.intereses)}, comisiones {formatear(self.comisiones)}")
@@ -0,0 +1,100 @@
+import atexit
+import json
+import os
+import threading
+
+
+class Journal:
+    """Journal append-only con group commit.
+
+    Cada operación agrega un registro compacto (una línea JSON) a un buffer
+    en memoria. El buffer se vuelca con un único fsync cuando junta `lote`
+    registros o cada `intervalo` segundos, lo que ocurra primero.
+    """
+
+    def __init__(self, ruta: str, intervalo: float = 0.05, lote: int = 256):
+        self.ruta = ruta
+        self.intervalo = intervalo
+        self.lote = lote
+        self._archivo = open(ruta, "ab")
+        self._pendientes = []
+        self._cond = threading.Condition()
+        self._io = threading.Lock()
+        self._cerrado = False
+        self._hilo = threading.Thread(target=self._volcar_periodicamente, daemon=True)
+        self._hilo.start()
+        atexit.register(self.cerrar)
+
+    def escribir(self, *registro):
+        linea = json.dumps(registro, ensure_ascii=False, separators=(",", ":")) + "\n"
+        with self._cond:
+            if self._cerrado:
+                raise ValueError("El journal está cerrado.")
+            self._pendientes.append(linea.encode("utf-8"))
+            lleno = len(self._pendientes) >= self.lote
+        if lleno:
+            self.sincronizar()
+
+    def sincronizar(self):
+        # El lock de E/S ordena los volcados; los escritores solo esperan
+        # por _cond, así que siguen encolando mientras corre el fsync.
+        with self._io:
+            with self._cond:
+                lote, self._pendientes = self._pendientes, []
+            if lote and not self._archivo.closed:
+                self._archivo.write(b"".join(lote))
+                self._archivo.flush()
+                os.fsync(self._archivo.fileno())
+
+    def _volcar_periodicamente(self):
+        while True:
+            with self._cond:
+                self._cond.wait(self.intervalo)
+                if self._cerrado:
+                    return
+            self.sincronizar()
+
+    def truncar(self, *cabecera):
+        """Vacía el journal dejando solo el registro de cabecera indicado.
+
+        Descarta lo pendiente: quien llama (BankManager.checkpoint) bloquea las
+        escrituras y sincroniza antes, así que no hay registros sin volcar.
+        """
+        with self._io:
+            with self._cond:
+                self._pendientes.clear()
+            self._archivo.truncate(0)
+            self._archivo.seek(0)
+            linea = json.dumps(cabecera, ensure_ascii=False, separators=(",", ":")) + "\n"
+            self._archivo.write(linea.encode("utf-8"))
+            self._archivo.flush()
+            os.fsync(self._archivo.fileno())
+
+    def cerrar(self):
+        with self._cond:
+            if self._cerrado:
+                return
+            self._cerrado = True
+            self._cond.notify_all()
+        self._hilo.join()
+        self.sincronizar()
+        self._archivo.close()
+        atexit.unregister(self.cerrar)
+
+    @staticmethod
+    def leer(ruta: str):
+        """Devuelve (registros, bytes_validos). Ignora una última línea incompleta."""
+        registros = []
+        validos = 0
+        if not os.path.exists(ruta):
+            return registros, validos
+        with open(ruta, "rb") as f:
+            for linea in f:
+                if not linea.endswith(b"\n"):
+                    break
+                try:
+                    registros.append(json.loads(linea))
+                except ValueError:
+                    break
+                validos += len(linea)
+        return registros, validos
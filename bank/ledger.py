@@ -0,0 +1,411 @@
+import itertools
+import threading
+import time
+import weakref
+from array import array
+from bisect import bisect_left
+from datetime import date, datetime
+
+from bank.search import SortedIndex
+
+try:
+    import numpy as np
+except ImportError:  # numpy es opcional: acelera la escritura de lotes
+    np = None
+
+# Códigos de tipo de movimiento
+DEPOSITO = 1
+RETIRO = 2
+TRANSFERENCIA_ENVIADA = 3
+TRANSFERENCIA_RECIBIDA = 4
+INTERES = 5
+COMISION = 6
+
+TIPOS = (DEPOSITO, RETIRO, TRANSFERENCIA_ENVIADA, TRANSFERENCIA_RECIBIDA, INTERES, COMISION)
+# Efecto de cada tipo sobre el saldo de la cuenta, indexado por código
+SIGNOS = [0] * (max(TIPOS) + 1)
+SIGNOS[DEPOSITO] = SIGNOS[TRANSFERENCIA_RECIBIDA] = SIGNOS[INTERES] = 1
+SIGNOS[RETIRO] = SIGNOS[TRANSFERENCIA_ENVIADA] = SIGNOS[COMISION] = -1
+
+FORMATO_FECHA = "%d/%m/%Y %H:%M:%S"
+
+
+def formatear_fecha(ts: float) -> str:
+    return datetime.fromtimestamp(ts).strftime(FORMATO_FECHA)
+
+
+def instante(valor) -> float:
+    """Epoch de un datetime, de un date (a las 0 h, hora local) o de un número."""
+    if isinstance(valor, datetime):
+        return valor.timestamp()
+    if isinstance(valor, date):
+        return datetime(valor.year, valor.month, valor.day).timestamp()
+    return float(valor)
+
+
+def _conjunto_tipos(tipos):
+    if tipos is None:
+        return None
+    return frozenset((tipos,) if isinstance(tipos, int) else tipos)
+
+
+def describir(tipo: int, contraparte=None) -> str:
+    """Texto de un movimiento; la contraparte puede ser una cuenta, su número o su alias."""
+    if tipo == DEPOSITO:
+        return "Depósito"
+    if tipo == RETIRO:
+        return "Retiro"
+    if tipo == INTERES:
+        return "Interés"
+    if tipo == COMISION:
+        return "Comisión de mantenimiento"
+    if isinstance(contraparte, int):
+        alias = f"N° {contraparte}"
+    else:
+        alias = getattr(contraparte, "alias", contraparte)
+    if tipo == TRANSFERENCIA_ENVIADA:
+        return f"Transferencia a {alias}"
+    return f"Transferencia de {alias}"
+
+
+class Ledger:
+    """Libro mayor global en columnas (arrays), con partida doble en transferencias.
+
+    Cada fila es un movimiento sobre una cuenta; los montos van en centavos. Una transferencia escribe
+    dos filas con el mismo id: la salida en el origen y la entrada en el destino.
+    """
+
+    COLUMNAS = (("ids", "Q"), ("numeros", "Q"), ("contrapartes", "Q"),
+                ("tipos", "B"), ("montos", "q"), ("fechas", "d"))
+
+    # Identidades de contenido: no se reusan, a diferencia de id() tras liberar un libro
+    _IDENTIDADES = itertools.count(1)
+
+    def __init__(self, resolver=None):
+        for nombre, codigo in self.COLUMNAS:
+            setattr(self, nombre, array(codigo))
+        self._siguiente_id = 1
+        # True mientras las columnas sean vistas de solo lectura sobre un snapshot
+        self._prestadas = False
+        # Cambia si se reemplazan las columnas: los caches por fila (p. ej. de estados de cuenta) la usan de clave
+        self.identidad = next(self._IDENTIDADES)
+        # Las filas ocupan varias columnas: se agregan bajo un lock corto
+        self._lock = threading.Lock()
+        # resolver(numero) -> Account; se usa solo para mostrar alias de contrapartes
+        self._cuentas = weakref.WeakValueDictionary()
+        self.resolver = resolver or self._cuentas.get
+        # Agregados de todo el libro (bank.stats.Estadisticas); se arman a pedido con vigilar()
+        self.observador = None
+        # Índices de consulta: se ponen al día a pedido, fuera del camino de escritura
+        self._lock_consultas = threading.Lock()
+        self._reiniciar_consultas()
+
+    def __len__(self):
+        return len(self.ids)
+
+    def registrar_cuenta(self, cuenta):
+        # La primera cuenta registrada con un número se queda con él
+        self._cuentas.setdefault(cuenta.numero, cuenta)
+
+    def _agregar(self, id_, numero, contraparte, tipo, monto, fecha):
+        self.ids.append(id_)
+        self.numeros.append(numero)
+        self.contrapartes.append(contraparte)
+        self.tipos.append(tipo)
+        self.montos.append(monto)
+        self.fechas.append(fecha)
+        if self.observador is not None:
+            self.observador.registrar(tipo, monto, fecha)
+        return len(self.ids) - 1
+
+    def vigilar(self, crear):
+        """Devuelve el observador del libro; si no hay, lo arma con crear(libro).
+
+        Se arma bajo el lock de escritura: ninguna fila queda sin contar ni contada dos veces.
+        """
+        with self._lock:
+            if self.observador is None:
+                self.observador = crear(self)
+            return self.observador
+
+    def _nuevo_id(self):
+        id_ = self._siguiente_id
+        self._siguiente_id += 1
+        return id_
+
+    def _propias(self):
+        # Copia al escribir: las vistas sobre el mmap del snapshot se copian
+        # recién cuando llega la primera fila nueva (se llama bajo el lock).
+        if self._prestadas:
+            for nombre, codigo in self.COLUMNAS:
+                columna = array(codigo)
+                columna.frombytes(getattr(self, nombre).cast("B"))
+                setattr(self, nombre, columna)
+            self._prestadas = False
+
+    def _deshacer(self, filas, siguiente_id):
+        # Una escritura que falló a mitad de camino (p. ej. un monto que no es
+        # entero) no deja columnas de distinto largo ni ids consumidos.
+        for nombre, _ in self.COLUMNAS:
+            del getattr(self, nombre)[filas:]
+        self._siguiente_id = siguiente_id
+
+    def movimiento(self, numero, tipo, monto, contraparte=0, fecha=None):
+        """Registra un movimiento de una sola pata y devuelve el índice de la fila."""
+        with self._lock:
+            self._propias()
+            # La hora se toma bajo el lock: las fechas del libro quedan en orden
+            fecha = time.time() if fecha is None else fecha
+            id_ = self._nuevo_id()
+            try:
+                return self._agregar(id_, numero, contraparte, tipo, monto, fecha)
+            except Exception:
+                self._deshacer(len(self.fechas), id_)
+                raise
+
+    def movimientos(self, numeros, tipo, montos, fecha=None):
+        """Agrega un lote de movimientos de una pata del mismo tipo y devuelve la primera fila.
+
+        El movimiento k (de la cuenta numeros[k]) queda en la fila primera + k.
+        """
+        n = len(montos)
+        # Las columnas se arman aparte: si un valor es inválido, el libro no cambia
+        numeros = array("Q", numeros)
+        montos = array("q", montos)
+        with self._lock:
+            self._propias()
+            fecha = time.time() if fecha is None else fecha
+            primera = len(self.ids)
+            id_inicial = self._siguiente_id
+            self._siguiente_id += n
+            self.ids.extend(range(id_inicial, id_inicial + n))
+            self.numeros.extend(numeros)
+            self.contrapartes.frombytes(bytes(8 * n))
+            self.tipos.frombytes(bytes((tipo,)) * n)
+            self.montos.extend(montos)
+            self.fechas.extend(array("d", (fecha,)) * n)
+            if self.observador is not None:
+                self.observador.registrar_lote(tipo, montos, fecha)
+        return primera
+
+    def transferencia(self, origen, destino, monto, fecha=None):
+        """Registra ambas patas de una transferencia; devuelve (fila_origen, fila_destino)."""
+        with self._lock:
+            self._propias()
+            fecha = time.time() if fecha is None else fecha
+            id_ = self._nuevo_id()
+            filas = len(self.fechas)
+            try:
+                salida = self._agregar(id_, origen, destino, TRANSFERENCIA_ENVIADA, monto, fecha)
+                entrada = self._agregar(id_, destino, origen, TRANSFERENCIA_RECIBIDA, monto, fecha)
+            except Exception:
+                self._deshacer(filas, id_)
+                raise
+        return salida, entrada
+
+    def transferencias(self, origenes, destinos, montos, fecha=None):
+        """Agrega un lote de transferencias (dos filas cada una) y devuelve la primera fila.
+
+        La transferencia k ocupa las filas primera + 2k (salida) y primera + 2k + 1 (entrada).
+        """
+        n = len(montos)
+        with self._lock:
+            self._propias()
+            fecha = time.time() if fecha is None else fecha
+            primera = len(self.ids)
+            id_inicial = self._siguiente_id
+            # Las columnas nuevas se arman completas antes de extender ninguna:
+            # si un valor es inválido, el libro queda como estaba.
+            columnas = None
+            if np is not None and n >= 64:
+                columnas = self._columnas_numpy(id_inicial, origenes, destinos, montos, fecha)
+            if columnas is None:
+                columnas = self._columnas_python(id_inicial, origenes, destinos, montos, fecha)
+            for (nombre, _), nueva in zip(self.COLUMNAS, columnas):
+                getattr(self, nombre).frombytes(nueva)
+            self._siguiente_id += n
+            if self.observador is not None:
+                self.observador.registrar_lote(TRANSFERENCIA_ENVIADA, montos, fecha)
+                self.observador.registrar_lote(TRANSFERENCIA_RECIBIDA, montos, fecha)
+        return primera
+
+    def _columnas_python(self, id_inicial, origenes, destinos, montos, fecha):
+        n = len(montos)
+        valores = [0] * (2 * n)
+        valores[0::2] = valores[1::2] = range(id_inicial, id_inicial + n)
+        ids = array("Q", valores)
+        valores[0::2], valores[1::2] = origenes, destinos
+        numeros = array("Q", valores)
+        valores[0::2], valores[1::2] = destinos, origenes
+        contrapartes = array("Q", valores)
+        tipos = array("B", (TRANSFERENCIA_ENVIADA, TRANSFERENCIA_RECIBIDA) * n)
+        valores[0::2] = valores[1::2] = montos
+        columna_montos = array("q", valores)
+        fechas = array("d", (fecha,)) * (2 * n)
+        return [c.tobytes() for c in (ids, numeros, contrapartes, tipos, columna_montos, fechas)]
+
+    def _columnas_numpy(self, id_inicial, origenes, destinos, montos, fecha):
+        n = len(montos)
+        m = np.asarray(montos)
+        if m.dtype.kind != "i":
+            return None  # montos no enteros: array("q") los rechaza en el camino de Python
+        ids = np.repeat(np.arange(id_inicial, id_inicial + n, dtype=np.uint64), 2)
+        pares = np.empty(2 * n, dtype=np.uint64)
+        pares[0::2], pares[1::2] = origenes, destinos
+        numeros = pares.tobytes()
+        pares[0::2], pares[1::2] = destinos, origenes
+        tipos = np.tile(np.array([TRANSFERENCIA_ENVIADA, TRANSFERENCIA_RECIBIDA], dtype=np.uint8), n)
+        return [ids.tobytes(), numeros, pares.tobytes(), tipos.tobytes(),
+                np.repeat(m.astype(np.int64), 2).tobytes(), np.full(2 * n, fecha, dtype=np.float64).tobytes()]
+
+    def fila(self, i):
+        return (self.ids[i], self.numeros[i], self.contrapartes[i],
+                self.tipos[i], self.montos[i], self.fechas[i])
+
+    def descripcion(self, i) -> str:
+        tipo = self.tipos[i]
+        if tipo == DEPOSITO or tipo == RETIRO:
+            return describir(tipo)
+        numero = self.contrapartes[i]
+        return describir(tipo, self.resolver(numero) or numero)
+
+    # ---- Consultas por fecha, tipo y monto ----
+    def _reiniciar_consultas(self):
+        # Filas ya revisadas; mientras las fechas no bajen, el libro mismo es el índice por fecha
+        self._verificadas = 0
+        self._en_orden = True
+        self._por_fecha = None
+        # Tipo -> SortedIndex de sus filas por monto, al día hasta la fila _indexadas
+        self._por_monto = {}
+        self._indexadas = 0
+
+    def _al_dia(self, montos=False) -> int:
+        """Revisa las filas agregadas desde la última consulta; devuelve cuántas filas abarca."""
+        with self._lock:
+            total = len(self.ids)
+        with self._lock_consultas:
+            if self._en_orden and self._verificadas < total:
+                desde = max(self._verificadas - 1, 0)
+                tramo = self.fechas[desde:total]
+                if np is not None and len(tramo) >= 64:
+                    fechas = np.frombuffer(tramo, dtype=np.float64)
+                    self._en_orden = bool(np.all(fechas[1:] >= fechas[:-1]))
+                else:
+                    self._en_orden = all(a <= b for a, b in zip(tramo, tramo[1:]))
+            self._verificadas = total
+            if not self._en_orden:
+                if self._por_fecha is None:
+                    self._por_fecha = SortedIndex(lambda fila: self.fechas[fila], array("Q"))
+                self._por_fecha.actualizar(total)
+            if montos and self._indexadas < total:
+                nuevas = {}
+                tipos = self.tipos
+                for fila in range(self._indexadas, total):
+                    nuevas.setdefault(tipos[fila], []).append(fila)
+                for tipo, filas in nuevas.items():
+                    indice = self._por_monto.get(tipo)
+                    if indice is None:
+                        indice = self._por_monto[tipo] = SortedIndex(lambda fila: self.montos[fila], array("Q"))
+                    indice.agregar(filas)
+                self._indexadas = total
+        return total
+
+    def _tramo_fechas(self, desde, hasta, total):
+        """Filas con fecha en [desde, hasta), en orden cronológico."""
+        if self._en_orden:
+            secuencia, clave, filas = self.fechas, None, None
+        else:
+            secuencia, clave = self._por_fecha.posiciones, self._por_fecha.clave
+            filas = secuencia
+        i = 0 if desde is None else bisect_left(secuencia, instante(desde), 0, total, key=clave)
+        j = total if hasta is None else bisect_left(secuencia, instante(hasta), 0, total, key=clave)
+        j = max(i, j)
+        return range(i, j) if filas is None else filas[i:j]
+
+    def _coincide(self, fila, tipos, minimo, maximo):
+        monto = self.montos[fila]
+        return ((tipos is None or self.tipos[fila] in tipos)
+                and (minimo is None or monto >= minimo)
+                and (maximo is None or monto <= maximo))
+
+    def consultar(self, desde=None, hasta=None, tipos=None, minimo=None, maximo=None):
+        """Genera las filas con fecha en [desde, hasta), tipo en `tipos` y monto en [minimo, maximo].
+
+        Las fechas pueden ser datetime, date o epoch; los montos van en centavos.
+        El tramo de fechas y, si se filtra por tipo o monto, el tramo de montos de
+        cada tipo se ubican por búsqueda binaria y se recorre el más corto: el
+        costo depende del tamaño del resultado, no del largo del libro. Las
+        filas salen en orden cronológico.
+        """
+        tipos = _conjunto_tipos(tipos)
+        por_monto = tipos is not None or minimo is not None or maximo is not None
+        total = self._al_dia(montos=por_monto)
+        tramos = []
+        with self._lock_consultas:
+            filas = self._tramo_fechas(desde, hasta, total)
+            for tipo in (TIPOS if tipos is None else tipos) if por_monto else ():
+                indice = self._por_monto.get(tipo)
+                if indice is not None:
+                    i, j = indice.entre(minimo, maximo)
+                    tramos.append(indice.posiciones[i:j])
+        if por_monto:
+            if sum(map(len, tramos)) < len(filas):
+                yield from self._por_fecha_y_fila(tramos, desde, hasta)
+                return
+        for fila in filas:
+            if not por_monto or self._coincide(fila, tipos, minimo, maximo):
+                yield fila
+
+    def _por_fecha_y_fila(self, tramos, desde, hasta):
+        desde = float("-inf") if desde is None else instante(desde)
+        hasta = float("inf") if hasta is None else instante(hasta)
+        fechas = self.fechas
+        elegidas = [fila for tramo in tramos for fila in tramo if desde <= fechas[fila] < hasta]
+        elegidas.sort(key=lambda fila: (fechas[fila], fila))
+        return elegidas
+
+    def filtrar(self, filas, desde=None, hasta=None, tipos=None, minimo=None, maximo=None):
+        """Como consultar(), pero sobre `filas` (las de una cuenta, en orden de alta).
+
+        El tramo de fechas se ubica por búsqueda binaria y solo se recorre ese tramo.
+        """
+        self._al_dia()
+        clave = self.fechas.__getitem__
+        if not self._en_orden:
+            # Solo si el reloj retrocedió: se ordena el historial de la cuenta
+            filas = sorted(filas, key=lambda fila: (clave(fila), fila))
+        i = 0 if desde is None else bisect_left(filas, instante(desde), key=clave)
+        j = len(filas) if hasta is None else bisect_left(filas, instante(hasta), key=clave)
+        tipos = _conjunto_tipos(tipos)
+        filtrar = tipos is not None or minimo is not None or maximo is not None
+        for k in range(i, j):
+            if not filtrar or self._coincide(filas[k], tipos, minimo, maximo):
+                yield filas[k]
+
+    def copiar_columnas(self, nombres, desde=0, hasta=None):
+        """Copia de las filas [desde, hasta) de las columnas pedidas, tomada bajo el lock."""
+        with self._lock:
+            hasta = len(self.ids) if hasta is None else hasta
+            return [getattr(self, nombre)[desde:hasta] for nombre in nombres]
+
+    # ---- Serialización (snapshot) ----
+    def columnas_bytes(self):
+        return [getattr(self, nombre).tobytes() for nombre, _ in self.COLUMNAS]
+
+    def cargar_columnas(self, datos):
+        """Reemplaza las columnas: los bytes se copian; las memoryview (de un snapshot) se usan tal cual."""
+        self._prestadas = False
+        for (nombre, codigo), crudo in zip(self.COLUMNAS, datos):
+            if isinstance(crudo, memoryview):
+                columna = crudo
+                self._prestadas = True
+            else:
+                columna = array(codigo)
+                columna.frombytes(crudo)
+            setattr(self, nombre, columna)
+        self.identidad = next(self._IDENTIDADES)
+        with self._lock_consultas:
+            self._reiniciar_consultas()
+        self.observador = None
+        self._siguiente_id = (self.ids[-1] + 1) if self.ids else 1
+
@@ -0,0 +1,213 @@
+"""Límites de velocidad: tope de monto o de operaciones por cuenta en una ventana deslizante.
+
+Cada límite divide su ventana en baldes de igual ancho y cada cuenta lleva un
+anillo con lo acumulado por balde. Controlar una operación es avanzar el
+anillo (vaciar los baldes que salieron de la ventana: O(1) amortizado) y
+comparar el total con el tope. La ventana efectiva va de `segundos` a
+`segundos` + un balde: nunca deja pasar más de lo configurado.
+
+Los anillos de una cuenta se arman la primera vez que opera, desde su
+historial en el libro mayor, así que valen también tras un reinicio.
+"""
+import time
+from array import array
+
+from bank.ledger import RETIRO, TRANSFERENCIA_ENVIADA
+from bank.money import a_centavos, formatear
+
+MINUTO = 60.0
+HORA = 3600.0
+DIA = 86400.0
+# Baldes por ventana: más baldes, ventana más precisa y anillos más grandes
+BALDES = 60
+# Tipos de movimiento que se pueden limitar
+LIMITABLES = (RETIRO, TRANSFERENCIA_ENVIADA)
+_NOMBRES = {RETIRO: "retiros", TRANSFERENCIA_ENVIADA: "transferencias"}
+
+
+class Limite:
+    """Tope de `maximo` por cuenta cada `segundos`, para los movimientos de `tipos`.
+
+    Con por_monto el tope es en centavos; si no, en cantidad de operaciones.
+    """
+
+    __slots__ = ("tipos", "segundos", "maximo", "por_monto", "baldes", "ancho")
+
+    def __init__(self, tipos, segundos: float, maximo: int, por_monto: bool = True, baldes: int = BALDES):
+        tipos = tuple(tipos)
+        if not tipos or any(tipo not in LIMITABLES for tipo in tipos):
+            raise ValueError("Solo se pueden limitar retiros y transferencias.")
+        if segundos <= 0 or maximo < 0 or baldes <= 0:
+            raise ValueError("Límite inválido.")
+        self.tipos = tipos
+        self.segundos = segundos
+        self.maximo = maximo
+        self.por_monto = por_monto
+        self.baldes = baldes
+        self.ancho = segundos / baldes
+
+    @classmethod
+    def monto(cls, tipos, segundos, centavos, baldes=BALDES):
+        """P. ej. Limite.monto([RETIRO], DIA, 5_000_000): hasta $50.000 retirados cada 24 h."""
+        return cls(tipos, segundos, centavos, True, baldes)
+
+    @classmethod
+    def cantidad(cls, tipos, segundos, operaciones, baldes=BALDES):
+        """P. ej. Limite.cantidad([TRANSFERENCIA_ENVIADA], MINUTO, 5): hasta 5 transferencias por minuto."""
+        return cls(tipos, segundos, operaciones, False, baldes)
+
+    def __str__(self):
+        tipos = " y ".join(_NOMBRES[tipo] for tipo in self.tipos)
+        tope = formatear(self.maximo) if self.por_monto else f"{self.maximo} operaciones"
+        return f"{tipos}: máximo {tope} cada {_duracion(self.segundos)}"
+
+
+class Ventana:
+    """Anillo de baldes de una cuenta para un límite; `total` es la suma de la ventana."""
+
+    __slots__ = ("sumas", "total", "balde")
+
+    def __init__(self, limite):
+        # Un balde más que los de la ventana: el actual está incompleto
+        self.sumas = array("q", bytes(8 * (limite.baldes + 1)))
+        self.total = 0
+        self.balde = 0  # número absoluto del balde actual (instante // ancho)
+
+    def avanzar(self, balde: int):
+        if balde <= self.balde:
+            return  # mismo balde (o reloj atrasado: se suma al actual)
+        sumas = self.sumas
+        n = len(sumas)
+        if balde - self.balde >= n:
+            sumas[:] = array("q", bytes(8 * n))
+            self.total = 0
+        else:
+            for k in range(self.balde + 1, balde + 1):
+                self.total -= sumas[k % n]
+                sumas[k % n] = 0
+        self.balde = balde
+
+    def sumar(self, valor: int):
+        self.sumas[self.balde % len(self.sumas)] += valor
+        self.total += valor
+
+
+class ControlVelocidad:
+    """Límites de un banco; las cuentas guardan sus ventanas en Account._ventanas."""
+
+    def __init__(self, limites):
+        self.limites = tuple(limites)
+        # Tipo -> (posición, ancho, máximo, por_monto) de los límites que lo cuentan
+        self._por_tipo = {}
+        for k, limite in enumerate(self.limites):
+            for tipo in limite.tipos:
+                self._por_tipo.setdefault(tipo, []).append((k, limite.ancho, limite.maximo, limite.por_monto))
+
+    def consumir(self, cuenta, tipo: int, centavos: int, ahora: float = None):
+        """Controla una operación contra todos sus límites y la suma; lanza ValueError si excede alguno.
+
+        Se llama con el lock de la cuenta tomado y después de los demás
+        controles: si no lanza, la operación se hace.
+        """
+        posiciones = self._por_tipo.get(tipo)
+        if posiciones is None:
+            return
+        ahora = time.time() if ahora is None else ahora
+        estado = cuenta._ventanas
+        ventanas = estado[1] if estado is not None and estado[0] is self else self._ventanas(cuenta, ahora)
+        # Una sola pasada: se suma a medida que se controla y se deshace si un límite no alcanza
+        for hechos, (k, ancho, maximo, por_monto) in enumerate(posiciones):
+            ventana = ventanas[k]
+            balde = int(ahora // ancho)
+            if balde > ventana.balde:
+                ventana.avanzar(balde)
+            valor = centavos if por_monto else 1
+            if ventana.total + valor > maximo:
+                for j, _, _, por_monto in posiciones[:hechos]:
+                    ventanas[j].sumar(-centavos if por_monto else -1)
+                raise ValueError(f"Límite excedido ({self.limites[k]}).")
+            ventana.sumas[ventana.balde % len(ventana.sumas)] += valor
+            ventana.total += valor
+
+    def consumir_lote(self, cuentas, tipo: int, montos, ahora: float):
+        """Controla y suma un lote todo o nada; devuelve un mensaje o None por operación.
+
+        `cuentas` y `montos` son paralelos. Cada operación ve lo sumado por las
+        anteriores del lote; si alguna excede un límite, no queda nada sumado.
+        """
+        errores = [None] * len(montos)
+        hechas = []
+        for k, (cuenta, centavos) in enumerate(zip(cuentas, montos)):
+            try:
+                self.consumir(cuenta, tipo, centavos, ahora)
+            except ValueError as e:
+                errores[k] = str(e)
+            else:
+                hechas.append((cuenta, centavos))
+        if any(error is not None for error in errores):
+            for cuenta, centavos in hechas:
+                self.devolver(cuenta, tipo, centavos, ahora)
+        return errores
+
+    def devolver(self, cuenta, tipo: int, centavos: int, ahora: float):
+        """Deshace un consumir() hecho en `ahora` cuya operación no se completó (p. ej. un lote o un 2PC abortado)."""
+        estado = cuenta._ventanas
+        if estado is None or estado[0] is not self:
+            return
+        for k, ancho, _, por_monto in self._por_tipo.get(tipo, ()):
+            ventana = estado[1][k]
+            balde = min(int(ahora // ancho), ventana.balde)
+            if balde > ventana.balde - len(ventana.sumas):  # si ya salió de la ventana no hay nada que restar
+                valor = centavos if por_monto else 1
+                ventana.sumas[balde % len(ventana.sumas)] -= valor
+                ventana.total -= valor
+
+    def disponible(self, cuenta, ahora: float = None):
+        """[(Limite, lo que queda antes del tope)] de la cuenta en este momento."""
+        ahora = time.time() if ahora is None else ahora
+        with cuenta._lock:
+            ventanas = self._ventanas(cuenta, ahora)
+            restantes = []
+            for limite, ventana in zip(self.limites, ventanas):
+                ventana.avanzar(int(ahora // limite.ancho))
+                restantes.append((limite, max(limite.maximo - ventana.total, 0)))
+        return restantes
+
+    def _ventanas(self, cuenta, ahora):
+        estado = cuenta._ventanas
+        if estado is not None and estado[0] is self:
+            return estado[1]
+        ventanas = [Ventana(limite) for limite in self.limites]
+        for k, limite in enumerate(self.limites):
+            ventanas[k].balde = int(ahora // limite.ancho)
+        # Se recorre el historial desde el final solo mientras caiga en la ventana más larga
+        libro = cuenta.libro
+        desde = ahora - max(limite.segundos + limite.ancho for limite in self.limites)
+        for i in range(len(cuenta.movimientos) - 1, -1, -1):
+            fila = cuenta.movimientos[i]
+            fecha = libro.fechas[fila]
+            if fecha < desde:
+                break
+            for k, ancho, _, por_monto in self._por_tipo.get(libro.tipos[fila], ()):
+                ventana = ventanas[k]
+                balde = min(int(fecha // ancho), ventana.balde)
+                if balde > ventana.balde - len(ventana.sumas):
+                    valor = libro.montos[fila] if por_monto else 1
+                    ventana.sumas[balde % len(ventana.sumas)] += valor
+                    ventana.total += valor
+        cuenta._ventanas = (self, ventanas)
+        return ventanas
+
+
+def _duracion(segundos: float) -> str:
+    for unidad, nombre in ((DIA, "d"), (HORA, "h"), (MINUTO, "min")):
+        if segundos >= unidad and segundos % unidad == 0:
+            return f"{int(segundos // unidad)} {nombre}"
+    return f"{segundos:g} s"
+
+
+# Límites por cuenta que aplican las aplicaciones: consola, versión web y servidor de red
+LIMITES = (
+    Limite.monto([RETIRO], DIA, a_centavos(500_000)),
+    Limite.cantidad([TRANSFERENCIA_ENVIADA], MINUTO, 10),
+)
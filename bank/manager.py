@@ -1,47 +1,663 @@
-from bank.models import Client, Account
-import random
+from bank.models import Client, Account, Transaction
+from bank.allocator import AccountNumberAllocator
+from bank.batch import LOTE_RECHAZADO, repartir_filas, validar_lote
+from bank.closing import Cierre
+from bank.journal import Journal
+from bank.limits import ControlVelocidad
+from bank.metrics import METRICAS, instrumentar
+from bank.ledger import COMISION, INTERES, SIGNOS, TRANSFERENCIA_ENVIADA, Ledger
+from bank.money import sumar
+from bank.search import Destino, SortedIndex, normalizar
+from bank.reconcile import conciliar
+from bank.scheduler import Orden, Programador
+from bank.stats import Estadisticas
+from bank.snapshot import LazySequence, SnapshotView, escribir_snapshot
+from array import array
+from contextlib import ExitStack, nullcontext
+import glob
+import os
+import threading
+import time
+
+# Criterios de orden para listar clientes
+ORDENES_CLIENTES = ("usuario", "dni")
+# Campos por los que busca buscar_clientes, en orden de prioridad
+CAMPOS_BUSQUEDA = ("usuario", "nombre", "apellido", "dni", "alias")
+# Clientes que el listado ordenado resuelve por tanda antes de volver a ubicar el cursor
+_TANDA_LISTADO = 256
 
 
 class BankManager:
-    def __init__(self):
+    def __init__(self, asignador: AccountNumberAllocator = None, concurrente: bool = False):
+        # En modo concurrente cada cuenta tiene su lock y las altas se serializan
+        self.concurrente = concurrente
+        self._lock = threading.RLock() if concurrente else nullcontext()
         self.clientes = []
         self.cuentas = []
+        # Índices hash para búsquedas O(1)
+        self._clientes_por_usuario = {}
+        self._cuentas_por_numero = {}
+        self._cuentas_por_alias = {}
+        self.asignador = asignador if asignador is not None else AccountNumberAllocator()
+        # Libro mayor global: todas las cuentas guardan índices a sus filas
+        self.libro = Ledger(self._buscar_cuenta)
+        self.journal = None
+        self._generacion = 0
+        # Snapshot mapeado en memoria y objetos ya materializados desde él
+        self._snapshot = None
+        self._clientes_snapshot = {}
+        self._cuentas_snapshot = {}
+        # Índices ordenados (listado y búsqueda por prefijo): campo -> SortedIndex
+        self._ordenes = {}
+        self._busqueda = {}
+        # Órdenes permanentes (transferencias programadas)
+        self.programador = Programador(self)
+        # Límites de velocidad de retiros y transferencias (ControlVelocidad); None = sin límites
+        self.limites = None
 
-    def crear_cliente(self, nombre, apellido, dni, usuario, pin):
-        if any(c.usuario == usuario for c in self.clientes):
-            raise ValueError("El usuario ya existe.")
-        cliente = Client(nombre, apellido, dni, usuario, pin)
-        self.clientes.append(cliente)
+    @instrumentar("crear_cliente")
+    def crear_cliente(self, nombre, apellido, dni, usuario, pin=None, *, pin_hash=None):
+        # El hash (costoso a propósito) se calcula fuera del bloqueo del banco
+        cliente = Client(nombre, apellido, dni, usuario, pin, pin_hash=pin_hash)
+        with self._lock:
+            if self._buscar_cliente(usuario) is not None:
+                raise ValueError("El usuario ya existe.")
+            self.clientes.append(cliente)
+            self._clientes_por_usuario[usuario] = cliente
+            self.registrar("C", *cliente.exportar())
         return cliente
 
+    @instrumentar("buscar_cliente")
     def buscar_cliente(self, usuario):
-        for cliente in self.clientes:
-            if cliente.usuario == usuario:
-                return cliente
-        return None
+        return self._buscar_cliente(usuario)
+
+    def _buscar_cliente(self, usuario):
+        # Sin métricas: la usan las altas y el replay
+        cliente = self._clientes_por_usuario.get(usuario)
+        if cliente is None and self._snapshot is not None:
+            i = self._snapshot.buscar_usuario(usuario)
+            if i is not None:
+                cliente = self._cliente_de_snapshot(i)
+        return cliente
 
     def generar_numero_unico(self):
-        import random
+        # El asignador nunca repite; solo se saltean números tomados por otra vía
         while True:
-            numero = random.randint(100000, 999999)
-            if all(c.numero != numero for c in self.cuentas):
+            numero = self.asignador.siguiente()
+            if numero in self._cuentas_por_numero:
+                continue
+            if self._snapshot is None or self._snapshot.buscar_numero(numero) is None:
                 return numero
 
-    def crear_cuenta(self, cliente, alias):
-        numero = self.generar_numero_unico()
-        cuenta = Account(numero, alias, cliente)
+    @instrumentar("crear_cuenta")
+    def crear_cuenta(self, cliente, alias, numero=None):
+        # numero explícito: lo asigna otro componente (p. ej. el coordinador de shards)
+        with self._lock:
+            if numero is None:
+                numero = self.generar_numero_unico()
+            elif self._buscar_cuenta(numero) is not None:
+                raise ValueError("El número de cuenta ya existe.")
+            cuenta = self._alta_cuenta(numero, alias, cliente)
+            self.registrar("A", cliente.usuario, alias, numero, self.asignador.posicion)
+        return cuenta
+
+    def _alta_cuenta(self, numero, alias, cliente):
+        cuenta = Account(numero, alias, cliente, self)
         cliente.cuentas.append(cuenta)
         self.cuentas.append(cuenta)
+        self._cuentas_por_numero[numero] = cuenta
+        self._cuentas_por_alias.setdefault(alias, []).append(cuenta)
         return cuenta
 
+    @instrumentar("buscar_cuenta")
+    def buscar_cuenta_por_numero(self, numero):
+        return self._buscar_cuenta(numero)
+
+    def _buscar_cuenta(self, numero):
+        # Sin métricas: la usan el libro (al describir transferencias), los lotes y el replay
+        cuenta = self._cuentas_por_numero.get(numero)
+        if cuenta is None and self._snapshot is not None:
+            j = self._snapshot.buscar_numero(numero)
+            if j is not None:
+                cuenta = self._cuenta_de_snapshot(j)
+        return cuenta
 
+    @instrumentar("buscar_alias")
     def buscar_cuenta_por_alias(self, alias):
-        return [c for c in self.cuentas if c.alias == alias]
+        # El índice de alias en memoria solo tiene las cuentas creadas después del snapshot
+        encontradas = []
+        if self._snapshot is not None:
+            encontradas = [self._cuenta_de_snapshot(j) for j in self._snapshot.buscar_alias(alias)]
+        encontradas.extend(self._cuentas_por_alias.get(alias, ()))
+        return encontradas
+
+    @instrumentar("aplicar_lote")
+    def aplicar_lote(self, transferencias, fecha=None):
+        """Aplica un lote de transferencias (numero_origen, numero_destino, centavos) todo o nada.
+
+        Devuelve una lista con None por cada transferencia aplicada o el motivo
+        del rechazo; si alguna falla (también por los límites de velocidad) no
+        se aplica ninguna.
+        """
+        transferencias = list(transferencias)
+        origenes = [t[0] for t in transferencias]
+        destinos = [t[1] for t in transferencias]
+        montos = [t[2] for t in transferencias]
+        cuentas = {}
+        for numero in set(origenes).union(destinos):
+            cuenta = self._buscar_cuenta(numero)
+            if cuenta is not None:
+                cuentas[numero] = cuenta
+
+        with ExitStack() as locks:
+            if self.concurrente:
+                for numero in sorted(cuentas):
+                    locks.enter_context(cuentas[numero]._lock)
+            saldos = {numero: cuenta.saldo_centavos for numero, cuenta in cuentas.items()}
+            errores, netos = validar_lote(origenes, destinos, montos, saldos)
+            if any(error is not None for error in errores):
+                return [error or LOTE_RECHAZADO for error in errores]
+            if not montos:
+                return []
+
+            fecha = time.time() if fecha is None else fecha
+            if self.limites is not None:
+                # Los límites valen también para los lotes: si una transferencia excede, no se aplica ninguna
+                errores = self.limites.consumir_lote([cuentas[numero] for numero in origenes],
+                                                     TRANSFERENCIA_ENVIADA, montos, fecha)
+                if any(error is not None for error in errores):
+                    return [error or LOTE_RECHAZADO for error in errores]
+            primera = self.libro.transferencias(origenes, destinos, montos, fecha)
+            for numero, neto in netos.items():
+                cuentas[numero].saldo_centavos += neto
+            # Cuentas con agregados ya armados: se les suman sus filas nuevas
+            vigiladas = {numero: len(cuenta.movimientos) for numero, cuenta in cuentas.items()
+                         if cuenta._estadisticas is not None}
+            repartir_filas(cuentas, origenes, destinos, primera)
+            for numero, antes in vigiladas.items():
+                cuenta = cuentas[numero]
+                filas = cuenta.movimientos[antes:]
+                for fila in filas:
+                    cuenta._estadisticas.registrar(self.libro.tipos[fila], self.libro.montos[fila], fecha)
+            self.registrar("L", origenes, destinos, montos, fecha)
+        return errores
+
+    @instrumentar("cerrar_dia")
+    def cerrar_dia(self, reglas, fecha=None) -> Cierre:
+        """Acredita intereses y debita comisiones (bank.closing.ReglasCierre) a todas las cuentas.
+
+        Los saldos se calculan en una pasada vectorizada y cada tipo de
+        movimiento se escribe en el libro como un solo lote. Las altas y las
+        operaciones sobre las cuentas esperan a que termine el cierre.
+        """
+        inicio = time.perf_counter()
+        with self._lock:
+            if self._snapshot is not None:
+                # Las cuentas del snapshot que el cierre va a mover se materializan
+                # antes de bloquear; las demás no cambian mientras no se materialicen.
+                _, saldos = self.saldos_registrados()
+                for posiciones, _ in reglas.calcular(saldos):
+                    for k in posiciones:
+                        self.cuentas[k]
+            with ExitStack() as locks:
+                if self.concurrente:
+                    for cuenta in sorted(self._cuentas_vivas(), key=lambda c: c.numero):
+                        locks.enter_context(cuenta._lock)
+                numeros, saldos = self.saldos_registrados()
+                intereses, comisiones = reglas.calcular(saldos)
+                fecha = time.time() if fecha is None else fecha
+                for tipo, (posiciones, montos) in ((INTERES, intereses), (COMISION, comisiones)):
+                    if montos:
+                        self._aplicar_movimientos([self.cuentas[k] for k in posiciones], tipo, montos, fecha)
+        return Cierre(len(numeros), sum(intereses[1]), sum(comisiones[1]),
+                      len(intereses[1]) + len(comisiones[1]), time.perf_counter() - inicio)
+
+    def _cuentas_vivas(self):
+        """Cuentas con objeto en memoria (las del snapshot solo si ya se materializaron)."""
+        if self._snapshot is None:
+            return list(self.cuentas)
+        return list(self._cuentas_snapshot.values()) + self.cuentas[self._snapshot.n_cuentas:]
+
+    def _aplicar_movimientos(self, cuentas, tipo, montos, fecha):
+        # Un lote de movimientos de una pata del mismo tipo: una escritura al libro
+        numeros = [cuenta.numero for cuenta in cuentas]
+        fila = self.libro.movimientos(numeros, tipo, montos, fecha)
+        signo = SIGNOS[tipo]
+        for cuenta, monto in zip(cuentas, montos):
+            cuenta.saldo_centavos += signo * monto
+            cuenta.movimientos.append(fila)
+            if cuenta._estadisticas is not None:
+                cuenta._estadisticas.registrar(tipo, monto, fecha)
+            fila += 1
+        self.registrar("M", tipo, numeros, list(montos), fecha)
+
+    def configurar_limites(self, limites):
+        """Activa los límites de velocidad (bank.limits.Limite) de retiros y transferencias; vacío = sin límites."""
+        self.limites = ControlVelocidad(limites) if limites else None
 
-    def listar_clientes(self):
+    def programar_transferencia(self, origen, destino, centavos, inicio=None, dias=0, meses=0, veces=None):
+        """Orden permanente de `origen` a `destino`; ver Programador.programar."""
+        return self.programador.programar(origen, destino, centavos, inicio, dias, meses, veces)
+
+    @instrumentar("ejecutar_ordenes")
+    def ejecutar_ordenes(self, ahora=None):
+        """Ejecuta las órdenes permanentes vencidas; ver Programador.ejecutar."""
+        return self.programador.ejecutar(ahora)
+
+    def consultar_movimientos(self, desde=None, hasta=None, tipos=None, minimo=None, maximo=None):
+        """Genera (numero_de_cuenta, Transaction) de todo el banco, en orden cronológico.
+
+        Mismos filtros que Account.consultar: fechas en [desde, hasta), tipos y
+        monto en centavos en [minimo, maximo]. Ver Ledger.consultar.
+        """
+        libro = self.libro
+        for fila in libro.consultar(desde, hasta, tipos, minimo, maximo):
+            yield libro.numeros[fila], Transaction.de_libro(libro, fila)
+
+    @property
+    def estadisticas(self):
+        """Agregados de todo el banco (Estadisticas del libro mayor), al día en O(1) por movimiento."""
+        return self.libro.vigilar(Estadisticas.del_libro)
+
+    def saldos_registrados(self):
+        """(números, saldos en centavos) de todas las cuentas, sin materializar las del snapshot."""
+        numeros, saldos = array("Q"), array("q")
+        nuevas = self.cuentas
+        if self._snapshot is not None:
+            numeros, saldos = self._snapshot.saldos()
+            # Las cuentas ya materializadas pueden haberse movido desde el snapshot
+            for j, cuenta in list(self._cuentas_snapshot.items()):
+                saldos[j] = cuenta.saldo_centavos
+            nuevas = self.cuentas[self._snapshot.n_cuentas:]
+        for cuenta in nuevas:
+            numeros.append(cuenta.numero)
+            saldos.append(cuenta.saldo_centavos)
+        return numeros, saldos
+
+    def saldo_total_centavos(self):
+        # Suma exacta en enteros (vectorizada con numpy si está disponible)
+        return sumar(array("q", (c.saldo_centavos for c in self.cuentas)))
+
+    def listar_clientes(self, limite=None, desde=0, orden=None):
         if not self.clientes:
             return "No hay clientes registrados."
-        texto = ""
-        for idx, c in enumerate(self.clientes, 1):
-            texto += f"{idx}. {c.usuario} - {c.nombre} {c.apellido} - DNI: {c.dni}\n"
-        return texto.strip()
+        return "\n".join(
+            f"{idx}. {c.usuario} - {c.nombre} {c.apellido} - DNI: {c.dni}"
+            for idx, c in enumerate(self.iterar_clientes(limite, desde, orden), desde + 1)
+        )
+
+    # ---------- Listado paginado ----------
+    def iterar_clientes(self, limite=None, desde=0, orden=None, cursor=None):
+        """Recorre los clientes de a uno sin armar listas.
+
+        Sin `orden` van en orden de alta; con orden="usuario" o "dni" se
+        siguen esos criterios. `desde` saltea clientes (limit/offset) y
+        `cursor` retoma donde terminó una página de pagina_clientes, aunque
+        entretanto se hayan dado de alta otros.
+        """
+        for _, cliente in self._recorrer_clientes(limite, desde, orden, cursor):
+            yield cliente
+
+    def pagina_clientes(self, limite=50, orden=None, cursor=None):
+        """Devuelve (clientes, cursor_siguiente); el cursor es None en la última página."""
+        pagina = list(self._recorrer_clientes(limite + 1, 0, orden, cursor))
+        if len(pagina) <= limite:
+            return [cliente for _, cliente in pagina], None
+        return [cliente for _, cliente in pagina[:limite]], pagina[limite - 1][0]
+
+    def _recorrer_clientes(self, limite, desde, orden, cursor):
+        # Genera (cursor que retoma después de este cliente, cliente)
+        if orden is not None and orden not in ORDENES_CLIENTES:
+            raise ValueError(f"Orden de clientes desconocido: {orden}")
+        if limite is None:
+            limite = len(self.clientes)
+        if orden is None:
+            inicio = (cursor or 0) + desde
+            for posicion in range(inicio, min(inicio + limite, len(self.clientes))):
+                yield posicion + 1, self.clientes[posicion]
+            return
+
+        clave = self._clave_cliente(orden)
+        while limite > 0:
+            # El índice puede crecer entre tandas: se reubica el cursor cada vez
+            indice = self._indice_orden(orden)
+            inicio = 0 if cursor is None else indice.despues_de(cursor)
+            tanda = indice.posiciones[inicio + desde:inicio + desde + min(limite, _TANDA_LISTADO)]
+            if not tanda:
+                return
+            desde = 0
+            for posicion in tanda:
+                cursor = clave(posicion)
+                yield cursor, self.clientes[posicion]
+            limite -= len(tanda)
+
+    def _clave_cliente(self, orden):
+        campo = 3 if orden == "usuario" else 2
+        vista = self._snapshot
+        n_snapshot = vista.n_clientes if vista is not None else 0
+        clientes = self.clientes
+
+        def clave(posicion):
+            if posicion < n_snapshot:
+                # Se lee del snapshot sin materializar al cliente
+                valor = vista.cliente(posicion)[campo]
+            else:
+                c = clientes[posicion]
+                valor = c.usuario if campo == 3 else c.dni
+            # Los usuarios son únicos: la posición solo desempata DNIs repetidos
+            return (valor, 0 if campo == 3 else posicion)
+        return clave
+
+    def _indice_orden(self, orden):
+        def crear():
+            if orden == "usuario" and self._snapshot is not None:
+                # El snapshot ya trae a sus clientes ordenados por usuario
+                return SortedIndex(self._clave_cliente(orden), self._snapshot.orden_usuarios())
+            return SortedIndex(self._clave_cliente(orden))
+        return self._al_dia(self._ordenes, orden, len(self.clientes), crear)
+
+    def _al_dia(self, indices, nombre, total, crear):
+        with self._lock:
+            indice = indices.get(nombre)
+            if indice is None:
+                indice = indices[nombre] = crear()
+            if len(indice) != total:
+                indice.actualizar(total)
+            return indice
+
+    # ---------- Búsqueda por prefijo ----------
+    @instrumentar("buscar_clientes")
+    def buscar_clientes(self, texto, limite=50, desde=0):
+        """Clientes cuyo usuario, nombre, apellido, DNI o alias de alguna cuenta empieza con `texto`.
+
+        No distingue mayúsculas. Cada campo tiene su índice ordenado, así que
+        el costo depende de los resultados pedidos y no de la cantidad de clientes.
+        """
+        encontrados = []
+        for cliente in self.iterar_busqueda(texto):
+            if desde:
+                desde -= 1
+                continue
+            encontrados.append(cliente)
+            if len(encontrados) == limite:
+                break
+        return encontrados
+
+    def iterar_busqueda(self, texto):
+        prefijo = normalizar(texto)
+        vistos = set()
+        for campo in CAMPOS_BUSQUEDA:
+            for posicion in self._indice_busqueda(campo).con_prefijo(prefijo):
+                if campo == "alias":
+                    cliente = self.cuentas[posicion].cliente
+                else:
+                    cliente = self.clientes[posicion]
+                if id(cliente) not in vistos:
+                    vistos.add(id(cliente))
+                    yield cliente
+
+    def buscar_cuentas(self, texto, cliente=None, limite=50, desde=0):
+        """Cuentas cuyo alias empieza con `texto` (o las de `cliente` por alias o número)."""
+        prefijo = normalizar(texto)
+        if cliente is not None:
+            # Pocas cuentas por cliente: se filtran directo
+            encontradas = [c for c in cliente.cuentas
+                           if normalizar(c.alias).startswith(prefijo) or str(c.numero).startswith(prefijo)]
+            return encontradas[desde:desde + limite]
+        encontradas = []
+        for posicion in self._indice_busqueda("alias").con_prefijo(prefijo, desde):
+            encontradas.append(self.cuentas[posicion])
+            if len(encontradas) == limite:
+                break
+        return encontradas
+
+    def sugerir_destinos(self, texto, limite=10, excluir=None):
+        """Hasta `limite` cuentas cuyo alias empieza con `texto`, como Destino(alias, numero, titular).
+
+        Las coincidencias exactas salen primero. Las cuentas del snapshot se
+        leen sin materializarlas; `excluir` omite un número (la cuenta de origen).
+        """
+        vista = self._snapshot
+        n_snapshot = vista.n_cuentas if vista is not None else 0
+        sugerencias = []
+        for posicion in self._indice_busqueda("alias").con_prefijo(normalizar(texto)):
+            if posicion < n_snapshot and posicion not in self._cuentas_snapshot:
+                numero, alias, i, *_ = vista.cuenta(posicion)
+                nombre, apellido = vista.cliente(i)[:2]
+            else:
+                cuenta = self.cuentas[posicion]
+                numero, alias = cuenta.numero, cuenta.alias
+                nombre, apellido = cuenta.cliente.nombre, cuenta.cliente.apellido
+            if numero == excluir:
+                continue
+            sugerencias.append(Destino(alias, numero, f"{nombre} {apellido}"))
+            if len(sugerencias) == limite:
+                break
+        return sugerencias
+
+    def preparar_busqueda(self):
+        """Arma todos los índices de búsqueda (conviene llamarla al iniciar, en segundo plano)."""
+        for campo in CAMPOS_BUSQUEDA:
+            self._indice_busqueda(campo)
+
+    def _indice_busqueda(self, campo):
+        if campo == "alias":
+            return self._al_dia(self._busqueda, campo, len(self.cuentas),
+                                lambda: SortedIndex(self._clave_alias()))
+        return self._al_dia(self._busqueda, campo, len(self.clientes),
+                            lambda: SortedIndex(self._clave_busqueda(campo)))
+
+    def _clave_busqueda(self, campo):
+        vista = self._snapshot
+        n_snapshot = vista.n_clientes if vista is not None else 0
+        clientes = self.clientes
+
+        def clave(posicion):
+            if posicion < n_snapshot:
+                nombre, apellido, dni, usuario = vista.cliente(posicion)[:4]
+            else:
+                c = clientes[posicion]
+                nombre, apellido, dni, usuario = c.nombre, c.apellido, c.dni, c.usuario
+            if campo == "usuario":
+                return normalizar(usuario)
+            if campo == "nombre":
+                return normalizar(f"{nombre} {apellido}")
+            return normalizar(apellido if campo == "apellido" else dni)
+        return clave
+
+    def _clave_alias(self):
+        vista = self._snapshot
+        n_snapshot = vista.n_cuentas if vista is not None else 0
+        cuentas = self.cuentas
+
+        def clave(posicion):
+            if posicion < n_snapshot:
+                return normalizar(vista.cuenta(posicion)[1])
+            return normalizar(cuentas[posicion].alias)
+        return clave
+
+    # ---------- Persistencia: snapshot binario ----------
+    def guardar_snapshot(self, ruta):
+        self._guardar_ordenes(ruta)
+        escribir_snapshot(self, ruta, self._generacion)
+
+    def _guardar_ordenes(self, ruta):
+        # Las órdenes van en un archivo al lado del snapshot; se escribe antes para
+        # que un snapshot nunca quede sin las órdenes que le corresponden.
+        if len(self.programador):
+            self.programador.guardar(ruta + ".ordenes")
+        elif os.path.exists(ruta + ".ordenes"):
+            os.remove(ruta + ".ordenes")
+
+    @classmethod
+    def cargar_snapshot(cls, ruta):
+        """Carga un snapshot vía mmap; clientes y cuentas se materializan al accederlos."""
+        banco = cls()
+        banco._montar_snapshot(SnapshotView(ruta))
+        return banco
+
+    def _montar_snapshot(self, vista):
+        self._snapshot = vista
+        self._generacion = vista.generacion
+        self.asignador = AccountNumberAllocator(vista.ancho, vista.clave, vista.posicion)
+        self.clientes = LazySequence(vista.n_clientes, self._cliente_de_snapshot)
+        self.cuentas = LazySequence(vista.n_cuentas, self._cuenta_de_snapshot)
+        self._ordenes = {}
+        self.libro.cargar_columnas(vista.columnas_libro())
+        self.programador = Programador(self, self.programador.reintentos, self.programador.espera)
+        if os.path.exists(vista.ruta + ".ordenes"):
+            self.programador.cargar(vista.ruta + ".ordenes")
+
+    def _cliente_de_snapshot(self, i):
+        cliente = self._clientes_snapshot.get(i)
+        if cliente is not None:
+            return cliente
+        with self._lock:
+            if i in self._clientes_snapshot:  # otro hilo lo materializó primero
+                return self._clientes_snapshot[i]
+            return self._materializar_cliente(i)
+
+    def _materializar_cliente(self, i):
+        nombre, apellido, dni, usuario, pin, primera, n = self._snapshot.cliente(i)
+        cliente = Client(nombre, apellido, dni, usuario, pin_hash=pin)
+        self._clientes_snapshot[i] = cliente
+        self._clientes_por_usuario[usuario] = cliente
+        # Las cuentas de un cliente son contiguas: se materializan junto con él
+        for j in range(primera, primera + n):
+            numero, alias, _, saldo, primer_mov, n_mov = self._snapshot.cuenta(j)
+            cuenta = Account(numero, alias, cliente, self)
+            cuenta.saldo_centavos = saldo
+            cuenta.movimientos = self._snapshot.movimientos(primer_mov, n_mov)
+            cliente.cuentas.append(cuenta)
+            self._cuentas_snapshot[j] = cuenta
+            self._cuentas_por_numero[numero] = cuenta
+        return cliente
+
+    def _cuenta_de_snapshot(self, j):
+        cuenta = self._cuentas_snapshot.get(j)
+        if cuenta is None:
+            self._cliente_de_snapshot(self._snapshot.cuenta(j)[2])
+            cuenta = self._cuentas_snapshot[j]
+        return cuenta
+
+    # ---------- Persistencia: journal + checkpoint ----------
+    def registrar(self, *registro):
+        if self.journal is not None:
+            self.journal.escribir(*registro)
+
+    @staticmethod
+    def _checkpoints(ruta):
+        """Checkpoints existentes del journal, del más reciente al más viejo."""
+        encontrados = []
+        for archivo in glob.glob(glob.escape(ruta) + ".ckpt.*"):
+            sufijo = archivo.rsplit(".", 1)[1]
+            if sufijo.isdigit():
+                encontrados.append((int(sufijo), archivo))
+        return [archivo for _, archivo in sorted(encontrados, reverse=True)]
+
+    def abrir_journal(self, ruta, intervalo=0.05, lote=256, verificar=False):
+        """Carga el último checkpoint, reaplica el journal y empieza a registrar.
+
+        Con verificar=True concilia los saldos restaurados contra el libro y
+        lanza ValueError si no coinciden.
+        """
+        checkpoints = self._checkpoints(ruta)
+        if checkpoints:
+            self._montar_snapshot(SnapshotView(checkpoints[0]))
+
+        registros, validos = Journal.leer(ruta)
+        if registros and (registros[0][0] != "G" or registros[0][1] > self._generacion):
+            raise ValueError("El journal no corresponde al checkpoint.")
+        if registros and registros[0][1] == self._generacion:
+            self.asignador = AccountNumberAllocator.desde_estado(registros[0][2])
+            # Lo que está en el journal ya pasó los límites: no se vuelve a
+            # controlar, y tampoco cuenta en las métricas (no es tráfico real)
+            limites, self.limites = self.limites, None
+            try:
+                with METRICAS.pausada():
+                    for registro in registros[1:]:
+                        self._aplicar(registro)
+            finally:
+                self.limites = limites
+            with open(ruta, "r+b") as f:
+                f.truncate(validos)  # descarta una última línea a medio escribir
+            self.journal = Journal(ruta, intervalo, lote)
+        else:
+            # Journal nuevo o anterior al último checkpoint (ya incluido en él)
+            self.journal = Journal(ruta, intervalo, lote)
+            self.journal.truncar("G", self._generacion, self.asignador.estado())
+        if verificar:
+            resultado = conciliar(self)
+            if not resultado.ok:
+                self.cerrar()
+                raise ValueError(f"El estado restaurado no concilia con el libro mayor.\n{resultado}")
+
+    def _aplicar(self, registro):
+        tipo = registro[0]
+        if tipo == "C":
+            _, nombre, apellido, dni, usuario, pin_hash = registro
+            self.crear_cliente(nombre, apellido, dni, usuario, pin_hash=pin_hash)
+        elif tipo == "A":
+            _, usuario, alias, numero, posicion = registro
+            self._alta_cuenta(numero, alias, self._buscar_cliente(usuario))
+            self.asignador.posicion = posicion
+        elif tipo == "D":
+            cuenta = self._buscar_cuenta(registro[1])
+            cuenta.depositar_centavos(registro[2], registro[3])
+        elif tipo == "R":
+            cuenta = self._buscar_cuenta(registro[1])
+            cuenta.retirar_centavos(registro[2], registro[3])
+        elif tipo == "T":
+            cuenta = self._buscar_cuenta(registro[1])
+            cuenta.transferir_centavos(registro[3], self._buscar_cuenta(registro[2]), registro[4])
+            if len(registro) > 5:
+                self.programador.cumplida(registro[5])
+        elif tipo == "L":
+            _, origenes, destinos, montos, fecha = registro
+            self.aplicar_lote(zip(origenes, destinos, montos), fecha)
+        elif tipo == "P":
+            _, id_, origen, destino, centavos, inicio, dias, meses, veces = registro
+            self.programador.alta(Orden(id_, origen, destino, centavos, inicio, dias, meses, veces))
+        elif tipo == "X":
+            self.programador.baja(registro[1])
+        elif tipo == "F":
+            self.programador.reprogramar(*registro[1:])
+        elif tipo == "M":
+            _, codigo, numeros, montos, fecha = registro
+            self._aplicar_movimientos([self._buscar_cuenta(n) for n in numeros], codigo, montos, fecha)
+        else:
+            raise ValueError(f"Registro de journal desconocido: {tipo}")
+
+    def checkpoint(self):
+        """Guarda un snapshot completo y trunca el journal para acotar el replay.
+
+        Las escrituras esperan durante todo el checkpoint: un registro que
+        entrara al journal mientras se escribe el snapshot se perdería al truncar.
+        """
+        if self.journal is None:
+            raise ValueError("No hay un journal abierto.")
+        # Mismo orden de locks que las órdenes permanentes (programador, banco, cuentas por número)
+        with self.programador._lock, self._lock, ExitStack() as locks:
+            if self.concurrente:
+                for cuenta in sorted(self._cuentas_vivas(), key=lambda c: c.numero):
+                    locks.enter_context(cuenta._lock)
+            self.journal.sincronizar()
+            self._generacion += 1
+            ruta = self.journal.ruta
+            self.guardar_snapshot(f"{ruta}.ckpt.{self._generacion}")
+            # Si el proceso cae antes de truncar, el replay ignora el journal viejo
+            # porque su generación no coincide con la del checkpoint.
+            self.journal.truncar("G", self._generacion, self.asignador.estado())
+        for viejo in self._checkpoints(ruta)[1:]:
+            if self._snapshot is not None and viejo == self._snapshot.ruta:
+                continue  # todavía mapeado; se limpia en el próximo checkpoint
+            for archivo in (viejo, viejo + ".ordenes"):
+                try:
+                    os.remove(archivo)
+                except OSError:
+                    pass
+
+    def cerrar(self):
+        if self.journal is not None:
+            self.journal.cerrar()
+            self.journal = None
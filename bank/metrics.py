@@ -0,0 +1,308 @@
+import functools
+import os
+import sys
+import tempfile
+import threading
+import time
+import traceback
+from bisect import bisect_left
+from collections import Counter, deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Límites superiores (segundos) de los buckets del histograma de latencias
+LIMITES = (1e-6, 2.5e-6, 5e-6, 1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4,
+           1e-3, 2.5e-3, 5e-3, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histograma:
+    """Cantidad, fallos, suma y buckets de latencia de una operación."""
+
+    __slots__ = ("cuenta", "fallos", "suma", "buckets")
+
+    def __init__(self):
+        self.cuenta = 0
+        self.fallos = 0
+        self.suma = 0.0
+        self.buckets = [0] * (len(LIMITES) + 1)  # el último es +Inf
+
+    def observar(self, segundos):
+        self.cuenta += 1
+        self.suma += segundos
+        self.buckets[bisect_left(LIMITES, segundos)] += 1
+
+    def sumar(self, otro):
+        self.cuenta += otro.cuenta
+        self.fallos += otro.fallos
+        self.suma += otro.suma
+        self.buckets = [a + b for a, b in zip(self.buckets, otro.buckets)]
+
+    def copia(self):
+        copia = Histograma()
+        copia.sumar(self)
+        return copia
+
+    def cuantil(self, q):
+        """Estimación del cuantil q: el límite del bucket donde cae."""
+        if not self.cuenta:
+            return 0.0
+        objetivo = q * self.cuenta
+        acumulado = 0
+        for limite, n in zip(LIMITES, self.buckets):
+            acumulado += n
+            if acumulado >= objetivo:
+                return limite
+        return float("inf")
+
+
+class Metricas:
+    """Contadores e histogramas de latencia por operación.
+
+    Cada hilo escribe en sus propios histogramas, sin lock: registrar una
+    operación cuesta un perf_counter y un par de búsquedas, así que puede
+    quedar siempre activo. Las lecturas suman los de todos los hilos (una
+    lectura concurrente puede ver la última operación a medio contar). El
+    perfilador por muestreo es opcional.
+    """
+
+    def __init__(self):
+        self.activo = True
+        self._lock = threading.Lock()
+        # Operación -> histograma base, donde se pliegan los hilos que terminaron
+        self._histogramas = {}
+        # (hilo, operación, histograma) de cada hilo vivo que registró algo
+        self._de_hilos = []
+        self._local = threading.local()
+        self._perfilador = None
+        # Operaciones en curso por hilo (solo con el perfilador activo)
+        self._en_curso = {}
+
+    def histograma(self, operacion):
+        """Declara la operación (aparece en las lecturas aunque no haya corrido) y devuelve su base."""
+        with self._lock:
+            histograma = self._histogramas.get(operacion)
+            if histograma is None:
+                histograma = self._histogramas[operacion] = Histograma()
+            return histograma
+
+    def _propio(self, operacion):
+        """Histograma de `operacion` del hilo actual, o None si el hilo está en pausa."""
+        local = self._local
+        propios = getattr(local, "histogramas", None)
+        if propios is None:
+            propios = self._iniciar_hilo().histogramas
+        if local.pausado:
+            return None
+        histograma = propios.get(operacion)
+        if histograma is None:
+            histograma = propios[operacion] = Histograma()
+            with self._lock:
+                self._histogramas.setdefault(operacion, Histograma())
+                self._de_hilos.append((threading.current_thread(), operacion, histograma))
+        return histograma
+
+    def _iniciar_hilo(self):
+        local = self._local
+        if not hasattr(local, "histogramas"):
+            local.histogramas = {}
+            local.pausado = False
+        return local
+
+    def registrar(self, operacion, segundos, fallo=False):
+        histograma = self._propio(operacion)
+        if histograma is not None:
+            _observar(histograma, segundos, fallo)
+
+    @contextmanager
+    def pausada(self):
+        """Dentro del bloque el hilo actual no registra nada (p. ej. el replay del journal)."""
+        local = self._iniciar_hilo()
+        anterior, local.pausado = local.pausado, True
+        try:
+            yield
+        finally:
+            local.pausado = anterior
+
+    def _sumados(self):
+        # Bajo self._lock: los hilos terminados ya no escriben y se pliegan en la base
+        vivos = []
+        for entrada in self._de_hilos:
+            hilo, operacion, histograma = entrada
+            if hilo.is_alive():
+                vivos.append(entrada)
+            else:
+                self._histogramas[operacion].sumar(histograma)
+        self._de_hilos = vivos
+        total = {operacion: h.copia() for operacion, h in self._histogramas.items()}
+        for _, operacion, histograma in vivos:
+            total[operacion].sumar(histograma)
+        return total
+
+    def reiniciar(self):
+        with self._lock:
+            for histograma in self._histogramas.values():
+                histograma.__init__()
+            for _, _, histograma in self._de_hilos:
+                histograma.__init__()
+
+    def instantanea(self):
+        """Dict operación -> {cuenta, fallos, suma, p50, p99, buckets} (copia)."""
+        with self._lock:
+            sumados = self._sumados()
+        return {
+            operacion: {
+                "cuenta": h.cuenta,
+                "fallos": h.fallos,
+                "suma": h.suma,
+                "p50": h.cuantil(0.5),
+                "p99": h.cuantil(0.99),
+                "buckets": dict(zip(LIMITES + (float("inf"),), h.buckets)),
+            }
+            for operacion, h in sumados.items()
+        }
+
+    # ---------- Formato Prometheus ----------
+    def texto_prometheus(self, prefijo="banco"):
+        with self._lock:
+            sumados = self._sumados()
+        items = sorted((op, h.cuenta, h.fallos, h.suma, h.buckets) for op, h in sumados.items())
+        lineas = [f"# TYPE {prefijo}_operaciones_total counter"]
+        lineas += [f'{prefijo}_operaciones_total{{operacion="{op}"}} {cuenta}' for op, cuenta, *_ in items]
+        lineas.append(f"# TYPE {prefijo}_fallos_total counter")
+        lineas += [f'{prefijo}_fallos_total{{operacion="{op}"}} {fallos}' for op, _, fallos, *_ in items]
+        lineas.append(f"# TYPE {prefijo}_latencia_segundos histogram")
+        for op, cuenta, _, suma, buckets in items:
+            acumulado = 0
+            for limite, n in zip(LIMITES, buckets):
+                acumulado += n
+                lineas.append(f'{prefijo}_latencia_segundos_bucket{{operacion="{op}",le="{limite:g}"}} {acumulado}')
+            lineas.append(f'{prefijo}_latencia_segundos_bucket{{operacion="{op}",le="+Inf"}} {cuenta}')
+            lineas.append(f'{prefijo}_latencia_segundos_sum{{operacion="{op}"}} {suma!r}')
+            lineas.append(f'{prefijo}_latencia_segundos_count{{operacion="{op}"}} {cuenta}')
+        return "\n".join(lineas) + "\n"
+
+    def escribir_prometheus(self, ruta):
+        """Escribe el dump de forma atómica (para el textfile collector de node_exporter)."""
+        carpeta = os.path.dirname(os.path.abspath(ruta))
+        fd, temporal = tempfile.mkstemp(dir=carpeta, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(self.texto_prometheus())
+        os.replace(temporal, ruta)
+
+    def servir_prometheus(self, host="127.0.0.1", puerto=9464):
+        """Expone /metrics por HTTP en un hilo; devuelve el servidor (shutdown() para detenerlo)."""
+        metricas = self
+
+        class Manejador(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path != "/metrics":
+                    self.send_error(404)
+                    return
+                cuerpo = metricas.texto_prometheus().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(cuerpo)))
+                self.end_headers()
+                self.wfile.write(cuerpo)
+
+            def log_message(self, *args):
+                pass
+
+        servidor = ThreadingHTTPServer((host, puerto), Manejador)
+        threading.Thread(target=servidor.serve_forever, daemon=True, name="metricas").start()
+        return servidor
+
+    # ---------- Perfilador por muestreo ----------
+    def activar_perfilador(self, umbral=0.05, intervalo=0.005, maximo=1000):
+        """Muestrea la pila de las operaciones que llevan más de `umbral` segundos."""
+        self.desactivar_perfilador()
+        self._perfilador = Perfilador(self, umbral, intervalo, maximo)
+        self._perfilador.iniciar()
+        return self._perfilador
+
+    def desactivar_perfilador(self):
+        if self._perfilador is not None:
+            self._perfilador.detener()
+            self._perfilador = None
+
+    def _entrar(self, operacion, inicio):
+        self._en_curso.setdefault(threading.get_ident(), []).append((operacion, inicio))
+
+    def _salir(self):
+        self._en_curso[threading.get_ident()].pop()
+
+
+class Perfilador:
+    """Hilo que cada `intervalo` mira las operaciones en curso y guarda la pila de las lentas."""
+
+    def __init__(self, metricas, umbral, intervalo, maximo):
+        self.metricas = metricas
+        self.umbral = umbral
+        self.intervalo = intervalo
+        self.muestras = deque(maxlen=maximo)  # (operacion, segundos en curso, pila)
+        self._detenido = threading.Event()
+        self._hilo = threading.Thread(target=self._muestrear, daemon=True, name="perfilador")
+
+    def iniciar(self):
+        self._hilo.start()
+
+    def detener(self):
+        self._detenido.set()
+        self._hilo.join()
+
+    def _muestrear(self):
+        propio = threading.get_ident()
+        while not self._detenido.wait(self.intervalo):
+            ahora = time.perf_counter()
+            marcos = sys._current_frames()
+            for hilo, pila in list(self.metricas._en_curso.items()):
+                if hilo == propio or not pila or hilo not in marcos:
+                    continue
+                operacion, inicio = pila[0]
+                if ahora - inicio >= self.umbral:
+                    self.muestras.append(
+                        (operacion, ahora - inicio, "".join(traceback.format_stack(marcos[hilo]))))
+
+    def resumen(self, n=10):
+        """Las `n` pilas más vistas: [((operacion, pila), muestras)]."""
+        return Counter((operacion, pila) for operacion, _, pila in list(self.muestras)).most_common(n)
+
+
+METRICAS = Metricas()
+
+
+def _observar(histograma, segundos, fallo=False):
+    histograma.observar(segundos)
+    if fallo:
+        histograma.fallos += 1
+
+
+def instrumentar(operacion, metricas=METRICAS):
+    """Decorador: cuenta llamadas, fallos y latencia de la función como `operacion`."""
+    metricas.histograma(operacion)
+    propio = metricas._propio
+    observar = _observar
+    reloj = time.perf_counter
+
+    def decorador(funcion):
+        @functools.wraps(funcion)
+        def envoltura(*args, **kwargs):
+            histograma = propio(operacion) if metricas.activo else None
+            if histograma is None:
+                return funcion(*args, **kwargs)
+            perfilando = metricas._perfilador is not None
+            inicio = reloj()
+            if perfilando:
+                metricas._entrar(operacion, inicio)
+            try:
+                resultado = funcion(*args, **kwargs)
+            except BaseException:
+                observar(histograma, reloj() - inicio, True)
+                raise
+            finally:
+                if perfilando:
+                    metricas._salir()
+            observar(histograma, reloj() - inicio)
+            return resultado
+        return envoltura
+    return decorador
@@ -1,13 +1,65 @@
-from datetime import datetime
+import hashlib
+import hmac
+import os
+import threading
+import time
+from array import array
+from contextlib import nullcontext
+from bank.ledger import (
+    Ledger, DEPOSITO, RETIRO, TRANSFERENCIA_ENVIADA, TRANSFERENCIA_RECIBIDA,
+    describir, formatear_fecha,
+)
+from bank.metrics import instrumentar
+from bank.money import MAXIMO, a_centavos, a_pesos, formatear
+from bank.stats import Estadisticas
+
+# Bloqueo nulo compartido para cuentas fuera del modo concurrente
+_SIN_BLOQUEO = nullcontext()
+
+# El PIN nunca se guarda en claro: journal y snapshot solo ven el hash con sal
+ITERACIONES_PIN = 10_000
+_PREFIJO_PIN = "pbkdf2_sha256$"
+
+
+def hash_pin(pin: str, iteraciones: int = ITERACIONES_PIN) -> str:
+    sal = os.urandom(16)
+    clave = hashlib.pbkdf2_hmac("sha256", pin.encode("utf-8"), sal, iteraciones)
+    return f"{_PREFIJO_PIN}{iteraciones}${sal.hex()}${clave.hex()}"
+
+
+def _hash_guardado(valor):
+    # Los journals y snapshots anteriores guardaban el PIN en claro: se hashea al cargarlo
+    return valor if valor.startswith(_PREFIJO_PIN) else hash_pin(valor)
+
+
+def _pin_coincide(pin, guardado):
+    iteraciones, sal, clave = guardado[len(_PREFIJO_PIN):].split("$")
+    calculada = hashlib.pbkdf2_hmac("sha256", pin.encode("utf-8"), bytes.fromhex(sal), int(iteraciones))
+    return hmac.compare_digest(calculada.hex(), clave)
+
+
+def _validar_centavos(centavos):
+    # Antes de tocar el libro: sus columnas son de enteros de 64 bits
+    if not isinstance(centavos, int) or isinstance(centavos, bool):
+        raise ValueError("Monto inválido.")
+    if centavos <= 0:
+        raise ValueError("El monto debe ser mayor a cero.")
+    if centavos > MAXIMO:
+        raise ValueError("Monto fuera de rango.")
 
 
 class Client:
-    def __init__(self, nombre: str, apellido: str, dni: str, usuario: str, pin: str):
+    # Sin __dict__: con millones de clientes el ahorro por instancia importa
+    __slots__ = ("__nombre", "__apellido", "__dni", "__usuario", "__pin", "cuentas")
+
+    def __init__(self, nombre: str, apellido: str, dni: str, usuario: str, pin: str = None,
+                 *, pin_hash: str = None):
         self.__nombre = nombre
         self.__apellido = apellido
         self.__dni = dni
         self.__usuario = usuario
-        self.__pin = pin
+        # pin_hash: cliente restaurado (journal, snapshot) con el PIN ya hasheado
+        self.__pin = hash_pin(pin) if pin_hash is None else _hash_guardado(pin_hash)
         self.cuentas = []
 
     # Encapsulamiento: getters y setters seguros
@@ -28,69 +80,235 @@ class Client:
         return self.__usuario
 
     def validar_pin(self, pin: str) -> bool:
-        return self.__pin == pin
+        return _pin_coincide(pin, self.__pin)
 
     def mostrar_datos(self):
         return f"{self.__nombre} {self.__apellido} - DNI: {self.__dni} - Usuario: {self.__usuario}"
 
+    def exportar(self):
+        # Solo para persistencia (journal / checkpoint): el PIN sale hasheado
+        return (self.__nombre, self.__apellido, self.__dni, self.__usuario, self.__pin)
+
 
 class Account:
-    def __init__(self, numero: int, alias: str, cliente: Client):
+    # __weakref__: el libro de una cuenta independiente registra las cuentas con referencias débiles
+    __slots__ = ("numero", "alias", "saldo_centavos", "cliente", "banco", "libro",
+                 "movimientos", "_lock", "_estadisticas", "_ventanas", "__weakref__")
+
+    def __init__(self, numero: int, alias: str, cliente: Client, banco=None):
         self.numero = numero
         self.alias = alias
-        self.saldo = 0.0
+        self.saldo_centavos = 0
         self.cliente = cliente
-        self.transacciones = []
-
-    def depositar(self, monto: float):
-        if monto <= 0:
-            raise ValueError("El monto debe ser mayor a cero.")
-        self.saldo += monto
-        self.transacciones.append(Deposit(monto))
-
-    def retirar(self, monto: float):
-        if monto <= 0:
-            raise ValueError("El monto debe ser mayor a cero.")
-        if monto > self.saldo:
-            raise ValueError("Saldo insuficiente.")
-        self.saldo -= monto
-        self.transacciones.append(Withdrawal(monto))
-
-    def transferir(self, monto: float, destino):
-        if monto <= 0:
-            raise ValueError("El monto debe ser mayor a cero.")
-        if monto > self.saldo:
-            raise ValueError("Saldo insuficiente.")
+        # BankManager dueño de la cuenta (journal y libro); None si es independiente
+        self.banco = banco
+        # Una cuenta independiente lleva su propio libro: los números solo son
+        # únicos dentro de un banco y el libro resuelve contrapartes por número
+        if banco is None:
+            self.libro = Ledger()
+            self.libro.registrar_cuenta(self)
+        else:
+            self.libro = banco.libro
+        # Índices de las filas de esta cuenta en el libro mayor
+        self.movimientos = array("Q")
+        concurrente = banco is not None and banco.concurrente
+        self._lock = threading.Lock() if concurrente else _SIN_BLOQUEO
+        self._estadisticas = None
+        # (ControlVelocidad, ventanas) de los límites del banco; se arman en la primera operación
+        self._ventanas = None
+
+    @property
+    def saldo(self):
+        """Saldo en pesos (Decimal exacto), solo para mostrar."""
+        return a_pesos(self.saldo_centavos)
+
+    @property
+    def transacciones(self):
+        """Historial de la cuenta construido a partir del libro mayor."""
+        return list(self.iterar_transacciones())
+
+    @property
+    def estadisticas(self) -> Estadisticas:
+        """Agregados del historial: se arman en la primera lectura y después se actualizan en O(1)."""
+        if self._estadisticas is None:
+            with self._lock:
+                if self._estadisticas is None:
+                    self._estadisticas = Estadisticas.de_filas(self.libro, self.movimientos)
+        return self._estadisticas
+
+    def iterar_transacciones(self, desde: int = 0):
+        """Recorre el historial de a un movimiento, sin armar la lista completa."""
+        libro = self.libro
+        for k in range(desde, len(self.movimientos)):
+            yield Transaction.de_libro(libro, self.movimientos[k])
+
+    def consultar(self, desde=None, hasta=None, tipos=None, minimo=None, maximo=None):
+        """Movimientos con fecha en [desde, hasta), de los tipos pedidos y monto (centavos) en [minimo, maximo].
+
+        El tramo de fechas se ubica por búsqueda binaria en el historial de la
+        cuenta; solo se recorren los movimientos de ese tramo.
+        """
+        libro = self.libro
+        for i in libro.filtrar(self.movimientos, desde, hasta, tipos, minimo, maximo):
+            yield Transaction.de_libro(libro, i)
+
+    # Los métodos en pesos aceptan int, float, Decimal o texto; los *_centavos
+    # trabajan directo con enteros (journal, lotes, procesos masivos).
+    def depositar(self, monto):
+        self.depositar_centavos(a_centavos(monto))
+
+    def retirar(self, monto):
+        self.retirar_centavos(a_centavos(monto))
+
+    def transferir(self, monto, destino):
+        self.transferir_centavos(a_centavos(monto), destino)
+
+    # El saldo cambia recién después de escribir en el libro: si el libro
+    # rechaza la fila, saldo e historial siguen de acuerdo.
+    @instrumentar("depositar")
+    def depositar_centavos(self, centavos: int, fecha: float = None):
+        _validar_centavos(centavos)
+        with self._lock:
+            if centavos > MAXIMO - self.saldo_centavos:
+                raise ValueError("Saldo fuera de rango.")
+            fila = self.libro.movimiento(self.numero, DEPOSITO, centavos, fecha=fecha)
+            self.saldo_centavos += centavos
+            self.movimientos.append(fila)
+            if self._estadisticas is not None:
+                self._estadisticas.registrar(DEPOSITO, centavos, self.libro.fechas[fila])
+            if self.banco is not None:
+                self.banco.registrar("D", self.numero, centavos, self.libro.fechas[fila])
+
+    @instrumentar("retirar")
+    def retirar_centavos(self, centavos: int, fecha: float = None):
+        _validar_centavos(centavos)
+        with self._lock:
+            if centavos > self.saldo_centavos:
+                raise ValueError("Saldo insuficiente.")
+            limites = self.banco.limites if self.banco is not None else None
+            ahora = time.time() if fecha is None else fecha
+            if limites is not None:
+                limites.consumir(self, RETIRO, centavos, ahora)
+            try:
+                fila = self.libro.movimiento(self.numero, RETIRO, centavos, fecha=fecha)
+            except Exception:
+                # El retiro no se hizo: no cuenta para los límites
+                if limites is not None:
+                    limites.devolver(self, RETIRO, centavos, ahora)
+                raise
+            self.saldo_centavos -= centavos
+            self.movimientos.append(fila)
+            if self._estadisticas is not None:
+                self._estadisticas.registrar(RETIRO, centavos, self.libro.fechas[fila])
+            if self.banco is not None:
+                self.banco.registrar("R", self.numero, centavos, self.libro.fechas[fila])
+
+    @instrumentar("transferir")
+    def transferir_centavos(self, centavos: int, destino, fecha: float = None, referencia: int = None):
+        # referencia: id de la orden permanente que origina la transferencia (queda en el journal)
+        _validar_centavos(centavos)
         if destino == self:
             raise ValueError("No se puede transferir a la misma cuenta.")
-        self.saldo -= monto
-        destino.saldo += monto
-        self.transacciones.append(Transfer(monto, destino.alias))
+        # Orden global por número de cuenta: dos transferencias cruzadas nunca
+        # se bloquean mutuamente.
+        primera, segunda = (self, destino) if self.numero < destino.numero else (destino, self)
+        with primera._lock, segunda._lock:
+            if centavos > self.saldo_centavos:
+                raise ValueError("Saldo insuficiente.")
+            if centavos > MAXIMO - destino.saldo_centavos:
+                raise ValueError("Saldo fuera de rango.")
+            limites = self.banco.limites if self.banco is not None else None
+            ahora = time.time() if fecha is None else fecha
+            if limites is not None:
+                limites.consumir(self, TRANSFERENCIA_ENVIADA, centavos, ahora)
+            try:
+                if destino.libro is self.libro:
+                    salida, entrada = self.libro.transferencia(self.numero, destino.numero, centavos, fecha)
+                else:
+                    # Cuentas de libros distintos: cada pata va al libro de su cuenta
+                    salida = self.libro.movimiento(self.numero, TRANSFERENCIA_ENVIADA, centavos, destino.numero, fecha)
+                    entrada = destino.libro.movimiento(destino.numero, TRANSFERENCIA_RECIBIDA, centavos, self.numero,
+                                                       self.libro.fechas[salida])
+                    # Cada libro conoce a la contraparte para mostrar su alias
+                    self.libro.registrar_cuenta(destino)
+                    destino.libro.registrar_cuenta(self)
+            except Exception:
+                if limites is not None:
+                    limites.devolver(self, TRANSFERENCIA_ENVIADA, centavos, ahora)
+                raise
+            self.saldo_centavos -= centavos
+            destino.saldo_centavos += centavos
+            self.movimientos.append(salida)
+            destino.movimientos.append(entrada)
+            if self._estadisticas is not None:
+                self._estadisticas.registrar(TRANSFERENCIA_ENVIADA, centavos, self.libro.fechas[salida])
+            if destino._estadisticas is not None:
+                destino._estadisticas.registrar(TRANSFERENCIA_RECIBIDA, centavos, destino.libro.fechas[entrada])
+            if self.banco is not None:
+                registro = ("T", self.numero, destino.numero, centavos, self.libro.fechas[salida])
+                self.banco.registrar(*(registro if referencia is None else registro + (referencia,)))
 
     def __str__(self):
-        return f"N°: {self.numero} | Alias: {self.alias} | Saldo: ${self.saldo:.2f}"
+        return f"N°: {self.numero} | Alias: {self.alias} | Saldo: {formatear(self.saldo_centavos)}"
 
 
 class Transaction:
-    def __init__(self, tipo: str, monto: float):
-        self.tipo = tipo
-        self.monto = monto
-        self.fecha = datetime.now().strftime("%d/%m/%Y %H:%M:%S")
+    """Movimiento para mostrar: código de tipo, centavos, instante epoch y contraparte.
+
+    La contraparte de una transferencia es la cuenta (o su número si no está
+    cargada); el texto y la fecha se arman recién al mostrarlos.
+    """
+
+    __slots__ = ("codigo", "centavos", "instante", "contraparte")
+
+    def __init__(self, codigo: int, centavos: int, instante: float = None, contraparte=0):
+        self.codigo = codigo
+        self.centavos = centavos
+        self.instante = time.time() if instante is None else instante
+        self.contraparte = contraparte
+
+    @classmethod
+    def de_libro(cls, libro, fila: int):
+        """Movimiento de la fila `fila` del libro mayor."""
+        tipo = libro.tipos[fila]
+        contraparte = 0
+        if tipo == TRANSFERENCIA_ENVIADA or tipo == TRANSFERENCIA_RECIBIDA:
+            numero = libro.contrapartes[fila]
+            contraparte = libro.resolver(numero) or numero
+        return cls(tipo, libro.montos[fila], libro.fechas[fila], contraparte)
+
+    @property
+    def tipo(self):
+        return describir(self.codigo, self.contraparte)
+
+    @property
+    def monto(self):
+        return a_pesos(self.centavos)
+
+    @property
+    def fecha(self):
+        return formatear_fecha(self.instante)
 
     def __str__(self):
         return f"{self.fecha} - {self.tipo}: ${self.monto:.2f}"
 
 
 class Deposit(Transaction):
+    __slots__ = ()
+
     def __init__(self, monto):
-        super().__init__("Depósito", monto)
+        super().__init__(DEPOSITO, a_centavos(monto))
 
 
 class Withdrawal(Transaction):
+    __slots__ = ()
+
     def __init__(self, monto):
-        super().__init__("Retiro", monto)
+        super().__init__(RETIRO, a_centavos(monto))
 
 
 class Transfer(Transaction):
-    def __init__(self, monto, destino_alias):
-        super().__init__(f"Transferencia a {destino_alias}", monto)
+    __slots__ = ()
+
+    def __init__(self, monto, destino):
+        super().__init__(TRANSFERENCIA_ENVIADA, a_centavos(monto), contraparte=destino)
@@ -0,0 +1,79 @@
+import math
+from array import array
+from decimal import Decimal
+
+try:
+    import numpy as np
+except ImportError:  # numpy es opcional: sin él se usa la suma de Python
+    np = None
+
+# Los montos se manejan en centavos (enteros). Los pesos solo aparecen al
+# leer lo que escribe el usuario y al mostrar.
+CENTAVOS = 100
+# Mayor monto o saldo representable: el libro mayor y el snapshot usan int64
+MAXIMO = 2**63 - 1
+
+
+def parsear(texto: str) -> int:
+    """Convierte texto como "1500", "$12.5" o "12,50" a centavos."""
+    t = texto.strip()
+    if t.startswith("$"):
+        t = t[1:].lstrip()
+    signo = 1
+    if t[:1] in ("-", "+"):
+        signo = -1 if t[0] == "-" else 1
+        t = t[1:]
+    entero, _, decimales = t.replace(",", ".").partition(".")
+    if not entero and not decimales:
+        raise ValueError("Monto inválido.")
+    entero = entero or "0"
+    if (not entero.isascii() or not entero.isdigit() or len(decimales) > 2
+            or (decimales and not (decimales.isascii() and decimales.isdigit()))):
+        raise ValueError("Monto inválido.")
+    return signo * (int(entero) * CENTAVOS + int(decimales.ljust(2, "0") or 0))
+
+
+def a_centavos(monto) -> int:
+    """Convierte un monto en pesos (int, float, Decimal o str) a centavos."""
+    if isinstance(monto, str):
+        centavos = parsear(monto)
+    elif isinstance(monto, bool):
+        raise ValueError("Monto inválido.")
+    elif isinstance(monto, int):
+        centavos = monto * CENTAVOS
+    elif isinstance(monto, float):
+        if not math.isfinite(monto):
+            raise ValueError("Monto inválido.")
+        centavos = round(monto * CENTAVOS)
+    elif isinstance(monto, Decimal):
+        if not monto.is_finite():
+            raise ValueError("Monto inválido.")
+        centavos = int((monto * CENTAVOS).to_integral_value())
+    else:
+        raise ValueError("Monto inválido.")
+    if abs(centavos) > MAXIMO:
+        raise ValueError("Monto fuera de rango.")
+    return centavos
+
+
+def a_pesos(centavos: int) -> Decimal:
+    return Decimal(centavos).scaleb(-2)
+
+
+def formatear(centavos: int) -> str:
+    signo = "-" if centavos < 0 else ""
+    pesos, resto = divmod(abs(centavos), CENTAVOS)
+    return f"${signo}{pesos}.{resto:02d}"
+
+
+def sumar(montos) -> int:
+    """Suma exacta de centavos; vectorizada si recibe un array('q') y hay numpy.
+
+    numpy suma en int64 y desborda sin avisar: solo se usa si ninguna suma
+    parcial puede pasar de MAXIMO; si no, la suma es con enteros de Python.
+    """
+    if np is not None and isinstance(montos, array) and len(montos):
+        valores = np.frombuffer(montos, dtype=np.int64)
+        if len(valores) * max(int(valores.max()), -int(valores.min())) <= MAXIMO:
+            return int(valores.sum())
+    return sum(montos)
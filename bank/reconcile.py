@@ -0,0 +1,261 @@
+"""Conciliación: reconstruye el saldo de cada cuenta desde el libro mayor y lo compara con el registrado.
+
+El saldo de una cuenta se actualiza en el lugar; el libro mayor guarda cada
+movimiento (las dos patas de cada transferencia). Conciliar es sumar, con
+signo, los montos de todas las filas de cada cuenta y comparar con el saldo.
+Con numpy la suma es una pasada vectorizada por tramos de filas; los tramos se
+reparten entre procesos que leen el snapshot por mmap.
+
+Uso: python -m bank.reconcile (--journal RUTA | --snapshot RUTA) [--procesos N]
+Termina con código 1 si hay diferencias. --journal levanta el estado como tras
+un reinicio (checkpoint + journal): usarlo con el banco detenido; con el banco
+en marcha, conciliar el último checkpoint con --snapshot.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+try:
+    import numpy as np
+except ImportError:  # numpy es opcional: sin él se concilia con un dict
+    np = None
+
+from bank.ledger import SIGNOS
+from bank.money import formatear
+from bank.snapshot import SnapshotView
+
+# Filas del libro por pasada: acota la memoria temporal de cada tramo
+TRAMO_FILAS = 1 << 22
+# Rango de números de cuenta hasta el que conviene una tabla directa número -> posición
+TABLA_MAXIMA = 1 << 24
+
+Discrepancia = namedtuple("Discrepancia", "numero registrado calculado")
+
+
+class Conciliacion:
+    """Resultado de una conciliación: diferencias, filas sin cuenta y rendimiento."""
+
+    def __init__(self, cuentas, filas, discrepancias, huerfanas, segundos):
+        self.cuentas = cuentas
+        self.filas = filas
+        self.discrepancias = discrepancias
+        self.huerfanas = huerfanas  # filas cuyo número no es de ninguna cuenta
+        self.segundos = segundos
+
+    @property
+    def ok(self) -> bool:
+        return not self.discrepancias and not self.huerfanas
+
+    @property
+    def filas_por_segundo(self) -> float:
+        return self.filas / self.segundos if self.segundos else 0.0
+
+    def __str__(self):
+        lineas = [f"Conciliación: {self.cuentas} cuentas, {self.filas} filas en {self.segundos:.2f} s "
+                  f"({self.filas_por_segundo / 1e6:.1f} M filas/s)"]
+        if self.ok:
+            lineas.append("Sin diferencias.")
+        for d in self.discrepancias[:20]:
+            lineas.append(f"N° {d.numero}: registrado {formatear(d.registrado)}, "
+                          f"según el libro {formatear(d.calculado)}")
+        if len(self.discrepancias) > 20:
+            lineas.append(f"... y {len(self.discrepancias) - 20} diferencias más")
+        if self.huerfanas:
+            lineas.append(f"{self.huerfanas} filas del libro no corresponden a ninguna cuenta")
+        return "\n".join(lineas)
+
+
+# ---------- Núcleo vectorizado ----------
+def tabla_posiciones(ordenados):
+    """Tabla número - mínimo -> posición en `ordenados` (-1 si no es cuenta), o None si el rango es grande."""
+    if not len(ordenados) or int(ordenados[-1] - ordenados[0]) >= TABLA_MAXIMA:
+        return None
+    tabla = np.full(int(ordenados[-1] - ordenados[0]) + 1, -1, dtype=np.int32)
+    tabla[(ordenados - ordenados[0]).astype(np.intp)] = np.arange(len(ordenados), dtype=np.int32)
+    return tabla
+
+
+def sumas_por_cuenta(ordenados, numeros, tipos, montos, tabla=None):
+    """Suma con signo de los montos de cada cuenta, en una pasada.
+
+    `ordenados` son los números de cuenta ordenados (ndarray uint64); las
+    columnas son arrays o bytes de un tramo del libro. Con `tabla` (ver
+    tabla_posiciones) cada fila se ubica con un acceso directo en lugar de
+    una búsqueda binaria. Devuelve (sumas alineadas con `ordenados`,
+    cantidad de filas sin cuenta).
+    """
+    numeros = np.frombuffer(numeros, dtype=np.uint64)
+    tipos = np.frombuffer(tipos, dtype=np.uint8)
+    montos = np.frombuffer(montos, dtype=np.int64)
+    sumas = np.zeros(len(ordenados), dtype=np.int64)
+    if not len(ordenados):
+        return sumas, len(numeros)
+    if tabla is not None:
+        # Los números fuera del rango dan la vuelta y caen fuera de la tabla
+        relativos = numeros - ordenados[0]
+        dentro = relativos < len(tabla)
+        posiciones = np.where(dentro, tabla[np.where(dentro, relativos, 0).astype(np.intp)], -1)
+        validas = posiciones >= 0
+    else:
+        posiciones = np.minimum(np.searchsorted(ordenados, numeros), len(ordenados) - 1)
+        validas = ordenados[posiciones] == numeros
+    importes = montos * np.asarray(SIGNOS, dtype=np.int64)[tipos]
+    # add.at acumula en int64 (exacto); bincount pasaría por float64
+    np.add.at(sumas, posiciones[validas], importes[validas])
+    return sumas, len(numeros) - int(np.count_nonzero(validas))
+
+
+def _informe(numeros, saldos, calculados, huerfanas, filas, inicio):
+    if np is not None:
+        distintas = np.flatnonzero(saldos != calculados)
+        discrepancias = [Discrepancia(int(numeros[k]), int(saldos[k]), int(calculados[k])) for k in distintas]
+    else:
+        discrepancias = [Discrepancia(n, s, c) for n, s, c in zip(numeros, saldos, calculados) if s != c]
+    return Conciliacion(len(numeros), filas, discrepancias, huerfanas, time.perf_counter() - inicio)
+
+
+def _conciliar_python(numeros, saldos, libro, filas, inicio):
+    posicion = {numero: k for k, numero in enumerate(numeros)}
+    calculados = [0] * len(numeros)
+    huerfanas = 0
+    for desde in range(0, filas, TRAMO_FILAS):
+        tramo = libro.copiar_columnas(("numeros", "tipos", "montos"), desde, min(desde + TRAMO_FILAS, filas))
+        for numero, tipo, monto in zip(*tramo):
+            k = posicion.get(numero)
+            if k is None:
+                huerfanas += 1
+            else:
+                calculados[k] += SIGNOS[tipo] * monto
+    return _informe(numeros, saldos, calculados, huerfanas, filas, inicio)
+
+
+def conciliar(banco, procesos: int = 1) -> Conciliacion:
+    """Reconstruye los saldos de todas las cuentas de `banco` desde su libro y los compara.
+
+    Con procesos > 1 el estado se pasa como snapshot temporal y los tramos del
+    libro se suman en paralelo (ver conciliar_snapshot). Con el banco
+    recibiendo operaciones el resultado puede mostrar diferencias transitorias:
+    para un corte exacto conviene conciliar un checkpoint.
+    """
+    if procesos > 1 and np is not None:
+        with tempfile.TemporaryDirectory() as temporal:
+            ruta = os.path.join(temporal, "conciliacion.snap")
+            inicio = time.perf_counter()
+            banco.guardar_snapshot(ruta)
+            resultado = conciliar_snapshot(ruta, procesos)
+            resultado.segundos = time.perf_counter() - inicio
+            return resultado
+
+    inicio = time.perf_counter()
+    numeros, saldos = banco.saldos_registrados()
+    filas = len(banco.libro)
+    if np is None:
+        return _conciliar_python(numeros, saldos, banco.libro, filas, inicio)
+    numeros = np.frombuffer(numeros, dtype=np.uint64)
+    orden = np.argsort(numeros, kind="stable")
+    ordenados = numeros[orden]
+    tabla = tabla_posiciones(ordenados)
+    calculados = np.zeros(len(ordenados), dtype=np.int64)
+    huerfanas = 0
+    for desde in range(0, filas, TRAMO_FILAS):
+        tramo = banco.libro.copiar_columnas(("numeros", "tipos", "montos"), desde, min(desde + TRAMO_FILAS, filas))
+        sumas, sin_cuenta = sumas_por_cuenta(ordenados, *tramo, tabla=tabla)
+        calculados += sumas
+        huerfanas += sin_cuenta
+    saldos = np.frombuffer(saldos, dtype=np.int64)[orden]
+    return _informe(ordenados, saldos, calculados, huerfanas, filas, inicio)
+
+
+# ---------- En paralelo sobre un snapshot ----------
+_vista_trabajador = None
+_ordenados_trabajador = None
+_tabla_trabajador = None
+
+
+def _inicializar_trabajador(ruta_snapshot):
+    # Cada proceso mapea el snapshot y ordena los números de cuenta una sola vez
+    global _vista_trabajador, _ordenados_trabajador, _tabla_trabajador
+    _vista_trabajador = SnapshotView(ruta_snapshot)
+    numeros, _ = _vista_trabajador.saldos()
+    _ordenados_trabajador = np.sort(np.frombuffer(numeros, dtype=np.uint64))
+    _tabla_trabajador = tabla_posiciones(_ordenados_trabajador)
+
+
+def _sumar_rango_trabajador(desde, hasta):
+    return _sumar_rango(_vista_trabajador, _ordenados_trabajador, _tabla_trabajador, desde, hasta)
+
+
+def _sumar_rango(vista, ordenados, tabla, desde, hasta):
+    total = np.zeros(len(ordenados), dtype=np.int64)
+    huerfanas = 0
+    for inicio in range(desde, hasta, TRAMO_FILAS):
+        fin = min(inicio + TRAMO_FILAS, hasta)
+        columnas = [vista.columna_libro(nombre, inicio, fin) for nombre in ("numeros", "tipos", "montos")]
+        sumas, sin_cuenta = sumas_por_cuenta(ordenados, *columnas, tabla=tabla)
+        total += sumas
+        huerfanas += sin_cuenta
+    return total, huerfanas
+
+
+def conciliar_snapshot(ruta: str, procesos: int = None) -> Conciliacion:
+    """Concilia un snapshot o checkpoint; cada proceso suma un rango de filas del libro."""
+    inicio = time.perf_counter()
+    vista = SnapshotView(ruta)
+    numeros, saldos = vista.saldos()
+    filas = vista.n_filas
+    vista.cerrar()
+    if np is None:
+        from bank.manager import BankManager
+        return conciliar(BankManager.cargar_snapshot(ruta))
+
+    numeros = np.frombuffer(numeros, dtype=np.uint64)
+    orden = np.argsort(numeros, kind="stable")
+    ordenados, saldos = numeros[orden], np.frombuffer(saldos, dtype=np.int64)[orden]
+    procesos = procesos or os.cpu_count() or 1
+    por_proceso = -(-filas // procesos) or 1
+    rangos = [(desde, min(desde + por_proceso, filas)) for desde in range(0, filas, por_proceso)]
+    calculados = np.zeros(len(ordenados), dtype=np.int64)
+    huerfanas = 0
+    if len(rangos) == 1:
+        vista = SnapshotView(ruta)
+        try:
+            calculados, huerfanas = _sumar_rango(vista, ordenados, tabla_posiciones(ordenados), 0, filas)
+        finally:
+            vista.cerrar()
+    elif rangos:
+        with ProcessPoolExecutor(len(rangos), mp_context=get_context("spawn"),
+                                 initializer=_inicializar_trabajador, initargs=(ruta,)) as pool:
+            for sumas, sin_cuenta in pool.map(_sumar_rango_trabajador, *zip(*rangos)):
+                calculados += sumas
+                huerfanas += sin_cuenta
+    return _informe(ordenados, saldos, calculados, huerfanas, filas, inicio)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Conciliación de saldos contra el libro mayor")
+    origen = parser.add_mutually_exclusive_group(required=True)
+    origen.add_argument("--journal", help="checkpoint + journal (estado tras un reinicio)")
+    origen.add_argument("--snapshot", help="snapshot o checkpoint")
+    parser.add_argument("--procesos", type=int, default=1)
+    args = parser.parse_args(argv)
+    if args.snapshot:
+        resultado = conciliar_snapshot(args.snapshot, args.procesos)
+    else:
+        from bank.manager import BankManager
+        banco = BankManager()
+        banco.abrir_journal(args.journal)
+        try:
+            resultado = conciliar(banco, args.procesos)
+        finally:
+            banco.cerrar()
+    print(resultado)
+    return 0 if resultado.ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
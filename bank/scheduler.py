@@ -0,0 +1,299 @@
+"""Órdenes permanentes: transferencias programadas y recurrentes sobre Account.transferir.
+
+Las órdenes viven en un dict por id y sus vencimientos en un heap de
+(próxima, id): ejecutar() saca del heap solo las vencidas, así que el costo
+depende de cuántas vencen y no de cuántas hay programadas. Cancelar o
+reprogramar no busca en el heap: la entrada vieja queda y se descarta al
+salir porque ya no coincide con la orden.
+
+Cada ejecución es una transferencia normal; su registro en el journal lleva
+el id de la orden, así que el replay avanza la orden junto con la
+transferencia. Altas, bajas y fallos también van al journal y el programa
+completo se guarda junto a cada checkpoint (ver guardar y cargar).
+"""
+import heapq
+import os
+import struct
+import threading
+import time
+from array import array
+from calendar import monthrange
+from datetime import datetime, timedelta
+
+from bank.ledger import instante
+
+# Órdenes por tanda en ejecutar(); el journal se sincroniza una vez por tanda
+TANDA = 1024
+# Intentos extra ante un rechazo (p. ej. saldo insuficiente) y espera entre intentos
+REINTENTOS = 3
+ESPERA_REINTENTO = 3600.0
+
+# Formato binario del programa: cabecera + una columna por campo de Orden, en el orden de COLUMNAS
+MAGICO = b"BNKO"
+VERSION = 1
+CABECERA = struct.Struct("<4sHxxQQ")  # mágico, versión, cantidad de órdenes, siguiente id
+COLUMNAS = (("id", "Q"), ("origen", "Q"), ("destino", "Q"), ("centavos", "q"), ("inicio", "d"),
+            ("dias", "q"), ("meses", "q"), ("veces", "q"), ("hechas", "q"), ("intentos", "q"),
+            ("proxima", "d"))
+SIN_LIMITE = -1  # valor de `veces` en el archivo para órdenes sin fin
+
+
+def ocurrencia(inicio: float, dias: int, meses: int, n: int) -> float:
+    """Instante de la ocurrencia n (desde 0) de una orden que empieza en `inicio`.
+
+    Se cuenta siempre desde el inicio: una orden del 31 cae el 30 en abril y
+    vuelve al 31 en mayo.
+    """
+    if not n or not (dias or meses):
+        return inicio
+    base = datetime.fromtimestamp(inicio)
+    total = base.month - 1 + meses * n
+    anio, mes = base.year + total // 12, total % 12 + 1
+    fecha = base.replace(year=anio, month=mes, day=min(base.day, monthrange(anio, mes)[1]))
+    return (fecha + timedelta(days=dias * n)).timestamp()
+
+
+class Orden:
+    """Transferencia programada de `origen` a `destino` (números de cuenta), en centavos.
+
+    Se repite cada `dias` días y `meses` meses (las dos en 0: una sola vez)
+    hasta completar `veces` ocurrencias (None: sin fin). `hechas` cuenta las
+    ocurrencias ya resueltas, ejecutadas u omitidas tras agotar los reintentos.
+    """
+
+    __slots__ = ("id", "origen", "destino", "centavos", "inicio", "dias", "meses", "veces",
+                 "hechas", "intentos", "proxima")
+
+    def __init__(self, id_, origen, destino, centavos, inicio, dias=0, meses=0, veces=None,
+                 hechas=0, intentos=0, proxima=None):
+        self.id = id_
+        self.origen = origen
+        self.destino = destino
+        self.centavos = centavos
+        self.inicio = inicio
+        self.dias = dias
+        self.meses = meses
+        self.veces = 1 if not (dias or meses) else veces
+        self.hechas = hechas
+        self.intentos = intentos
+        self.proxima = ocurrencia(inicio, dias, meses, hechas) if proxima is None else proxima
+
+    @property
+    def terminada(self) -> bool:
+        return self.veces is not None and self.hechas >= self.veces
+
+    def programada(self) -> float:
+        """Instante de la ocurrencia pendiente (sin contar los reintentos)."""
+        return ocurrencia(self.inicio, self.dias, self.meses, self.hechas)
+
+
+class Ejecucion:
+    """Resultado de una pasada de ejecutar(): cuántas órdenes terminaron en cada estado."""
+
+    def __init__(self):
+        self.ejecutadas = 0
+        self.reintentos = 0  # rechazadas, con otro intento programado
+        self.omitidas = 0  # rechazadas sin reintentos: se pasa a la próxima ocurrencia
+        self.canceladas = 0  # origen o destino inexistente
+        self.tandas = 0
+        self.segundos = 0.0
+
+    @property
+    def vencidas(self) -> int:
+        return self.ejecutadas + self.reintentos + self.omitidas + self.canceladas
+
+    @property
+    def ordenes_por_segundo(self) -> float:
+        return self.vencidas / self.segundos if self.segundos else 0.0
+
+    def __str__(self):
+        return (f"Órdenes: {self.ejecutadas} ejecutadas, {self.reintentos} a reintentar, "
+                f"{self.omitidas} omitidas, {self.canceladas} canceladas en {self.tandas} tandas "
+                f"({self.segundos:.2f} s)")
+
+
+class Programador:
+    """Órdenes permanentes de un BankManager; ejecutar() dispara las vencidas."""
+
+    def __init__(self, banco, reintentos: int = REINTENTOS, espera: float = ESPERA_REINTENTO):
+        self.banco = banco
+        self.reintentos = reintentos
+        self.espera = espera
+        self.ordenes = {}  # id -> Orden
+        self._heap = []  # (proxima, id); puede tener entradas viejas
+        self._siguiente_id = 1
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self.ordenes)
+
+    def programar(self, origen, destino, centavos: int, inicio=None, dias: int = 0, meses: int = 0,
+                  veces: int = None) -> Orden:
+        """Programa una transferencia; `origen` y `destino` son cuentas o números de cuenta.
+
+        `inicio` (datetime, date o epoch; None = ahora) es la primera ocurrencia.
+        """
+        origen = getattr(origen, "numero", origen)
+        destino = getattr(destino, "numero", destino)
+        if centavos <= 0:
+            raise ValueError("El monto debe ser mayor a cero.")
+        if origen == destino:
+            raise ValueError("No se puede transferir a la misma cuenta.")
+        if dias < 0 or meses < 0 or (veces is not None and veces <= 0):
+            raise ValueError("Periodicidad inválida.")
+        inicio = time.time() if inicio is None else instante(inicio)
+        with self._lock:
+            orden = Orden(self._siguiente_id, origen, destino, centavos, inicio, dias, meses, veces)
+            self.alta(orden)
+            self.banco.registrar("P", orden.id, origen, destino, centavos, inicio, dias, meses, veces)
+        return orden
+
+    def cancelar(self, id_: int) -> bool:
+        with self._lock:
+            if self.ordenes.pop(id_, None) is None:
+                return False
+            self.banco.registrar("X", id_)
+            return True
+
+    def proxima(self):
+        """Instante del próximo vencimiento, o None si no hay órdenes."""
+        with self._lock:
+            while self._heap and not self._vigente(*self._heap[0]):
+                heapq.heappop(self._heap)
+            return self._heap[0][0] if self._heap else None
+
+    # ---------- Ejecución ----------
+    def ejecutar(self, ahora=None, tanda: int = TANDA) -> Ejecucion:
+        """Ejecuta las órdenes con vencimiento <= ahora, en tandas de `tanda`.
+
+        Las ocurrencias atrasadas se ponen al día en la misma pasada. Un
+        rechazo (ValueError de la cuenta) se reintenta `reintentos` veces cada
+        `espera` segundos; después se omite esa ocurrencia.
+        """
+        ahora = time.time() if ahora is None else instante(ahora)
+        resultado = Ejecucion()
+        inicio = time.perf_counter()
+        while True:
+            with self._lock:
+                vencidas = self._vencidas(ahora, tanda)
+                for orden in vencidas:
+                    self._ejecutar_orden(orden, ahora, resultado)
+            if not vencidas:
+                break
+            resultado.tandas += 1
+            if self.banco.journal is not None:
+                self.banco.journal.sincronizar()
+        resultado.segundos = time.perf_counter() - inicio
+        return resultado
+
+    def _vigente(self, proxima, id_):
+        orden = self.ordenes.get(id_)
+        return orden is not None and orden.proxima == proxima
+
+    def _vencidas(self, ahora, tanda):
+        vencidas = []
+        heap = self._heap
+        while heap and heap[0][0] <= ahora and len(vencidas) < tanda:
+            proxima, id_ = heapq.heappop(heap)
+            if self._vigente(proxima, id_):
+                vencidas.append(self.ordenes[id_])
+        return vencidas
+
+    def _ejecutar_orden(self, orden, ahora, resultado):
+        origen = self.banco._buscar_cuenta(orden.origen)
+        destino = self.banco._buscar_cuenta(orden.destino)
+        if origen is None or destino is None:
+            del self.ordenes[orden.id]
+            self.banco.registrar("X", orden.id)
+            resultado.canceladas += 1
+            return
+        try:
+            origen.transferir_centavos(orden.centavos, destino, referencia=orden.id)
+        except ValueError:
+            if orden.intentos < self.reintentos:
+                self.reprogramar(orden.id, orden.hechas, orden.intentos + 1, ahora + self.espera)
+                resultado.reintentos += 1
+            else:
+                self.reprogramar(orden.id, orden.hechas + 1, 0)
+                resultado.omitidas += 1
+            self.banco.registrar("F", orden.id, orden.hechas, orden.intentos, orden.proxima)
+            return
+        self.cumplida(orden.id)
+        resultado.ejecutadas += 1
+
+    # ---------- Cambios de estado (también los usa el replay del journal) ----------
+    def alta(self, orden):
+        self.ordenes[orden.id] = orden
+        self._siguiente_id = max(self._siguiente_id, orden.id + 1)
+        heapq.heappush(self._heap, (orden.proxima, orden.id))
+
+    def baja(self, id_):
+        with self._lock:
+            self.ordenes.pop(id_, None)
+
+    def cumplida(self, id_):
+        """La ocurrencia pendiente de la orden se ejecutó: pasa a la siguiente."""
+        with self._lock:
+            orden = self.ordenes.get(id_)
+            if orden is not None:
+                self.reprogramar(id_, orden.hechas + 1, 0)
+
+    def reprogramar(self, id_, hechas, intentos, proxima=None):
+        """Deja la orden con `hechas` ocurrencias resueltas; proxima None = la ocurrencia que sigue."""
+        with self._lock:
+            orden = self.ordenes.get(id_)
+            if orden is None:
+                return
+            orden.hechas, orden.intentos = hechas, intentos
+            if orden.terminada:
+                del self.ordenes[id_]
+                return
+            orden.proxima = orden.programada() if proxima is None else proxima
+            heapq.heappush(self._heap, (orden.proxima, id_))
+
+    # ---------- Persistencia ----------
+    def guardar(self, ruta: str):
+        """Escribe todas las órdenes en `ruta` (columnas binarias) de forma atómica."""
+        with self._lock:
+            ordenes = list(self.ordenes.values())
+            columnas = []
+            for campo, codigo in COLUMNAS:
+                valores = (getattr(orden, campo) for orden in ordenes)
+                if campo == "veces":
+                    valores = (SIN_LIMITE if v is None else v for v in valores)
+                columnas.append(array(codigo, valores).tobytes())
+            cabecera = CABECERA.pack(MAGICO, VERSION, len(ordenes), self._siguiente_id)
+        temporal = ruta + ".tmp"
+        with open(temporal, "wb") as f:
+            f.write(cabecera)
+            for columna in columnas:
+                f.write(columna)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporal, ruta)
+
+    def cargar(self, ruta: str):
+        """Reemplaza las órdenes por las guardadas en `ruta`."""
+        with open(ruta, "rb") as f:
+            datos = f.read()
+        magico, version, n, siguiente = CABECERA.unpack_from(datos)
+        if magico != MAGICO or version != VERSION:
+            raise ValueError("Archivo de órdenes inválido.")
+        columnas = []
+        posicion = CABECERA.size
+        for _, codigo in COLUMNAS:
+            columna = array(codigo)
+            columna.frombytes(datos[posicion:posicion + n * columna.itemsize])
+            posicion += n * columna.itemsize
+            columnas.append(columna)
+        with self._lock:
+            self.ordenes = {}
+            for valores in zip(*columnas):
+                orden = Orden(*valores)
+                if orden.veces == SIN_LIMITE:
+                    orden.veces = None
+                self.ordenes[orden.id] = orden
+            # heapify es O(n): cargar millones de órdenes no paga n inserciones
+            self._heap = [(orden.proxima, orden.id) for orden in self.ordenes.values()]
+            heapq.heapify(self._heap)
+            self._siguiente_id = siguiente
@@ -0,0 +1,72 @@
+from array import array
+from bisect import bisect_left, bisect_right, insort
+from collections import namedtuple
+
+# Sugerencia de cuenta destino: lo necesario para elegir sin materializar la cuenta
+Destino = namedtuple("Destino", "alias numero titular")
+
+# Altas nuevas que se insertan de a una; con más que eso conviene reordenar todo
+INSERCION_MAXIMA = 1024
+
+
+def normalizar(texto: str) -> str:
+    """Forma de comparación de las búsquedas: sin mayúsculas ni espacios en los bordes."""
+    return texto.strip().casefold()
+
+
+class SortedIndex:
+    """Posiciones (de clientes o cuentas) ordenadas por `clave(posicion)`.
+
+    Solo guarda enteros: las claves se leen de los objetos (o del snapshot)
+    durante la búsqueda binaria. Se pone al día a pedido con actualizar().
+    """
+
+    def __init__(self, clave, posiciones=None):
+        self.clave = clave
+        self.posiciones = posiciones if posiciones is not None else array("I")
+
+    def __len__(self):
+        return len(self.posiciones)
+
+    def actualizar(self, total: int):
+        """Incorpora las posiciones nuevas hasta `total` (las altas solo se agregan al final)."""
+        desde = len(self.posiciones)
+        if total - desde > INSERCION_MAXIMA:
+            self.posiciones = array(self.posiciones.typecode, sorted(range(total), key=self.clave))
+        else:
+            for posicion in range(desde, total):
+                insort(self.posiciones, posicion, key=self.clave)
+
+    def agregar(self, nuevas):
+        """Incorpora posiciones arbitrarias (p. ej. las filas nuevas de un tipo de movimiento)."""
+        if len(nuevas) > INSERCION_MAXIMA:
+            todas = self.posiciones.tolist()
+            todas.extend(nuevas)
+            self.posiciones = array(self.posiciones.typecode, sorted(todas, key=self.clave))
+        else:
+            for posicion in nuevas:
+                insort(self.posiciones, posicion, key=self.clave)
+
+    def entre(self, minimo=None, maximo=None):
+        """(i, j): el tramo del índice con clave en [minimo, maximo] (None = sin límite)."""
+        i = 0 if minimo is None else bisect_left(self.posiciones, minimo, key=self.clave)
+        j = len(self.posiciones) if maximo is None else bisect_right(self.posiciones, maximo, key=self.clave)
+        return i, max(i, j)
+
+    def despues_de(self, clave) -> int:
+        """Lugar en el índice del primer elemento con clave mayor que `clave`."""
+        return bisect_right(self.posiciones, clave, key=self.clave)
+
+    def con_prefijo(self, prefijo: str, desde: int = 0, tanda: int = 256):
+        """Genera las posiciones cuya clave empieza con `prefijo`, en orden."""
+        i = bisect_left(self.posiciones, prefijo, key=self.clave) + desde
+        while True:
+            # Se copia de a tandas: una alta concurrente no corre las posiciones ya leídas
+            bloque = self.posiciones[i:i + tanda]
+            if not bloque:
+                return
+            for posicion in bloque:
+                if not self.clave(posicion).startswith(prefijo):
+                    return
+                yield posicion
+            i += len(bloque)
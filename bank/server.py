@@ -0,0 +1,260 @@
+"""Servicio de red asyncio (JSON por líneas sobre TCP) para BankManager.
+
+Cada línea es un pedido {"id": ..., "op": ..., ...} y cada respuesta es una
+línea {"id": ..., "ok": true, "resultado": ...} o {"id": ..., "ok": false,
+"error": ...}. Un cliente puede mandar muchos pedidos sin esperar (pipelining);
+las respuestas de una conexión salen en el mismo orden que los pedidos.
+
+Los pedidos se encolan y una sola tarea los aplica en micro-lotes: todo lo
+que llegó mientras se procesaba el lote anterior se aplica de corrido y, si
+el lote tuvo escrituras y hay journal, se hace un único fsync antes de responder.
+
+Uso: python -m bank.server [--host 127.0.0.1] [--puerto 8765] [--journal ruta] [--metricas puerto]
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from bank.limits import LIMITES
+from bank.manager import BankManager
+from bank.metrics import METRICAS
+from bank.money import a_centavos
+
+ESCRITURAS = {"crear_cliente", "crear_cuenta", "depositar", "retirar", "transferir",
+              "programar_transferencia", "cancelar_orden", "ejecutar_ordenes"}
+# Segundos entre pasadas de las órdenes permanentes vencidas
+INTERVALO_ORDENES = 1.0
+
+
+class BankServer:
+    def __init__(self, banco: BankManager, lote_maximo: int = 1024, intervalo_ordenes: float = INTERVALO_ORDENES):
+        self.banco = banco
+        self.lote_maximo = lote_maximo
+        self.intervalo_ordenes = intervalo_ordenes
+        self._pendientes = None
+        self._aplicador = None
+        self._reloj = None
+        self._servidor = None
+        self.operaciones = {
+            "crear_cliente": self._crear_cliente,
+            "crear_cuenta": self._crear_cuenta,
+            "depositar": self._depositar,
+            "retirar": self._retirar,
+            "transferir": self._transferir,
+            "programar_transferencia": self._programar_transferencia,
+            "cancelar_orden": self._cancelar_orden,
+            "ejecutar_ordenes": self._ejecutar_ordenes,
+            "buscar_cliente": self._buscar_cliente,
+            "buscar_cuenta": self._buscar_cuenta,
+            "buscar_alias": self._buscar_alias,
+        }
+
+    # ---- Operaciones ----
+    @staticmethod
+    def _centavos(pedido):
+        if "centavos" in pedido:
+            return int(pedido["centavos"])
+        return a_centavos(pedido["monto"])
+
+    def _cuenta(self, numero):
+        cuenta = self.banco.buscar_cuenta_por_numero(numero)
+        if cuenta is None:
+            raise ValueError("Cuenta inexistente.")
+        return cuenta
+
+    def _crear_cliente(self, p):
+        self.banco.crear_cliente(p["nombre"], p["apellido"], p["dni"], p["usuario"], p["pin"])
+        return p["usuario"]
+
+    def _crear_cuenta(self, p):
+        cliente = self.banco.buscar_cliente(p["usuario"])
+        if cliente is None:
+            raise ValueError("Cliente inexistente.")
+        return self.banco.crear_cuenta(cliente, p["alias"]).numero
+
+    def _depositar(self, p):
+        cuenta = self._cuenta(p["numero"])
+        cuenta.depositar_centavos(self._centavos(p))
+        return cuenta.saldo_centavos
+
+    def _retirar(self, p):
+        cuenta = self._cuenta(p["numero"])
+        cuenta.retirar_centavos(self._centavos(p))
+        return cuenta.saldo_centavos
+
+    def _transferir(self, p):
+        origen = self._cuenta(p["origen"])
+        origen.transferir_centavos(self._centavos(p), self._cuenta(p["destino"]))
+        return origen.saldo_centavos
+
+    def _programar_transferencia(self, p):
+        orden = self.banco.programar_transferencia(
+            self._cuenta(p["origen"]), self._cuenta(p["destino"]), self._centavos(p), p.get("inicio"),
+            int(p.get("dias", 0)), int(p.get("meses", 0)), p.get("veces"))
+        return orden.id
+
+    def _cancelar_orden(self, p):
+        return self.banco.programador.cancelar(p["orden"])
+
+    def _ejecutar_ordenes(self, p):
+        resultado = self.banco.ejecutar_ordenes()
+        return {"ejecutadas": resultado.ejecutadas, "reintentos": resultado.reintentos,
+                "omitidas": resultado.omitidas, "canceladas": resultado.canceladas}
+
+    @staticmethod
+    def _datos_cuenta(cuenta):
+        return {"numero": cuenta.numero, "alias": cuenta.alias,
+                "saldo_centavos": cuenta.saldo_centavos, "usuario": cuenta.cliente.usuario}
+
+    def _buscar_cliente(self, p):
+        cliente = self.banco.buscar_cliente(p["usuario"])
+        if cliente is None:
+            return None
+        return {"usuario": cliente.usuario, "nombre": cliente.nombre, "apellido": cliente.apellido,
+                "dni": cliente.dni, "cuentas": [c.numero for c in cliente.cuentas]}
+
+    def _buscar_cuenta(self, p):
+        return self._datos_cuenta(self._cuenta(p["numero"]))
+
+    def _buscar_alias(self, p):
+        return [self._datos_cuenta(c) for c in self.banco.buscar_cuenta_por_alias(p["alias"])]
+
+    def procesar(self, pedido):
+        """Ejecuta un pedido ya decodificado y devuelve la respuesta (dict)."""
+        id_ = pedido.get("id")
+        operacion = self.operaciones.get(pedido.get("op"))
+        if operacion is None:
+            return {"id": id_, "ok": False, "error": "Operación desconocida."}
+        try:
+            return {"id": id_, "ok": True, "resultado": operacion(pedido)}
+        except (ValueError, KeyError, TypeError) as e:
+            mensaje = f"Falta el campo {e}." if isinstance(e, KeyError) else str(e)
+            return {"id": id_, "ok": False, "error": mensaje}
+        except Exception as e:
+            # Cualquier otra falla queda en la respuesta de ese pedido: el aplicador sigue atendiendo
+            return {"id": id_, "ok": False, "error": f"Error interno: {e}"}
+
+    # ---- Micro-lotes de escrituras ----
+    async def _aplicar_lotes(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            lote = [await self._pendientes.get()]
+            while len(lote) < self.lote_maximo and not self._pendientes.empty():
+                lote.append(self._pendientes.get_nowait())
+            try:
+                respuestas = [self.procesar(pedido) for pedido, _ in lote]
+                escribio = any(pedido.get("op") in ESCRITURAS for pedido, _ in lote)
+                if escribio and self.banco.journal is not None:
+                    # Un solo fsync por lote; las respuestas salen ya durables
+                    await loop.run_in_executor(None, self.banco.journal.sincronizar)
+            except Exception as e:
+                # Si falla el lote (p. ej. el fsync) ninguna respuesta es confiable
+                respuestas = [{"id": pedido.get("id"), "ok": False, "error": f"Error interno: {e}"}
+                              for pedido, _ in lote]
+            for (_, futuro), respuesta in zip(lote, respuestas):
+                if not futuro.done():
+                    futuro.set_result(respuesta)
+
+    async def _disparar_ordenes(self):
+        # Las órdenes vencidas entran a la cola como un pedido más: se aplican
+        # en orden con las demás escrituras y sin carreras con el aplicador.
+        while True:
+            await asyncio.sleep(self.intervalo_ordenes)
+            proxima = self.banco.programador.proxima()
+            if proxima is not None and proxima <= time.time():
+                self._pendientes.put_nowait(({"op": "ejecutar_ordenes"}, asyncio.get_running_loop().create_future()))
+
+    def _despachar(self, linea):
+        futuro = asyncio.get_running_loop().create_future()
+        try:
+            pedido = json.loads(linea)
+            if not isinstance(pedido, dict):
+                raise ValueError
+        except ValueError:
+            futuro.set_result({"id": None, "ok": False, "error": "JSON inválido."})
+            return futuro
+        # Las lecturas también pasan por la cola: así ven las escrituras previas
+        self._pendientes.put_nowait((pedido, futuro))
+        return futuro
+
+    # ---- Conexiones ----
+    async def _atender(self, lector, escritor):
+        en_vuelo = asyncio.Queue()
+
+        async def responder():
+            while True:
+                futuro = await en_vuelo.get()
+                if futuro is None:
+                    break
+                respuesta = await futuro
+                escritor.write(json.dumps(respuesta, ensure_ascii=False).encode("utf-8") + b"\n")
+                if en_vuelo.empty():
+                    await escritor.drain()
+
+        tarea = asyncio.create_task(responder())
+        try:
+            while True:
+                linea = await lector.readline()
+                if not linea:
+                    break
+                if linea.strip():
+                    en_vuelo.put_nowait(self._despachar(linea))
+        finally:
+            en_vuelo.put_nowait(None)
+            try:
+                await tarea
+            except ConnectionError:
+                pass
+            escritor.close()
+
+    async def iniciar(self, host="127.0.0.1", puerto=8765):
+        self._pendientes = asyncio.Queue()
+        self._aplicador = asyncio.create_task(self._aplicar_lotes())
+        self._reloj = asyncio.create_task(self._disparar_ordenes())
+        self._servidor = await asyncio.start_server(self._atender, host, puerto, limit=1 << 20)
+        return self._servidor.sockets[0].getsockname()[:2]
+
+    async def detener(self):
+        self._servidor.close()
+        await self._servidor.wait_closed()
+        for tarea in (self._reloj, self._aplicador):
+            tarea.cancel()
+            try:
+                await tarea
+            except asyncio.CancelledError:
+                pass
+
+
+async def _servir(args):
+    banco = BankManager()
+    if args.journal:
+        banco.abrir_journal(args.journal)
+    banco.configurar_limites(LIMITES)
+    servidor = BankServer(banco)
+    host, puerto = await servidor.iniciar(args.host, args.puerto)
+    print(f"Escuchando en {host}:{puerto}")
+    if args.metricas is not None:
+        METRICAS.servir_prometheus(args.host, args.metricas)
+        print(f"Métricas en http://{args.host}:{args.metricas}/metrics")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await servidor.detener()
+        banco.cerrar()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servicio JSON para el sistema bancario")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--puerto", type=int, default=8765)
+    parser.add_argument("--journal", default=None)
+    parser.add_argument("--metricas", type=int, default=None, help="puerto HTTP para /metrics (Prometheus)")
+    try:
+        asyncio.run(_servir(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
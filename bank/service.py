@@ -0,0 +1,194 @@
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional
+
+from bank.models import Account, Client, Transaction
+from bank.search import Destino
+from bank.stats import Estadisticas
+
+# Operación -> nombres aceptados en el backend (API en español o la vieja en inglés)
+ADAPTADORES_BANCO = {
+    "crear_cliente": ("crear_cliente", "create_client"),
+    "buscar_cliente": ("buscar_cliente", "find_client_by_username", "find_client"),
+    "crear_cuenta": ("crear_cuenta", "create_account_for_client"),
+    "buscar_cuenta": ("buscar_cuenta_por_numero",),
+    "buscar_clientes": ("buscar_clientes",),
+    "buscar_cuentas": ("buscar_cuentas",),
+    "sugerir_destinos": ("sugerir_destinos",),
+    "iterar_clientes": ("iterar_clientes",),
+    "pagina_clientes": ("pagina_clientes",),
+    "consultar_movimientos": ("consultar_movimientos",),
+    "cerrar_dia": ("cerrar_dia",),
+    "programar_transferencia": ("programar_transferencia",),
+    "ejecutar_ordenes": ("ejecutar_ordenes",),
+}
+# Operación -> método de Account; el servicio trabaja siempre en centavos
+ADAPTADORES_CUENTA = {
+    "depositar": "depositar_centavos",
+    "retirar": "retirar_centavos",
+    "transferir": "transferir_centavos",
+}
+
+# hook(operacion, segundos, error): se llama al terminar cada operación
+Hook = Callable[[str, float, Optional[BaseException]], None]
+
+
+def _resolver(objeto, nombres):
+    for nombre in nombres:
+        funcion = getattr(objeto, nombre, None)
+        if callable(funcion):
+            return funcion
+    return None
+
+
+class BankService:
+    """Operaciones del banco que usan la consola y la versión flet.
+
+    Los métodos del backend se buscan una sola vez, al construir el servicio,
+    y quedan en una tabla de despacho: en cada llamada no hay reflexión. Los
+    hooks de tiempo reciben la duración de cada operación; medir() cronometra
+    además el trabajo propio de la interfaz (p. ej. "render:...").
+    """
+
+    def __init__(self, banco, generar_pdf=None, generar_pdf_en_segundo_plano=None):
+        self.banco = banco
+        self._hooks: List[Hook] = []
+        self._tabla: Dict[str, Callable] = {}
+        for operacion, nombres in ADAPTADORES_BANCO.items():
+            funcion = _resolver(banco, nombres)
+            if funcion is not None:
+                self._tabla[operacion] = funcion
+        for operacion, nombre in ADAPTADORES_CUENTA.items():
+            # Se resuelven sobre la clase: la tabla guarda funciones sin ligar
+            self._tabla[operacion] = getattr(Account, nombre)
+        if generar_pdf is not None:
+            self._tabla["generar_pdf"] = generar_pdf
+        if generar_pdf_en_segundo_plano is not None:
+            self._tabla["generar_pdf_en_segundo_plano"] = generar_pdf_en_segundo_plano
+
+    # ---------- Hooks de tiempo ----------
+    def agregar_hook(self, hook: Hook):
+        self._hooks.append(hook)
+
+    def quitar_hook(self, hook: Hook):
+        self._hooks.remove(hook)
+
+    def _notificar(self, operacion, segundos, error):
+        for hook in self._hooks:
+            hook(operacion, segundos, error)
+
+    @contextmanager
+    def medir(self, operacion: str):
+        """Cronometra un bloque y lo informa a los hooks como `operacion`."""
+        if not self._hooks:
+            yield
+            return
+        inicio = time.perf_counter()
+        try:
+            yield
+        except BaseException as error:
+            self._notificar(operacion, time.perf_counter() - inicio, error)
+            raise
+        self._notificar(operacion, time.perf_counter() - inicio, None)
+
+    def _llamar(self, operacion, *args):
+        funcion = self._tabla.get(operacion)
+        if funcion is None:
+            raise NotImplementedError(f"El backend no implementa la operación {operacion}.")
+        if not self._hooks:
+            return funcion(*args)
+        with self.medir(operacion):
+            return funcion(*args)
+
+    # ---------- Clientes ----------
+    def crear_cliente(self, nombre: str, apellido: str, dni: str, usuario: str, pin: str) -> Client:
+        return self._llamar("crear_cliente", nombre, apellido, dni, usuario, pin)
+
+    def buscar_cliente(self, usuario: str) -> Optional[Client]:
+        return self._llamar("buscar_cliente", usuario)
+
+    def ingresar(self, usuario: str, pin: str) -> Optional[Client]:
+        """Devuelve el cliente si el usuario existe y el PIN es correcto."""
+        cliente = self.buscar_cliente(usuario)
+        if cliente is None or not cliente.validar_pin(pin):
+            return None
+        return cliente
+
+    def iterar_clientes(self, limite: Optional[int] = None, desde: int = 0, orden: Optional[str] = None):
+        return self._llamar("iterar_clientes", limite, desde, orden)
+
+    def pagina_clientes(self, limite: int = 50, orden: Optional[str] = None, cursor=None):
+        return self._llamar("pagina_clientes", limite, orden, cursor)
+
+    def buscar_clientes(self, texto: str, limite: int = 50, desde: int = 0) -> List[Client]:
+        return self._llamar("buscar_clientes", texto, limite, desde)
+
+    # ---------- Cuentas ----------
+    def crear_cuenta(self, cliente: Client, alias: str) -> Account:
+        return self._llamar("crear_cuenta", cliente, alias)
+
+    def buscar_cuenta(self, numero: int) -> Optional[Account]:
+        return self._llamar("buscar_cuenta", numero)
+
+    def buscar_cuentas(self, texto: str, cliente: Optional[Client] = None,
+                       limite: int = 50, desde: int = 0) -> List[Account]:
+        return self._llamar("buscar_cuentas", texto, cliente, limite, desde)
+
+    def sugerir_destinos(self, texto: str, limite: int = 10, excluir: Optional[int] = None) -> List[Destino]:
+        return self._llamar("sugerir_destinos", texto, limite, excluir)
+
+    # ---------- Movimientos (en centavos) ----------
+    def depositar(self, cuenta: Account, centavos: int) -> None:
+        self._llamar("depositar", cuenta, centavos)
+
+    def retirar(self, cuenta: Account, centavos: int) -> None:
+        self._llamar("retirar", cuenta, centavos)
+
+    def transferir(self, origen: Account, centavos: int, destino: Account) -> None:
+        self._llamar("transferir", origen, centavos, destino)
+
+    def consultar(self, cuenta: Account, desde=None, hasta=None, tipos=None,
+                  minimo: Optional[int] = None, maximo: Optional[int] = None) -> List[Transaction]:
+        with self.medir("consultar"):
+            return list(cuenta.consultar(desde, hasta, tipos, minimo, maximo))
+
+    def consultar_movimientos(self, desde=None, hasta=None, tipos=None,
+                              minimo: Optional[int] = None, maximo: Optional[int] = None):
+        return self._llamar("consultar_movimientos", desde, hasta, tipos, minimo, maximo)
+
+    def programar_transferencia(self, origen: Account, centavos: int, destino: Account, inicio=None,
+                                dias: int = 0, meses: int = 0, veces: Optional[int] = None):
+        return self._llamar("programar_transferencia", origen, destino, centavos, inicio, dias, meses, veces)
+
+    def ejecutar_ordenes(self, ahora=None):
+        return self._llamar("ejecutar_ordenes", ahora)
+
+    def cerrar_dia(self, reglas, fecha=None):
+        return self._llamar("cerrar_dia", reglas, fecha)
+
+    # ---------- Reportes ----------
+    def estadisticas(self, cuenta: Optional[Account] = None) -> Estadisticas:
+        """Agregados de la cuenta o, sin cuenta, de todo el banco (lectura O(1))."""
+        return self.banco.estadisticas if cuenta is None else cuenta.estadisticas
+
+    def limites_disponibles(self, cuenta: Account):
+        """[(Limite, lo que queda)] de la cuenta; vacío si el banco no tiene límites de velocidad."""
+        limites = getattr(self.banco, "limites", None)
+        return [] if limites is None else limites.disponible(cuenta)
+
+    def generar_pdf(self, cliente: Client) -> str:
+        return self._llamar("generar_pdf", cliente)
+
+    def generar_pdf_en_segundo_plano(self, cliente: Client, al_terminar=None):
+        """Como generar_pdf_en_segundo_plano, pero los hooks miden hasta que el PDF está listo."""
+        funcion = self._tabla.get("generar_pdf_en_segundo_plano")
+        if funcion is None:
+            raise NotImplementedError("El backend no implementa la operación generar_pdf_en_segundo_plano.")
+        inicio = time.perf_counter()
+
+        def terminar(ruta, error):
+            if self._hooks:
+                self._notificar("generar_pdf", time.perf_counter() - inicio, error)
+            if al_terminar is not None:
+                al_terminar(ruta, error)
+        return funcion(cliente, terminar)
@@ -0,0 +1,273 @@
+import multiprocessing
+import os
+import time
+
+from bank.allocator import AccountNumberAllocator
+from bank.ledger import TRANSFERENCIA_ENVIADA, TRANSFERENCIA_RECIBIDA
+from bank.manager import BankManager
+from bank.models import hash_pin
+from bank.money import MAXIMO
+
+
+class _Shard:
+    """Estado de un proceso trabajador: un BankManager con parte de las cuentas.
+
+    Además de las operaciones locales participa del commit en dos fases de
+    las transferencias entre shards: el débito queda retenido (descontado del
+    saldo) hasta que el coordinador confirma o aborta.
+    """
+
+    def __init__(self):
+        self.banco = BankManager()
+        self._pendientes = {}
+
+    def _cuenta(self, numero):
+        cuenta = self.banco.buscar_cuenta_por_numero(numero)
+        if cuenta is None:
+            raise ValueError("Cuenta inexistente.")
+        return cuenta
+
+    def ejecutar(self, operacion):
+        # Cualquier falla queda en la respuesta de esa operación: el trabajador
+        # no puede morir con débitos retenidos sin confirmar ni abortar.
+        try:
+            funcion = getattr(self, "op_" + operacion[0], None)
+            if funcion is None:
+                raise ValueError("Operación desconocida.")
+            return True, funcion(*operacion[1:])
+        except Exception as e:
+            return False, str(e)
+
+    def op_cliente(self, nombre, apellido, dni, usuario, pin_hash):
+        if self.banco.buscar_cliente(usuario) is None:
+            self.banco.crear_cliente(nombre, apellido, dni, usuario, pin_hash=pin_hash)
+
+    def op_cuenta(self, usuario, alias, numero):
+        self.banco.crear_cuenta(self.banco.buscar_cliente(usuario), alias, numero)
+
+    def op_depositar(self, numero, centavos):
+        self._cuenta(numero).depositar_centavos(centavos)
+
+    def op_retirar(self, numero, centavos):
+        self._cuenta(numero).retirar_centavos(centavos)
+
+    def op_transferir(self, origen, destino, centavos):
+        self._cuenta(origen).transferir_centavos(centavos, self._cuenta(destino))
+
+    def op_saldo(self, numero):
+        return self._cuenta(numero).saldo_centavos
+
+    def op_total(self):
+        return self.banco.saldo_total_centavos()
+
+    def op_limites(self, limites):
+        self.banco.configurar_limites(limites)
+
+    # ---- Commit en dos fases ----
+    def op_preparar_debito(self, tx, numero, centavos, destino):
+        cuenta = self._cuenta(numero)
+        if centavos <= 0:
+            raise ValueError("El monto debe ser mayor a cero.")
+        if centavos > cuenta.saldo_centavos:
+            raise ValueError("Saldo insuficiente.")
+        ahora = time.time()
+        if self.banco.limites is not None:
+            # El mismo control que Account.transferir_centavos; si se aborta, se devuelve
+            self.banco.limites.consumir(cuenta, TRANSFERENCIA_ENVIADA, centavos, ahora)
+        cuenta.saldo_centavos -= centavos  # retención
+        self._pendientes[tx] = (TRANSFERENCIA_ENVIADA, cuenta, centavos, destino, ahora)
+
+    def op_preparar_credito(self, tx, numero, centavos, origen):
+        cuenta = self._cuenta(numero)
+        if centavos <= 0:
+            raise ValueError("El monto debe ser mayor a cero.")
+        if centavos > MAXIMO - cuenta.saldo_centavos:
+            raise ValueError("Saldo fuera de rango.")
+        self._pendientes[tx] = (TRANSFERENCIA_RECIBIDA, cuenta, centavos, origen, None)
+
+    def op_confirmar(self, tx):
+        tipo, cuenta, centavos, contraparte, _ = self._pendientes.pop(tx)
+        fila = cuenta.libro.movimiento(cuenta.numero, tipo, centavos, contraparte)
+        if tipo == TRANSFERENCIA_RECIBIDA:
+            cuenta.saldo_centavos += centavos
+        cuenta.movimientos.append(fila)
+        if cuenta._estadisticas is not None:
+            cuenta._estadisticas.registrar(tipo, centavos, cuenta.libro.fechas[fila])
+
+    def op_abortar(self, tx):
+        tipo, cuenta, centavos, _, ahora = self._pendientes.pop(tx)
+        if tipo == TRANSFERENCIA_ENVIADA:
+            cuenta.saldo_centavos += centavos  # libera la retención
+            if self.banco.limites is not None:
+                self.banco.limites.devolver(cuenta, tipo, centavos, ahora)
+
+
+def _trabajador(conexion):
+    shard = _Shard()
+    while True:
+        lote = conexion.recv()
+        if lote is None:
+            break
+        conexion.send([shard.ejecutar(operacion) for operacion in lote])
+    conexion.close()
+
+
+class ShardedBank:
+    """Coordinador de un banco repartido en procesos por número de cuenta.
+
+    Cada proceso trabajador tiene su propio BankManager (sin GIL compartido).
+    Las operaciones se envían en lotes: `ejecutar` agrupa por shard, manda
+    todos los lotes y recién después espera las respuestas, así los shards
+    trabajan en paralelo. Las transferencias entre shards usan commit en dos
+    fases, de modo que el dinero nunca se crea ni se pierde.
+    """
+
+    def __init__(self, n_shards: int = None, asignador: AccountNumberAllocator = None):
+        self.n_shards = n_shards or os.cpu_count() or 1
+        self.asignador = asignador if asignador is not None else AccountNumberAllocator()
+        self._clientes = {}
+        self._siguiente_tx = 1
+        contexto = multiprocessing.get_context("spawn")
+        self._conexiones = []
+        self._procesos = []
+        for _ in range(self.n_shards):
+            padre, hijo = contexto.Pipe()
+            proceso = contexto.Process(target=_trabajador, args=(hijo,), daemon=True)
+            proceso.start()
+            hijo.close()
+            self._conexiones.append(padre)
+            self._procesos.append(proceso)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
+
+    def shard_de(self, numero: int) -> int:
+        return numero % self.n_shards
+
+    def _enviar(self, lotes):
+        """Envía {shard: [operaciones]} a todos los shards y devuelve {shard: resultados}."""
+        enviados = []
+        try:
+            for shard, lote in lotes.items():
+                self._conexiones[shard].send(lote)
+                enviados.append(shard)
+        finally:
+            # Se leen todas las respuestas pendientes aunque algo falle: una
+            # respuesta sin leer la recibiría la llamada siguiente.
+            respuestas, error = {}, None
+            for shard in enviados:
+                try:
+                    respuestas[shard] = self._conexiones[shard].recv()
+                except (EOFError, OSError) as e:
+                    error = error or e
+        if error is not None:
+            raise RuntimeError(f"Un shard dejó de responder: {error!r}")
+        return respuestas
+
+    def crear_cliente(self, nombre, apellido, dni, usuario, pin=None, *, pin_hash=None):
+        if usuario in self._clientes:
+            raise ValueError("El usuario ya existe.")
+        # Se hashea una sola vez: los shards reciben el hash, no el PIN
+        self._clientes[usuario] = (nombre, apellido, dni, usuario,
+                                   hash_pin(pin) if pin_hash is None else pin_hash)
+
+    def crear_cuenta(self, usuario, alias) -> int:
+        datos = self._clientes.get(usuario)
+        if datos is None:
+            raise ValueError("Cliente inexistente.")
+        numero = self.asignador.siguiente()
+        shard = self.shard_de(numero)
+        # El cliente se replica en cada shard donde tenga cuentas
+        (ok, error), = self._enviar({shard: [("cliente", *datos), ("cuenta", usuario, alias, numero)]})[shard][1:]
+        if not ok:
+            raise ValueError(error)
+        return numero
+
+    def ejecutar(self, operaciones):
+        """Ejecuta un lote de operaciones y devuelve [(ok, valor_o_error), ...].
+
+        Operaciones: ("depositar", numero, centavos), ("retirar", numero, centavos),
+        ("transferir", origen, destino, centavos) y ("saldo", numero). Dentro de
+        cada cuenta se respeta el orden del lote; los créditos de transferencias
+        entre shards se aplican al confirmar, al final del lote.
+        """
+        fase1 = {}
+        referencias = {}
+        for k, operacion in enumerate(operaciones):
+            if operacion[0] == "transferir":
+                _, origen, destino, centavos = operacion
+                shard_origen, shard_destino = self.shard_de(origen), self.shard_de(destino)
+                if shard_origen != shard_destino:
+                    tx = self._siguiente_tx
+                    self._siguiente_tx += 1
+                    fase1.setdefault(shard_origen, []).append(("preparar_debito", tx, origen, centavos, destino))
+                    referencias.setdefault(shard_origen, []).append((k, tx))
+                    fase1.setdefault(shard_destino, []).append(("preparar_credito", tx, destino, centavos, origen))
+                    referencias.setdefault(shard_destino, []).append((k, tx))
+                    continue
+            shard = self.shard_de(operacion[1])
+            fase1.setdefault(shard, []).append(operacion)
+            referencias.setdefault(shard, []).append((k, None))
+
+        resultados = [None] * len(operaciones)
+        preparadas = {}
+        for shard, respuestas in self._enviar(fase1).items():
+            for (k, tx), respuesta in zip(referencias[shard], respuestas):
+                if tx is None:
+                    resultados[k] = respuesta
+                else:
+                    preparadas.setdefault(k, []).append((shard, tx, respuesta))
+
+        fase2 = {}
+        for k, partes in preparadas.items():
+            confirmar = all(ok for _, _, (ok, _) in partes)
+            for shard, tx, (ok, _) in partes:
+                if confirmar or ok:
+                    fase2.setdefault(shard, []).append(("confirmar" if confirmar else "abortar", tx))
+            errores = [error for _, _, (ok, error) in partes if not ok]
+            resultados[k] = (True, None) if confirmar else (False, errores[0])
+        if fase2:
+            self._enviar(fase2)
+        return resultados
+
+    def _una(self, *operacion):
+        ok, valor = self.ejecutar([operacion])[0]
+        if not ok:
+            raise ValueError(valor)
+        return valor
+
+    def depositar(self, numero, centavos):
+        self._una("depositar", numero, centavos)
+
+    def retirar(self, numero, centavos):
+        self._una("retirar", numero, centavos)
+
+    def transferir(self, origen, destino, centavos):
+        self._una("transferir", origen, destino, centavos)
+
+    def saldo(self, numero) -> int:
+        return self._una("saldo", numero)
+
+    def configurar_limites(self, limites):
+        """Límites de velocidad (bank.limits.Limite) en todos los shards; None o [] los quita."""
+        self._enviar({shard: [("limites", limites)] for shard in range(self.n_shards)})
+
+    def saldo_total_centavos(self) -> int:
+        respuestas = self._enviar({shard: [("total",)] for shard in range(self.n_shards)})
+        return sum(lista[0][1] for lista in respuestas.values())
+
+    def cerrar(self):
+        for conexion in self._conexiones:
+            try:
+                conexion.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+        for proceso in self._procesos:
+            proceso.join()
+        for conexion in self._conexiones:
+            conexion.close()
+        self._conexiones = []
+        self._procesos = []
@@ -0,0 +1,245 @@
+import mmap
+import os
+import struct
+from array import array
+from bisect import bisect_left, bisect_right
+from collections.abc import Sequence
+
+from bank.ledger import Ledger
+
+# Formato binario (little-endian) de un snapshot completo de BankManager:
+# cabecera | offsets de cadenas | blob de cadenas | clientes | cuentas |
+# movimientos por cuenta | columnas del libro mayor |
+# índice por usuario | índice por número | índice por alias
+# Todos los registros son de ancho fijo; las cadenas se guardan una sola vez
+# en la tabla y los registros las referencian por id.
+MAGICO = b"BNKS"
+VERSION = 3
+SECCIONES = 9 + len(Ledger.COLUMNAS)
+CABECERA = struct.Struct(f"<4sHBxIIQQQQQQ{SECCIONES}Q")
+CLIENTE = struct.Struct("<7I")     # nombre, apellido, dni, usuario, pin, primera_cuenta, n_cuentas
+CUENTA = struct.Struct("<QIIqQI")  # numero, alias, cliente, saldo (centavos), primer_movimiento, n_movimientos
+
+
+def _alinear(buffer: bytearray):
+    buffer.extend(b"\0" * (-len(buffer) % 8))
+
+
+def escribir_snapshot(banco, ruta: str, generacion: int = 0):
+    """Escribe el estado completo de `banco` en `ruta` de forma atómica."""
+    ids = {}
+    cadenas = []
+
+    def sid(texto):
+        i = ids.get(texto)
+        if i is None:
+            i = ids[texto] = len(cadenas)
+            cadenas.append(texto.encode("utf-8"))
+        return i
+
+    clientes = bytearray()
+    cuentas = bytearray()
+    movimientos = array("Q")
+    usuarios, numeros, aliases = [], [], []
+    n_cuentas = 0
+    for i, cliente in enumerate(banco.clientes):
+        # exportar() entrega el hash del PIN: el snapshot nunca lo guarda en claro
+        nombre, apellido, dni, usuario, pin_hash = cliente.exportar()
+        clientes += CLIENTE.pack(sid(nombre), sid(apellido), sid(dni), sid(usuario), sid(pin_hash),
+                                 n_cuentas, len(cliente.cuentas))
+        usuarios.append(usuario)
+        for cuenta in cliente.cuentas:
+            cuentas += CUENTA.pack(cuenta.numero, sid(cuenta.alias), i, cuenta.saldo_centavos,
+                                   len(movimientos), len(cuenta.movimientos))
+            movimientos.extend(cuenta.movimientos)
+            numeros.append(cuenta.numero)
+            aliases.append(cuenta.alias)
+            n_cuentas += 1
+
+    offsets = array("Q", [0])
+    total = 0
+    for c in cadenas:
+        total += len(c)
+        offsets.append(total)
+
+    secciones = [
+        offsets.tobytes(),
+        b"".join(cadenas),
+        bytes(clientes),
+        bytes(cuentas),
+        movimientos.tobytes(),
+        *banco.libro.columnas_bytes(),
+        array("I", sorted(range(len(usuarios)), key=usuarios.__getitem__)).tobytes(),
+        array("I", sorted(range(n_cuentas), key=numeros.__getitem__)).tobytes(),
+        array("I", sorted(range(n_cuentas), key=aliases.__getitem__)).tobytes(),
+    ]
+    cuerpo = bytearray()
+    posiciones = []
+    for seccion in secciones:
+        _alinear(cuerpo)
+        posiciones.append(CABECERA.size + len(cuerpo))
+        cuerpo += seccion
+    posiciones.append(CABECERA.size + len(cuerpo))  # fin del archivo
+
+    asignador = banco.asignador
+    cabecera = CABECERA.pack(MAGICO, VERSION, asignador.ancho, len(usuarios), n_cuentas,
+                             len(movimientos), len(banco.libro), len(cadenas), asignador.clave,
+                             asignador.posicion, generacion, *posiciones)
+    temporal = ruta + ".tmp"
+    with open(temporal, "wb") as f:
+        f.write(cabecera)
+        f.write(cuerpo)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporal, ruta)
+
+
+class SnapshotView:
+    """Vista de solo lectura sobre un snapshot mapeado en memoria.
+
+    Abrirla solo lee la cabecera; los registros se decodifican bajo demanda.
+    """
+
+    def __init__(self, ruta: str):
+        self.ruta = ruta
+        self._archivo = open(ruta, "rb")
+        self._mm = mmap.mmap(self._archivo.fileno(), 0, access=mmap.ACCESS_READ)
+        (magico, version, self.ancho, self.n_clientes, self.n_cuentas, n_movimientos,
+         self.n_filas, n_cadenas, self.clave, self.posicion, self.generacion,
+         *posiciones) = CABECERA.unpack_from(self._mm)
+        if magico != MAGICO or version != VERSION:
+            self.cerrar()
+            raise ValueError("El archivo no es un snapshot válido.")
+        (off_offsets, self._off_cadenas, self._off_clientes, self._off_cuentas,
+         off_movimientos) = posiciones[:5]
+        self._secciones_libro = posiciones[5:5 + len(Ledger.COLUMNAS) + 1]
+        off_usuario, off_numero, off_alias = posiciones[-4:-1]
+        vista = memoryview(self._mm)
+        self._offsets = vista[off_offsets:off_offsets + 8 * (n_cadenas + 1)].cast("Q")
+        self._movimientos = vista[off_movimientos:off_movimientos + 8 * n_movimientos].cast("Q")
+        self._idx_usuario = vista[off_usuario:off_usuario + 4 * self.n_clientes].cast("I")
+        self._idx_numero = vista[off_numero:off_numero + 4 * self.n_cuentas].cast("I")
+        self._idx_alias = vista[off_alias:off_alias + 4 * self.n_cuentas].cast("I")
+        vista.release()
+
+    def cadena(self, sid: int) -> str:
+        inicio = self._off_cadenas + self._offsets[sid]
+        fin = self._off_cadenas + self._offsets[sid + 1]
+        return self._mm[inicio:fin].decode("utf-8")
+
+    def cliente(self, i: int):
+        """Devuelve (nombre, apellido, dni, usuario, pin_hash, primera_cuenta, n_cuentas)."""
+        datos = CLIENTE.unpack_from(self._mm, self._off_clientes + i * CLIENTE.size)
+        return tuple(self.cadena(s) for s in datos[:5]) + datos[5:]
+
+    def cuenta(self, j: int):
+        """Devuelve (numero, alias, cliente, saldo, primer_movimiento, n_movimientos)."""
+        numero, alias, cliente, saldo, primero, n = CUENTA.unpack_from(
+            self._mm, self._off_cuentas + j * CUENTA.size)
+        return numero, self.cadena(alias), cliente, saldo, primero, n
+
+    def movimientos(self, primero: int, n: int):
+        """Índices de filas del libro mayor de una cuenta."""
+        return array("Q", self._movimientos[primero:primero + n])
+
+    def columnas_libro(self):
+        """Vistas de solo lectura de cada columna del libro mayor, en el orden de Ledger.COLUMNAS.
+
+        No copian nada: el libro las usa tal cual y las copia en su primera escritura.
+        """
+        vista = memoryview(self._mm)
+        columnas = []
+        for (_, codigo), inicio in zip(Ledger.COLUMNAS, self._secciones_libro):
+            largo = self.n_filas * array(codigo).itemsize
+            columnas.append(vista[inicio:inicio + largo].cast(codigo))
+        return columnas
+
+    def columna_libro(self, nombre: str, desde: int = 0, hasta: int = None) -> bytes:
+        """Bytes de las filas [desde, hasta) de una columna del libro mayor."""
+        hasta = self.n_filas if hasta is None else hasta
+        for (columna, codigo), inicio in zip(Ledger.COLUMNAS, self._secciones_libro):
+            if columna == nombre:
+                ancho = array(codigo).itemsize
+                return self._mm[inicio + desde * ancho:inicio + hasta * ancho]
+        raise KeyError(nombre)
+
+    def saldos(self):
+        """(números, saldos en centavos) de todas las cuentas, en orden de alta, como arrays."""
+        numeros, saldos = array("Q"), array("q")
+        registros = self._mm[self._off_cuentas:self._off_cuentas + self.n_cuentas * CUENTA.size]
+        for numero, _, _, saldo, _, _ in CUENTA.iter_unpack(registros):
+            numeros.append(numero)
+            saldos.append(saldo)
+        return numeros, saldos
+
+    def _numero(self, j):
+        return struct.unpack_from("<Q", self._mm, self._off_cuentas + j * CUENTA.size)[0]
+
+    def _alias(self, j):
+        sid = struct.unpack_from("<I", self._mm, self._off_cuentas + j * CUENTA.size + 8)[0]
+        return self.cadena(sid)
+
+    def _usuario(self, i):
+        sid = struct.unpack_from("<I", self._mm, self._off_clientes + i * CLIENTE.size + 12)[0]
+        return self.cadena(sid)
+
+    def buscar_usuario(self, usuario: str):
+        pos = bisect_left(self._idx_usuario, usuario, key=self._usuario)
+        if pos < self.n_clientes and self._usuario(self._idx_usuario[pos]) == usuario:
+            return self._idx_usuario[pos]
+        return None
+
+    def buscar_numero(self, numero: int):
+        pos = bisect_left(self._idx_numero, numero, key=self._numero)
+        if pos < self.n_cuentas and self._numero(self._idx_numero[pos]) == numero:
+            return self._idx_numero[pos]
+        return None
+
+    def buscar_alias(self, alias: str):
+        inicio = bisect_left(self._idx_alias, alias, key=self._alias)
+        fin = bisect_right(self._idx_alias, alias, lo=inicio, key=self._alias)
+        return sorted(self._idx_alias[inicio:fin])
+
+    def orden_usuarios(self):
+        """Índices de clientes ordenados por usuario (copia independiente del mmap)."""
+        return array("I", self._idx_usuario)
+
+    def cerrar(self):
+        for nombre in ("_offsets", "_movimientos", "_idx_usuario", "_idx_numero", "_idx_alias"):
+            vista = getattr(self, nombre, None)
+            if vista is not None:
+                vista.release()
+        self._mm.close()
+        self._archivo.close()
+
+
+class LazySequence(Sequence):
+    """Secuencia cuyos primeros `n` elementos se materializan al accederlos.
+
+    Los elementos agregados después con append se guardan aparte.
+    """
+
+    def __init__(self, n: int, materializar):
+        self._n = n
+        self._materializar = materializar
+        self._extra = []
+
+    def __len__(self):
+        return self._n + len(self._extra)
+
+    def __getitem__(self, indice):
+        if isinstance(indice, slice):
+            return [self[i] for i in range(*indice.indices(len(self)))]
+        if indice < 0:
+            indice += len(self)
+        if not 0 <= indice < len(self):
+            raise IndexError("índice fuera de rango")
+        if indice < self._n:
+            return self._materializar(indice)
+        return self._extra[indice - self._n]
+
+    def __bool__(self):
+        return len(self) > 0
+
+    def append(self, elemento):
+        self._extra.append(elemento)
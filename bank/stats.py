@@ -0,0 +1,174 @@
+from datetime import date, datetime, time, timedelta
+
+from bank.ledger import (
+    COMISION, DEPOSITO, INTERES, RETIRO, SIGNOS, TIPOS, TRANSFERENCIA_ENVIADA, TRANSFERENCIA_RECIBIDA, instante,
+)
+from bank.money import formatear
+
+# Nombre de cada tipo en los resúmenes (dicts y líneas de texto)
+NOMBRES = {
+    DEPOSITO: "Depósitos",
+    RETIRO: "Retiros",
+    TRANSFERENCIA_ENVIADA: "Transferencias enviadas",
+    TRANSFERENCIA_RECIBIDA: "Transferencias recibidas",
+    INTERES: "Intereses",
+    COMISION: "Comisiones",
+}
+
+
+class Balde:
+    """Cantidad y total (centavos) de movimientos por tipo; las listas se indexan por código."""
+
+    __slots__ = ("cantidades", "totales")
+
+    def __init__(self):
+        self.cantidades = [0] * (max(TIPOS) + 1)
+        self.totales = [0] * (max(TIPOS) + 1)
+
+    def cantidad(self, tipo=None) -> int:
+        return sum(self.cantidades) if tipo is None else self.cantidades[tipo]
+
+    def total(self, tipo=None) -> int:
+        return sum(self.totales) if tipo is None else self.totales[tipo]
+
+    def sumar(self, otro):
+        for tipo in TIPOS:
+            self.cantidades[tipo] += otro.cantidades[tipo]
+            self.totales[tipo] += otro.totales[tipo]
+        return self
+
+
+class Estadisticas(Balde):
+    """Agregados de un conjunto de movimientos (una cuenta o todo el libro).
+
+    registrar() los pone al día en O(1) por movimiento: cantidad, total,
+    mínimo y máximo por tipo, y un Balde por día (hora local). Los reportes
+    los leen directo, sin recorrer el historial.
+    """
+
+    __slots__ = ("minimos", "maximos", "dias", "_hoy", "_desde_hoy", "_hasta_hoy")
+
+    def __init__(self):
+        super().__init__()
+        self.minimos = [None] * (max(TIPOS) + 1)
+        self.maximos = [None] * (max(TIPOS) + 1)
+        self.dias = {}  # date -> Balde
+        # Atajo al balde del último día visto: casi todos los movimientos caen ahí
+        self._hoy = None
+        self._desde_hoy = self._hasta_hoy = 0.0
+
+    @classmethod
+    def de_filas(cls, libro, filas):
+        """Agregados de las filas `filas` del libro (una pasada)."""
+        estadisticas = cls()
+        tipos, montos, fechas = libro.tipos, libro.montos, libro.fechas
+        for fila in filas:
+            estadisticas.registrar(tipos[fila], montos[fila], fechas[fila])
+        return estadisticas
+
+    @classmethod
+    def del_libro(cls, libro):
+        return cls.de_filas(libro, range(len(libro)))
+
+    def registrar(self, tipo, centavos, fecha):
+        self.cantidades[tipo] += 1
+        self.totales[tipo] += centavos
+        minimo = self.minimos[tipo]
+        if minimo is None or centavos < minimo:
+            self.minimos[tipo] = centavos
+        maximo = self.maximos[tipo]
+        if maximo is None or centavos > maximo:
+            self.maximos[tipo] = centavos
+        balde = self._hoy if self._desde_hoy <= fecha < self._hasta_hoy else self._balde(fecha)
+        balde.cantidades[tipo] += 1
+        balde.totales[tipo] += centavos
+
+    def registrar_lote(self, tipo, montos, fecha):
+        """Como registrar() para varios movimientos del mismo tipo y la misma fecha."""
+        if not len(montos):
+            return
+        n, total = len(montos), sum(montos)
+        self.cantidades[tipo] += n
+        self.totales[tipo] += total
+        menor, mayor = min(montos), max(montos)
+        if self.minimos[tipo] is None or menor < self.minimos[tipo]:
+            self.minimos[tipo] = menor
+        if self.maximos[tipo] is None or mayor > self.maximos[tipo]:
+            self.maximos[tipo] = mayor
+        balde = self._hoy if self._desde_hoy <= fecha < self._hasta_hoy else self._balde(fecha)
+        balde.cantidades[tipo] += n
+        balde.totales[tipo] += total
+
+    def _balde(self, fecha):
+        dia = date.fromtimestamp(fecha)
+        balde = self.dias.get(dia)
+        if balde is None:
+            balde = self.dias[dia] = Balde()
+        self._hoy = balde
+        self._desde_hoy = datetime.combine(dia, time.min).timestamp()
+        self._hasta_hoy = datetime.combine(dia + timedelta(days=1), time.min).timestamp()
+        return balde
+
+    # ---------- Lectura ----------
+    def minimo(self, tipo):
+        return self.minimos[tipo]
+
+    def maximo(self, tipo):
+        return self.maximos[tipo]
+
+    @property
+    def neto(self) -> int:
+        """Entradas menos salidas (en una cuenta, el saldo que surge del historial)."""
+        return sum(signo * total for signo, total in zip(SIGNOS, self.totales))
+
+    def por_dia(self, desde=None, hasta=None):
+        """[(date, Balde)] de los días con movimientos en [desde, hasta), en orden."""
+        desde = date.min if desde is None else _dia(desde)
+        hasta = date.max if hasta is None else _dia(hasta)
+        return sorted((dia, balde) for dia, balde in self.dias.items() if desde <= dia < hasta)
+
+    def entre(self, desde=None, hasta=None) -> Balde:
+        """Suma de los baldes diarios en [desde, hasta): p. ej. lo depositado en el mes."""
+        desde = None if desde is None else _dia(desde)
+        hasta = None if hasta is None else _dia(hasta)
+        resultado = Balde()
+        if desde is not None and hasta is not None and (hasta - desde).days < len(self.dias):
+            # Rango corto: se miran solo sus días
+            for k in range((hasta - desde).days):
+                balde = self.dias.get(desde + timedelta(days=k))
+                if balde is not None:
+                    resultado.sumar(balde)
+            return resultado
+        for dia, balde in self.por_dia(desde, hasta):
+            resultado.sumar(balde)
+        return resultado
+
+    def resumen(self):
+        """Dict nombre del tipo -> {cantidad, total, minimo, maximo} (centavos)."""
+        return {
+            NOMBRES[tipo]: {
+                "cantidad": self.cantidades[tipo],
+                "total": self.totales[tipo],
+                "minimo": self.minimos[tipo],
+                "maximo": self.maximos[tipo],
+            }
+            for tipo in TIPOS
+        }
+
+    def lineas(self):
+        """Una línea de texto por tipo con movimientos, para PDFs y pantallas."""
+        lineas = []
+        for tipo in TIPOS:
+            cantidad = self.cantidades[tipo]
+            if cantidad:
+                lineas.append(f"{NOMBRES[tipo]}: {cantidad} por {formatear(self.totales[tipo])} "
+                              f"(mín. {formatear(self.minimos[tipo])}, máx. {formatear(self.maximos[tipo])})")
+        return lineas
+
+
+def _dia(valor) -> date:
+    if isinstance(valor, datetime):
+        return valor.date()
+    if isinstance(valor, date):
+        return valor
+    return date.fromtimestamp(instante(valor))
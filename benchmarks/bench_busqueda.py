@@ -0,0 +1,43 @@
+"""Latencia de la búsqueda por prefijo (lo que tarda cada tecla en la UI).
+
+Uso: python -m benchmarks.bench_busqueda [clientes]
+"""
+import random
+import sys
+import time
+
+from bank.allocator import AccountNumberAllocator
+from bank.manager import BankManager
+from bank.models import hash_pin
+
+# Un único hash para todos los clientes: se mide el banco, no el PBKDF2
+PIN = hash_pin("1234")
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    banco = BankManager(AccountNumberAllocator(ancho=8, clave=1))
+    azar = random.Random(0)
+    for i in range(n):
+        cliente = banco.crear_cliente(f"Nombre{azar.randrange(n)}", f"Apellido{i % 5000}",
+                                      str(20_000_000 + azar.randrange(n)), f"user{i}", pin_hash=PIN)
+        banco.crear_cuenta(cliente, f"alias{azar.randrange(n)}")
+
+    inicio = time.perf_counter()
+    banco.preparar_busqueda()
+    print(f"Índices de búsqueda para {n} clientes: {time.perf_counter() - inicio:.2f} s")
+
+    # Simula a alguien tipeando: cada prefijo es una tecla más
+    latencias = []
+    for palabra in ("user4242", "nombre7777", "apellido123", "20123456", "alias9999"):
+        for k in range(1, len(palabra) + 1):
+            inicio = time.perf_counter()
+            banco.buscar_clientes(palabra[:k], limite=50)
+            latencias.append(time.perf_counter() - inicio)
+    latencias.sort()
+    print(f"Teclas: {len(latencias)}  mediana {latencias[len(latencias) // 2] * 1000:.2f} ms  "
+          f"p99 {latencias[int(len(latencias) * 0.99)] * 1000:.2f} ms  máx {latencias[-1] * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""Cierre diario (intereses y comisiones) sobre todo el banco contra el bucle cuenta por cuenta.
+
+Uso: python -m benchmarks.bench_cierre [cuentas]
+"""
+import random
+import sys
+import time
+
+from bank.allocator import AccountNumberAllocator
+from bank.closing import ReglasCierre
+from bank.manager import BankManager
+from bank.models import hash_pin
+from bank.reconcile import conciliar
+
+# Un único hash para todos los clientes: se mide el banco, no el PBKDF2
+PIN = hash_pin("1111")
+
+REGLAS = ReglasCierre(tasa_anual_pb=500, minimo_interes=100_000, comision=1500, exento_comision=5_000_000)
+
+
+def _banco(n_cuentas):
+    banco = BankManager(AccountNumberAllocator(ancho=7, clave=1))
+    azar = random.Random(0)
+    for i in range(n_cuentas):
+        cuenta = banco.crear_cuenta(banco.crear_cliente("N", "A", str(i), f"u{i}", pin_hash=PIN), f"a{i}")
+        cuenta.depositar_centavos(azar.randint(1, 10_000_000))
+    return banco
+
+
+def _bucle(banco):
+    # Lo que habría que hacer sin el cierre en lote: una operación por cuenta
+    intereses, comisiones = REGLAS.calcular([c.saldo_centavos for c in banco.cuentas])
+    for posiciones, montos, operacion in ((*intereses, "depositar_centavos"), (*comisiones, "retirar_centavos")):
+        for k, monto in zip(posiciones, montos):
+            getattr(banco.cuentas[k], operacion)(monto)
+
+
+def main():
+    n_cuentas = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    inicio = time.perf_counter()
+    banco = _banco(n_cuentas)
+    print(f"Banco: {n_cuentas} cuentas ({time.perf_counter() - inicio:.1f} s)")
+
+    cierre = banco.cerrar_dia(REGLAS)
+    print(cierre)
+    print(f"Conciliación tras el cierre: ok={conciliar(banco).ok}")
+
+    inicio = time.perf_counter()
+    _bucle(banco)
+    segundos = time.perf_counter() - inicio
+    print(f"Bucle cuenta por cuenta: {segundos:.2f} s ({n_cuentas / segundos / 1e6:.2f} M cuentas/s)")
+
+
+if __name__ == "__main__":
+    main()
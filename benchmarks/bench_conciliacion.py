@@ -0,0 +1,61 @@
+"""Conciliación de saldos contra el libro mayor: pasada vectorizada, procesos y reinicio.
+
+Uso: python -m benchmarks.bench_conciliacion [cuentas] [transferencias] [procesos]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+from bank.allocator import AccountNumberAllocator
+from bank.manager import BankManager
+from bank.models import hash_pin
+from bank.reconcile import conciliar
+
+# Un único hash para todos los clientes: se mide el banco, no el PBKDF2
+PIN = hash_pin("1111")
+
+# Transferencias por lote al poblar el libro
+LOTE = 100_000
+
+
+def main():
+    n_cuentas = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    n_transferencias = int(sys.argv[2]) if len(sys.argv) > 2 else 5_000_000
+    procesos = int(sys.argv[3]) if len(sys.argv) > 3 else os.cpu_count() or 1
+
+    with tempfile.TemporaryDirectory() as carpeta:
+        ruta = os.path.join(carpeta, "banco.journal")
+        # Ancho 7: hasta 9 millones de cuentas y la tabla directa número -> posición entra en memoria
+        banco = BankManager(AccountNumberAllocator(ancho=7, clave=1))
+        banco.abrir_journal(ruta)
+        inicio = time.perf_counter()
+        numeros = []
+        for i in range(n_cuentas):
+            cuenta = banco.crear_cuenta(banco.crear_cliente("N", "A", str(i), f"u{i}", pin_hash=PIN), f"a{i}")
+            cuenta.depositar_centavos(1_000_000)
+            numeros.append(cuenta.numero)
+        azar = random.Random(0)
+        for desde in range(0, n_transferencias, LOTE):
+            lote = [(numeros[k], numeros[k - 1], azar.randint(1, 100))
+                    for k in (azar.randrange(n_cuentas) for _ in range(min(LOTE, n_transferencias - desde)))]
+            banco.aplicar_lote(lote)
+        banco.checkpoint()
+        print(f"Banco: {n_cuentas} cuentas, {len(banco.libro)} filas ({time.perf_counter() - inicio:.1f} s)")
+
+        for nombre, argumentos in (("1 proceso", {}), (f"{procesos} procesos", {"procesos": procesos})):
+            resultado = conciliar(banco, **argumentos)
+            print(f"{nombre:<12} {resultado.segundos:6.2f} s  {resultado.filas_por_segundo / 1e6:6.1f} M filas/s  "
+                  f"ok={resultado.ok}")
+        banco.cerrar()
+
+        inicio = time.perf_counter()
+        restaurado = BankManager()
+        restaurado.abrir_journal(ruta, verificar=True)
+        print(f"Reinicio con verificación: {time.perf_counter() - inicio:.2f} s")
+        restaurado.cerrar()
+
+
+if __name__ == "__main__":
+    main()
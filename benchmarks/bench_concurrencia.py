@@ -0,0 +1,58 @@
+"""Estrés de transferencias concurrentes con locks por cuenta.
+
+Mide el throughput con distintas cantidades de hilos y verifica que el dinero
+total se conserve. Con el GIL el escalado es limitado; en builds free-threaded
+(Python 3.13t) los locks por cuenta permiten que escale.
+
+Uso: python -m benchmarks.bench_concurrencia [cuentas] [transferencias_por_hilo]
+"""
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from bank.manager import BankManager
+from bank.models import hash_pin
+
+# Un único hash para todos los clientes: se mide el banco, no el PBKDF2
+PIN = hash_pin("1111")
+
+
+def preparar(n_cuentas):
+    banco = BankManager(concurrente=True)
+    cuentas = []
+    for i in range(n_cuentas):
+        cliente = banco.crear_cliente("N", "A", str(i), f"u{i}", pin_hash=PIN)
+        cuenta = banco.crear_cuenta(cliente, f"a{i}")
+        cuenta.depositar_centavos(1_000_000)
+        cuentas.append(cuenta)
+    return banco, cuentas
+
+
+def trabajar(cuentas, n, semilla):
+    azar = random.Random(semilla)
+    for _ in range(n):
+        origen, destino = azar.sample(cuentas, 2)
+        try:
+            origen.transferir_centavos(azar.randint(1, 10_000), destino)
+        except ValueError:
+            pass
+
+
+def main():
+    n_cuentas = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    por_hilo = int(sys.argv[2]) if len(sys.argv) > 2 else 20_000
+    print(f"{'hilos':>6} {'transf/s':>12} {'conservado':>11}")
+    for hilos in (1, 2, 4, 8):
+        banco, cuentas = preparar(n_cuentas)
+        total_inicial = banco.saldo_total_centavos()
+        inicio = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=hilos) as pool:
+            list(pool.map(lambda s: trabajar(cuentas, por_hilo, s), range(hilos)))
+        duracion = time.perf_counter() - inicio
+        conservado = banco.saldo_total_centavos() == total_inicial
+        print(f"{hilos:>6} {hilos * por_hilo / duracion:>12.0f} {str(conservado):>11}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""Consultas por fecha, tipo y monto sobre un libro mayor grande.
+
+Compara el recorrido completo del historial (lo que hacía falta antes) con
+Ledger.consultar, que ubica los tramos por búsqueda binaria.
+
+Uso: python -m benchmarks.bench_consultas [movimientos]
+"""
+import random
+import sys
+import time
+
+from bank.ledger import DEPOSITO, RETIRO, TIPOS, Ledger
+
+
+def _medir(funcion, repeticiones=100):
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        resultado = funcion()
+    return (time.perf_counter() - inicio) / repeticiones, len(resultado)
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    azar = random.Random(1)
+    libro = Ledger()
+    inicio = 1_700_000_000.0
+    for k in range(n):
+        libro.movimiento(k % 1000, azar.choice(TIPOS), azar.randrange(1, 1_000_000), fecha=inicio + k)
+
+    t = time.perf_counter()
+    list(libro.consultar(tipos=RETIRO, minimo=0))
+    print(f"Índices de consulta armados en {time.perf_counter() - t:.2f} s ({n} filas)")
+
+    desde, hasta = inicio + n // 2, inicio + n // 2 + 100
+
+    def recorrido():
+        return [i for i in range(len(libro)) if desde <= libro.fechas[i] < hasta]
+
+    casos = [
+        ("100 movimientos por fecha (recorrido)", recorrido, 3),
+        ("100 movimientos por fecha", lambda: list(libro.consultar(desde, hasta)), 1000),
+        ("retiros > 999.900 centavos", lambda: list(libro.consultar(tipos=RETIRO, minimo=999_900)), 1000),
+        ("depósitos en 1 h entre 5000 y 6000", lambda: list(
+            libro.consultar(desde, desde + 3600, tipos=DEPOSITO, minimo=5000, maximo=6000)), 1000),
+    ]
+    for nombre, funcion, repeticiones in casos:
+        segundos, filas = _medir(funcion, repeticiones)
+        print(f"{nombre:<40} {segundos * 1e6:>12.1f} µs  ({filas} filas)")
+
+
+if __name__ == "__main__":
+    main()
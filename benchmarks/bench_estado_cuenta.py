@@ -0,0 +1,37 @@
+"""Estado de cuenta de un historial largo: en frío vs. con páginas en cache.
+
+Uso: python -m benchmarks.bench_estado_cuenta [movimientos]
+"""
+import sys
+import tempfile
+import time
+
+from bank.manager import BankManager
+from generator_pdf import StatementCache, generar_pdf
+
+
+def main():
+    n_movimientos = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    banco = BankManager()
+    cliente = banco.crear_cliente("Nombre", "Apellido", "1", "u1", "1111")
+    cuenta = banco.crear_cuenta(cliente, "alias1")
+    for _ in range(n_movimientos):
+        cuenta.depositar_centavos(1000)
+
+    cache = StatementCache()
+    with tempfile.TemporaryDirectory() as carpeta:
+        inicio = time.perf_counter()
+        generar_pdf(cliente, carpeta, cache)
+        frio = time.perf_counter() - inicio
+        print(f"En frío: {frio:.2f} s ({len(cache)} páginas, {cache.bytes / 2**20:.1f} MiB en cache)")
+
+        cuenta.depositar_centavos(500)
+        inicio = time.perf_counter()
+        generar_pdf(cliente, carpeta, cache)
+        tibio = time.perf_counter() - inicio
+        print(f"Tras un depósito nuevo: {tibio:.2f} s ({cache.aciertos} páginas reutilizadas, "
+              f"x{frio / tibio:.1f})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""Costo de los límites de velocidad en el camino de retirar y transferir.
+
+Uso: python -m benchmarks.bench_limites [cuentas] [operaciones]
+"""
+import random
+import sys
+import time
+
+from bank.ledger import RETIRO, TRANSFERENCIA_ENVIADA
+from bank.limits import DIA, MINUTO, Limite
+from bank.manager import BankManager
+from bank.models import hash_pin
+
+# Un único hash para todos los clientes: se mide el banco, no el PBKDF2
+PIN = hash_pin("1111")
+
+LIMITES = (
+    Limite.monto([RETIRO], DIA, 10**15),
+    Limite.monto([RETIRO, TRANSFERENCIA_ENVIADA], DIA, 10**15),
+    Limite.cantidad([TRANSFERENCIA_ENVIADA], MINUTO, 10**9),
+)
+
+
+def _medir(cuentas, n_operaciones):
+    azar = random.Random(0)
+    pares = [azar.sample(cuentas, 2) for _ in range(n_operaciones)]
+    inicio = time.perf_counter()
+    for origen, destino in pares:
+        origen.retirar_centavos(1)
+        origen.transferir_centavos(1, destino)
+    return (time.perf_counter() - inicio) / (2 * n_operaciones) * 1e6
+
+
+def main():
+    n_cuentas = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    n_operaciones = int(sys.argv[2]) if len(sys.argv) > 2 else 200_000
+    banco = BankManager()
+    cuentas = []
+    for i in range(n_cuentas):
+        cuenta = banco.crear_cuenta(banco.crear_cliente("N", "A", str(i), f"u{i}", pin_hash=PIN), f"a{i}")
+        cuenta.depositar_centavos(100_000_000)
+        cuentas.append(cuenta)
+
+    _medir(cuentas, n_operaciones)  # calentamiento: el libro y las cuentas ya crecieron
+    sin_limites = _medir(cuentas, n_operaciones)
+    banco.configurar_limites(LIMITES)
+    # Primera operación de cada cuenta: arma sus ventanas desde el historial
+    inicio = time.perf_counter()
+    for cuenta in cuentas:
+        banco.limites.disponible(cuenta)
+    armado = (time.perf_counter() - inicio) / n_cuentas * 1e6
+    con_limites = _medir(cuentas, n_operaciones)
+    print(f"Sin límites:            {sin_limites:6.2f} µs por operación")
+    print(f"Con {len(LIMITES)} límites:          {con_limites:6.2f} µs por operación "
+          f"(+{con_limites - sin_limites:.2f} µs)")
+    print(f"Armado de ventanas:     {armado:6.2f} µs por cuenta")
+
+
+if __name__ == "__main__":
+    main()
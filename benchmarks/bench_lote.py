@@ -0,0 +1,61 @@
+"""Compara BankManager.aplicar_lote contra un bucle de Account.transferir_centavos.
+
+Uso: python -m benchmarks.bench_lote [tamaño ...]   (por defecto 10000 y 1000000)
+"""
+import random
+import sys
+import time
+
+from bank.allocator import AccountNumberAllocator
+from bank.manager import BankManager
+from bank.models import hash_pin
+
+# Un único hash para todos los clientes: se mide el banco, no el PBKDF2
+PIN = hash_pin("1111")
+
+
+def preparar(n_cuentas):
+    # Clave fija: ambos bancos generan los mismos números de cuenta
+    banco = BankManager(AccountNumberAllocator(ancho=8, clave=1))
+    cuentas = []
+    for i in range(n_cuentas):
+        cliente = banco.crear_cliente("N", "A", str(i), f"u{i}", pin_hash=PIN)
+        cuenta = banco.crear_cuenta(cliente, f"a{i}")
+        cuenta.depositar_centavos(10_000_000)
+        cuentas.append(cuenta)
+    return banco, cuentas
+
+
+def generar(cuentas, n, semilla=0):
+    azar = random.Random(semilla)
+    numeros = [c.numero for c in cuentas]
+    lote = []
+    for _ in range(n):
+        origen, destino = azar.sample(numeros, 2)
+        lote.append((origen, destino, azar.randint(1, 1000)))
+    return lote
+
+
+def main():
+    tamanios = [int(x) for x in sys.argv[1:]] or [10_000, 1_000_000]
+    print(f"{'transferencias':>15} {'bucle (s)':>10} {'lote (s)':>10} {'aceleración':>12}")
+    for n in tamanios:
+        n_cuentas = max(100, n // 10)
+        banco, cuentas = preparar(n_cuentas)
+        lote = generar(cuentas, n)
+        inicio = time.perf_counter()
+        buscar = banco.buscar_cuenta_por_numero
+        for origen, destino, centavos in lote:
+            buscar(origen).transferir_centavos(centavos, buscar(destino))
+        bucle = time.perf_counter() - inicio
+
+        banco, cuentas = preparar(n_cuentas)
+        inicio = time.perf_counter()
+        resultado = banco.aplicar_lote(lote)
+        vectorizado = time.perf_counter() - inicio
+        assert all(r is None for r in resultado)
+        print(f"{n:>15} {bucle:>10.3f} {vectorizado:>10.3f} {bucle / vectorizado:>11.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""Memoria de un millón de movimientos: objetos con __dict__ y textos vs. Transaction con slots vs. libro.
+
+El modelo anterior guardaba en cada movimiento el tipo y la fecha ya
+formateados (dos str por objeto) y un float en pesos, en un __dict__.
+
+Uso: python -m benchmarks.bench_memoria [movimientos]
+"""
+import sys
+import time
+import tracemalloc
+
+from bank.ledger import DEPOSITO, TRANSFERENCIA_ENVIADA, Ledger, describir, formatear_fecha
+from bank.models import Transaction
+
+
+class _MovimientoAnterior:
+    def __init__(self, tipo, monto, fecha):
+        self.tipo = tipo
+        self.monto = monto
+        self.fecha = fecha
+
+
+def _medir(construir):
+    tracemalloc.start()
+    objetos = construir()
+    actual, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del objetos
+    return actual
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    inicio = time.time()
+
+    def codigo(i):
+        return TRANSFERENCIA_ENVIADA if i % 4 == 0 else DEPOSITO
+
+    def anteriores():
+        return [_MovimientoAnterior(describir(codigo(i), 1000 + i % 97), (1000 + i) / 100,
+                                    formatear_fecha(inicio + i)) for i in range(n)]
+
+    def compactos():
+        return [Transaction(codigo(i), 1000 + i, inicio + i, 1000 + i % 97) for i in range(n)]
+
+    def libro():
+        libro = Ledger()
+        for i in range(n):
+            libro.movimiento(1, codigo(i), 1000 + i, 1000 + i % 97)
+        return libro
+
+    escala = 1_000_000 / n
+    filas = [("__dict__ + textos", _medir(anteriores)),
+             ("Transaction con __slots__", _medir(compactos)),
+             ("Libro mayor (columnas)", _medir(libro))]
+    base = filas[0][1]
+    print(f"{'modelo':<28}{'MiB / 1M':>10}{'bytes/mov':>11}{'ahorro':>9}")
+    for nombre, bytes_ in filas:
+        print(f"{nombre:<28}{bytes_ * escala / 2**20:>10.1f}{bytes_ / n:>11.1f}{1 - bytes_ / base:>9.0%}")
+
+
+if __name__ == "__main__":
+    main()
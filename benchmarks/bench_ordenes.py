@@ -0,0 +1,51 @@
+"""Órdenes permanentes: el costo de cada pasada depende de las vencidas, no de las programadas.
+
+Uso: python -m benchmarks.bench_ordenes [cuentas] [órdenes] [vencidas por pasada]
+"""
+import random
+import sys
+import time
+from datetime import datetime
+
+from bank.allocator import AccountNumberAllocator
+from bank.manager import BankManager
+from bank.models import hash_pin
+
+# Un único hash para todos los clientes: se mide el banco, no el PBKDF2
+PIN = hash_pin("1111")
+
+INICIO = datetime(2024, 1, 1).timestamp()
+DIA = 86400.0
+
+
+def main():
+    n_cuentas = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    n_ordenes = int(sys.argv[2]) if len(sys.argv) > 2 else 1_000_000
+    vencidas = int(sys.argv[3]) if len(sys.argv) > 3 else 1000
+
+    banco = BankManager(AccountNumberAllocator(ancho=7, clave=1))
+    cuentas = []
+    for i in range(n_cuentas):
+        cuenta = banco.crear_cuenta(banco.crear_cliente("N", "A", str(i), f"u{i}", pin_hash=PIN), f"a{i}")
+        cuenta.depositar_centavos(100_000_000)
+        cuentas.append(cuenta)
+
+    # Vencimientos repartidos uniformemente en un año: cada pasada cubre el tramo con `vencidas` órdenes
+    azar = random.Random(0)
+    inicio = time.perf_counter()
+    for _ in range(n_ordenes):
+        origen, destino = azar.sample(cuentas, 2)
+        banco.programar_transferencia(origen, destino, azar.randint(1, 1000),
+                                      INICIO + azar.random() * 365 * DIA, meses=1)
+    print(f"{n_ordenes} órdenes programadas en {time.perf_counter() - inicio:.1f} s")
+
+    tramo = 365 * DIA * vencidas / n_ordenes
+    ahora = INICIO
+    for _ in range(5):
+        ahora += tramo
+        resultado = banco.ejecutar_ordenes(ahora)
+        print(f"{resultado}  {resultado.segundos / max(resultado.vencidas, 1) * 1e6:.1f} µs por orden")
+
+
+if __name__ == "__main__":
+    main()
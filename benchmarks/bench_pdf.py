@@ -0,0 +1,46 @@
+"""Estados de cuenta masivos: un proceso vs. pool de procesos.
+
+Uso: python -m benchmarks.bench_pdf [clientes] [movimientos_por_cuenta] [procesos]
+"""
+import os
+import sys
+import tempfile
+import time
+
+from bank.manager import BankManager
+from bank.models import hash_pin
+from generator_pdf import generar_pdf, generar_pdfs
+
+# Un único hash para todos los clientes: se mide el banco, no el PBKDF2
+PIN = hash_pin("1111")
+
+
+def preparar(n_clientes, n_movimientos):
+    banco = BankManager()
+    for i in range(n_clientes):
+        cliente = banco.crear_cliente("Nombre", "Apellido", str(i), f"u{i}", pin_hash=PIN)
+        cuenta = banco.crear_cuenta(cliente, f"alias{i}")
+        for _ in range(n_movimientos):
+            cuenta.depositar_centavos(1000)
+    return banco
+
+
+def main():
+    n_clientes = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    n_movimientos = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    procesos = int(sys.argv[3]) if len(sys.argv) > 3 else os.cpu_count()
+    banco = preparar(n_clientes, n_movimientos)
+    with tempfile.TemporaryDirectory() as carpeta:
+        inicio = time.perf_counter()
+        for cliente in banco.clientes:
+            generar_pdf(cliente, carpeta)
+        secuencial = time.perf_counter() - inicio
+        print(f"Secuencial: {n_clientes / secuencial:.1f} PDFs/s")
+
+        resultado = generar_pdfs(banco, procesos=procesos, carpeta=carpeta)
+        print(f"Pool de {procesos} procesos: {resultado['pdfs_por_segundo']:.1f} PDFs/s "
+              f"({len(resultado['rutas'])} PDFs en {resultado['duracion']:.2f} s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""Throughput del banco repartido en procesos con una carga mixta.
+
+Carga: 40% depósitos, 20% retiros, 40% transferencias entre cuentas al azar
+(la mayoría cruza shards). Se compara contra un BankManager en un solo proceso
+y se verifica que el dinero total sea depósitos - retiros.
+
+Uso: python -m benchmarks.bench_sharding [cuentas] [operaciones] [tamaño_lote]
+"""
+import os
+import random
+import sys
+import time
+
+from bank.allocator import AccountNumberAllocator
+from bank.manager import BankManager
+from bank.models import hash_pin
+from bank.sharding import ShardedBank
+
+# Un único hash para todos los clientes: se mide el banco, no el PBKDF2
+PIN = hash_pin("1111")
+
+
+def generar(numeros, n, semilla=0):
+    azar = random.Random(semilla)
+    operaciones = []
+    for _ in range(n):
+        r = azar.random()
+        if r < 0.4:
+            operaciones.append(("depositar", azar.choice(numeros), azar.randint(1, 1000)))
+        elif r < 0.6:
+            operaciones.append(("retirar", azar.choice(numeros), azar.randint(1, 1000)))
+        else:
+            origen, destino = azar.sample(numeros, 2)
+            operaciones.append(("transferir", origen, destino, azar.randint(1, 1000)))
+    return operaciones
+
+
+def un_proceso(n_cuentas, operaciones):
+    banco = BankManager(AccountNumberAllocator(clave=7))
+    for i in range(n_cuentas):
+        cliente = banco.crear_cliente("N", "A", str(i), f"u{i}", pin_hash=PIN)
+        banco.crear_cuenta(cliente, "a").depositar_centavos(100_000)
+    buscar = banco.buscar_cuenta_por_numero
+    inicio = time.perf_counter()
+    for operacion in operaciones:
+        try:
+            if operacion[0] == "depositar":
+                buscar(operacion[1]).depositar_centavos(operacion[2])
+            elif operacion[0] == "retirar":
+                buscar(operacion[1]).retirar_centavos(operacion[2])
+            else:
+                buscar(operacion[1]).transferir_centavos(operacion[3], buscar(operacion[2]))
+        except ValueError:
+            pass
+    return time.perf_counter() - inicio
+
+
+def repartido(n_shards, n_cuentas, operaciones, tamanio_lote):
+    with ShardedBank(n_shards, AccountNumberAllocator(clave=7)) as banco:
+        numeros = []
+        for i in range(n_cuentas):
+            banco.crear_cliente("N", "A", str(i), f"u{i}", pin_hash=PIN)
+            numeros.append(banco.crear_cuenta(f"u{i}", "a"))
+        banco.ejecutar([("depositar", numero, 100_000) for numero in numeros])
+        total_inicial = banco.saldo_total_centavos()
+
+        inicio = time.perf_counter()
+        esperado = total_inicial
+        for k in range(0, len(operaciones), tamanio_lote):
+            lote = operaciones[k:k + tamanio_lote]
+            for operacion, (ok, _) in zip(lote, banco.ejecutar(lote)):
+                if ok and operacion[0] == "depositar":
+                    esperado += operacion[2]
+                elif ok and operacion[0] == "retirar":
+                    esperado -= operacion[2]
+        duracion = time.perf_counter() - inicio
+        return duracion, banco.saldo_total_centavos() == esperado
+
+
+def main():
+    n_cuentas = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    n_ops = int(sys.argv[2]) if len(sys.argv) > 2 else 200_000
+    tamanio_lote = int(sys.argv[3]) if len(sys.argv) > 3 else 5_000
+    asignador = AccountNumberAllocator(clave=7)
+    numeros = [asignador.siguiente() for _ in range(n_cuentas)]
+    operaciones = generar(numeros, n_ops)
+
+    base = un_proceso(n_cuentas, operaciones)
+    print(f"Un solo proceso (sin shards): {n_ops / base:.0f} ops/s")
+    print(f"{'shards':>7} {'ops/s':>12} {'conservado':>11}")
+    shards = 1
+    while shards <= (os.cpu_count() or 1):
+        duracion, conservado = repartido(shards, n_cuentas, operaciones, tamanio_lote)
+        print(f"{shards:>7} {n_ops / duracion:>12.0f} {str(conservado):>11}")
+        shards *= 2
+
+
+if __name__ == "__main__":
+    main()
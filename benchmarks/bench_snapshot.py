@@ -0,0 +1,58 @@
+"""Compara el arranque en frío: snapshot mmap vs. reconstrucción completa.
+
+Uso: python -m benchmarks.bench_snapshot [cantidad_clientes]
+"""
+import os
+import sys
+import tempfile
+import time
+
+from bank.manager import BankManager
+from bank.models import hash_pin
+
+# Un único hash para todos los clientes: se mide el banco, no el PBKDF2
+PIN = hash_pin("1234")
+
+
+def medir(descripcion, funcion):
+    inicio = time.perf_counter()
+    resultado = funcion()
+    print(f"{descripcion:<45} {time.perf_counter() - inicio:8.3f} s")
+    return resultado
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    with tempfile.TemporaryDirectory() as carpeta:
+        ruta_snapshot = os.path.join(carpeta, "banco.snap")
+        ruta_journal = os.path.join(carpeta, "banco.journal")
+
+        banco = BankManager()
+        banco.abrir_journal(ruta_journal, lote=4096)
+        medir(f"Construcción de {n} clientes (con journal)", lambda: _poblar(banco, n))
+        banco.cerrar()
+        medir("Guardado del snapshot", lambda: banco.guardar_snapshot(ruta_snapshot))
+        print(f"Tamaño del snapshot: {os.path.getsize(ruta_snapshot) / 1e6:.1f} MB")
+
+        def replay():
+            restaurado = BankManager()
+            restaurado.abrir_journal(ruta_journal)
+            restaurado.cerrar()
+            return restaurado
+
+        medir("Arranque con replay completo del journal", replay)
+        cargado = medir("Arranque con snapshot mmap", lambda: BankManager.cargar_snapshot(ruta_snapshot))
+        medir("Primer login tras snapshot", lambda: cargado.buscar_cliente(f"user{n // 2}"))
+        medir("Materialización completa del snapshot", lambda: list(cargado.clientes))
+
+
+def _poblar(banco, n):
+    for i in range(n):
+        cliente = banco.crear_cliente(f"Nombre{i}", f"Apellido{i}", str(i), f"user{i}", pin_hash=PIN)
+        cuenta = banco.crear_cuenta(cliente, f"alias{i % 1000}")
+        cuenta.depositar(100)
+        cuenta.retirar(10)
+
+
+if __name__ == "__main__":
+    main()
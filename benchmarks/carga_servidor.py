@@ -0,0 +1,112 @@
+"""Prueba de carga local para bank.server.
+
+Levanta el servidor en el mismo proceso (o usa --host/--puerto de uno ya
+corriendo), abre varias conexiones y en cada una mantiene una ventana de
+pedidos en vuelo. Informa pedidos por segundo y latencias p50/p99.
+
+Uso: python -m benchmarks.carga_servidor [--conexiones 8] [--ventana 64] [--pedidos 100000]
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+
+from bank.manager import BankManager
+from bank.server import BankServer
+
+
+async def preparar_cuentas(host, puerto, n):
+    lector, escritor = await asyncio.open_connection(host, puerto)
+    for i in range(n):
+        escritor.write(json.dumps({"op": "crear_cliente", "nombre": "N", "apellido": "A", "dni": str(i),
+                                   "usuario": f"carga{i}", "pin": "1111"}).encode() + b"\n")
+        escritor.write(json.dumps({"op": "crear_cuenta", "usuario": f"carga{i}", "alias": f"c{i}"}).encode() + b"\n")
+    await escritor.drain()
+    numeros = []
+    for _ in range(n):
+        await lector.readline()
+        numeros.append(json.loads(await lector.readline())["resultado"])
+    for numero in numeros:
+        escritor.write(json.dumps({"op": "depositar", "numero": numero, "centavos": 10_000_000}).encode() + b"\n")
+    await escritor.drain()
+    for _ in numeros:
+        await lector.readline()
+    escritor.close()
+    return numeros
+
+
+async def conexion(host, puerto, numeros, n_pedidos, ventana, latencias, semilla):
+    azar = random.Random(semilla)
+    lector, escritor = await asyncio.open_connection(host, puerto, limit=1 << 20)
+    enviados = {}
+
+    async def leer():
+        for _ in range(n_pedidos):
+            respuesta = json.loads(await lector.readline())
+            latencias.append(time.perf_counter() - enviados.pop(respuesta["id"]))
+            espacio.release()
+
+    espacio = asyncio.Semaphore(ventana)
+    lectura = asyncio.create_task(leer())
+    for i in range(n_pedidos):
+        await espacio.acquire()
+        r = azar.random()
+        if r < 0.3:
+            pedido = {"op": "depositar", "numero": azar.choice(numeros), "centavos": 100}
+        elif r < 0.5:
+            pedido = {"op": "retirar", "numero": azar.choice(numeros), "centavos": 100}
+        elif r < 0.8:
+            origen, destino = azar.sample(numeros, 2)
+            pedido = {"op": "transferir", "origen": origen, "destino": destino, "centavos": 100}
+        else:
+            pedido = {"op": "buscar_cuenta", "numero": azar.choice(numeros)}
+        pedido["id"] = i
+        enviados[i] = time.perf_counter()
+        escritor.write(json.dumps(pedido).encode() + b"\n")
+        if espacio.locked():
+            await escritor.drain()
+    await escritor.drain()
+    await lectura
+    escritor.close()
+
+
+async def correr(args):
+    servidor = None
+    host, puerto = args.host, args.puerto
+    if puerto is None:
+        servidor = BankServer(BankManager())
+        host, puerto = await servidor.iniciar("127.0.0.1", 0)
+    numeros = await preparar_cuentas(host, puerto, args.cuentas)
+
+    latencias = []
+    por_conexion = args.pedidos // args.conexiones
+    inicio = time.perf_counter()
+    await asyncio.gather(*(
+        conexion(host, puerto, numeros, por_conexion, args.ventana, latencias, semilla)
+        for semilla in range(args.conexiones)
+    ))
+    duracion = time.perf_counter() - inicio
+    if servidor is not None:
+        await servidor.detener()
+
+    latencias.sort()
+    total = len(latencias)
+    print(f"Pedidos: {total} en {duracion:.2f} s -> {total / duracion:.0f} pedidos/s")
+    print(f"Latencia p50: {latencias[total // 2] * 1000:.2f} ms | "
+          f"p99: {latencias[int(total * 0.99)] * 1000:.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--puerto", type=int, default=None)
+    parser.add_argument("--conexiones", type=int, default=8)
+    parser.add_argument("--ventana", type=int, default=64)
+    parser.add_argument("--pedidos", type=int, default=100_000)
+    parser.add_argument("--cuentas", type=int, default=1000)
+    asyncio.run(correr(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
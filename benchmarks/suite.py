@@ -0,0 +1,251 @@
+"""Suite de rendimiento: todas las operaciones de BankManager y Account a escala.
+
+Cada operación se corre sobre n entidades (10³, 10⁵ y 10⁶ por defecto) y se
+registran el tiempo total, el tiempo por entidad y el pico de memoria. La
+tabla final muestra la curva de escalado y el exponente estimado k de
+O(n^k): ~1 es lineal, ~2 delata un costo cuadrático.
+
+Uso:
+    python -m benchmarks.suite                        # compara contra la línea base
+    python -m benchmarks.suite --guardar              # graba la línea base
+    python -m benchmarks.suite --tamanios 1000 100000 --umbral 0.5 --sin-memoria
+
+Termina con código 1 si alguna operación empeora más que el umbral.
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from bank.allocator import AccountNumberAllocator
+from bank.manager import BankManager
+from bank.models import hash_pin
+from generator_pdf import generar_pdf
+
+# Un único hash para todos los clientes: se mide el banco, no el PBKDF2
+PIN = hash_pin("1234")
+
+TAMANIOS = (1_000, 100_000, 1_000_000)
+LINEA_BASE = os.path.join(os.path.dirname(__file__), "linea_base.json")
+# El PDF escala con el historial de la cuenta: se imprime una con n // 100 movimientos
+DIVISOR_PDF = 100
+
+
+class Estado:
+    """Banco compartido por las operaciones de un mismo tamaño."""
+
+    def __init__(self, n):
+        self.n = n
+        # Ancho 8: alcanza para 10⁶ cuentas más 10⁶ números sueltos
+        self.banco = BankManager(AccountNumberAllocator(ancho=8, clave=1))
+        self.clientes = []
+        self.cuentas = []
+
+
+def _crear_clientes(e):
+    for i in range(e.n):
+        e.clientes.append(e.banco.crear_cliente(f"Nombre{i}", f"Apellido{i}", str(i), f"user{i}", pin_hash=PIN))
+    return e.n
+
+
+def _buscar_clientes(e):
+    buscar = e.banco.buscar_cliente
+    for i in range(e.n):
+        buscar(f"user{i}")
+    return e.n
+
+
+def _crear_cuentas(e):
+    for i, cliente in enumerate(e.clientes):
+        e.cuentas.append(e.banco.crear_cuenta(cliente, f"alias{i}"))
+    return e.n
+
+
+def _generar_numeros(e):
+    for _ in range(e.n):
+        e.banco.generar_numero_unico()
+    return e.n
+
+
+def _buscar_alias(e):
+    buscar = e.banco.buscar_cuenta_por_alias
+    for i in range(e.n):
+        buscar(f"alias{i}")
+    return e.n
+
+
+def _depositar(e):
+    for cuenta in e.cuentas:
+        cuenta.depositar(100)
+    return e.n
+
+
+def _retirar(e):
+    for cuenta in e.cuentas:
+        cuenta.retirar(10)
+    return e.n
+
+
+def _transferir(e):
+    cuentas = e.cuentas
+    for i, cuenta in enumerate(cuentas):
+        cuenta.transferir(1, cuentas[i - 1])
+    return e.n
+
+
+def _listar_clientes(e):
+    e.banco.listar_clientes()
+    return e.n
+
+
+def _generar_pdf(e):
+    cuenta = e.cuentas[0]
+    movimientos = max(1, e.n // DIVISOR_PDF)
+    for _ in range(movimientos):
+        cuenta.depositar_centavos(100)
+    with tempfile.TemporaryDirectory() as carpeta:
+        generar_pdf(cuenta.cliente, carpeta, cache=None)
+    return movimientos
+
+
+# En orden: cada operación deja el banco listo para las siguientes
+OPERACIONES = (
+    ("crear_cliente", _crear_clientes),
+    ("buscar_cliente", _buscar_clientes),
+    ("crear_cuenta", _crear_cuentas),
+    ("generar_numero_unico", _generar_numeros),
+    ("buscar_cuenta_por_alias", _buscar_alias),
+    ("depositar", _depositar),
+    ("retirar", _retirar),
+    ("transferir", _transferir),
+    ("listar_clientes", _listar_clientes),
+    ("generar_pdf", _generar_pdf),
+)
+
+
+def medir_tiempos(n):
+    estado = Estado(n)
+    resultados = {}
+    for nombre, operacion in OPERACIONES:
+        inicio = time.perf_counter()
+        entidades = operacion(estado)
+        segundos = time.perf_counter() - inicio
+        resultados[nombre] = {"entidades": entidades, "segundos": segundos}
+    return resultados
+
+
+def medir_memoria(n):
+    # Pasada aparte: tracemalloc distorsiona los tiempos
+    estado = Estado(n)
+    picos = {}
+    tracemalloc.start()
+    try:
+        for nombre, operacion in OPERACIONES:
+            tracemalloc.reset_peak()
+            base, _ = tracemalloc.get_traced_memory()
+            operacion(estado)
+            picos[nombre] = tracemalloc.get_traced_memory()[1] - base
+    finally:
+        tracemalloc.stop()
+    return picos
+
+
+def correr(tamanios=TAMANIOS, memoria=True, salida=print):
+    resultados = {}
+    for n in tamanios:
+        salida(f"n = {n}...")
+        medidas = medir_tiempos(n)
+        if memoria:
+            for nombre, pico in medir_memoria(n).items():
+                medidas[nombre]["pico_bytes"] = pico
+        resultados[str(n)] = medidas
+    return resultados
+
+
+def exponente(resultados, nombre):
+    """Pendiente log-log del tiempo total entre el tamaño menor y el mayor."""
+    puntos = [(r[nombre]["entidades"], r[nombre]["segundos"])
+              for _, r in sorted(resultados.items(), key=lambda item: int(item[0]))]
+    if len(puntos) < 2:
+        return None
+    (n0, t0), (n1, t1) = puntos[0], puntos[-1]
+    if n1 == n0 or t0 <= 0 or t1 <= 0:
+        return None
+    return math.log(t1 / t0) / math.log(n1 / n0)
+
+
+def tabla(resultados):
+    tamanios = sorted(resultados, key=int)
+    lineas = [f"{'operación':<24}" + "".join(f"{'µs/ent n=' + n:>16}" for n in tamanios)
+              + "".join(f"{'MiB n=' + n:>14}" for n in tamanios) + f"{'O(n^k)':>8}"]
+    for nombre, _ in OPERACIONES:
+        fila = f"{nombre:<24}"
+        for n in tamanios:
+            medida = resultados[n][nombre]
+            fila += f"{medida['segundos'] / medida['entidades'] * 1e6:16.2f}"
+        for n in tamanios:
+            pico = resultados[n][nombre].get("pico_bytes")
+            fila += f"{pico / 2**20:14.1f}" if pico is not None else f"{'-':>14}"
+        k = exponente(resultados, nombre)
+        fila += f"{k:8.2f}" if k is not None else f"{'-':>8}"
+        lineas.append(fila)
+    return "\n".join(lineas)
+
+
+def comparar(resultados, linea_base, umbral):
+    """Devuelve las regresiones (texto) respecto de la línea base.
+
+    Una medida regresa si supera a la de la línea base en más de `umbral`
+    (0.25 = 25 %). Los tiempos se comparan por entidad.
+    """
+    regresiones = []
+    for n, medidas in resultados.items():
+        for nombre, medida in medidas.items():
+            base = linea_base.get(n, {}).get(nombre)
+            if base is None:
+                continue
+            actual = medida["segundos"] / medida["entidades"]
+            anterior = base["segundos"] / base["entidades"]
+            if actual > anterior * (1 + umbral):
+                regresiones.append(f"{nombre} n={n}: tiempo x{actual / anterior:.2f}")
+            if "pico_bytes" in medida and base.get("pico_bytes"):
+                if medida["pico_bytes"] > base["pico_bytes"] * (1 + umbral):
+                    regresiones.append(f"{nombre} n={n}: memoria x{medida['pico_bytes'] / base['pico_bytes']:.2f}")
+    return regresiones
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tamanios", type=int, nargs="+", default=list(TAMANIOS))
+    parser.add_argument("--linea-base", default=LINEA_BASE)
+    parser.add_argument("--guardar", action="store_true", help="graba los resultados como línea base")
+    parser.add_argument("--umbral", type=float, default=0.25, help="regresión tolerada (0.25 = 25 %%)")
+    parser.add_argument("--sin-memoria", action="store_true", help="no mide el pico de memoria")
+    args = parser.parse_args(argv)
+
+    resultados = correr(args.tamanios, memoria=not args.sin_memoria)
+    print(tabla(resultados))
+
+    if args.guardar:
+        with open(args.linea_base, "w", encoding="utf-8") as f:
+            json.dump({"python": platform.python_version(), "resultados": resultados}, f, indent=2)
+        print(f"Línea base guardada en {args.linea_base}")
+        return 0
+    if not os.path.exists(args.linea_base):
+        print("Sin línea base para comparar (usar --guardar).")
+        return 0
+    with open(args.linea_base, encoding="utf-8") as f:
+        linea_base = json.load(f)["resultados"]
+    regresiones = comparar(resultados, linea_base, args.umbral)
+    for regresion in regresiones:
+        print(f"REGRESIÓN: {regresion}")
+    return 1 if regresiones else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,14 +1,91 @@
 import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing import get_context
 from fpdf import FPDF
 from datetime import datetime
+from bank.metrics import instrumentar
+from bank.money import formatear
 
+CARPETA_PDFS = "pdfs"
+# Movimientos que se formatean por tanda al recorrer historiales largos
+TANDA_MOVIMIENTOS = 500
+ALTO_LINEA = 8
 
-def generar_pdf(cliente):
-    os.makedirs("pdfs", exist_ok=True)
-    nombre_archivo = f"pdfs/{cliente.dni} - {cliente.nombre} {cliente.apellido} - {datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
 
+class StatementCache:
+    """Páginas de historial ya formateadas, con desalojo LRU por tamaño.
+
+    Cada entrada son las líneas de una página completa de movimientos de
+    una cuenta, ya formateadas; el tamaño se cuenta en caracteres. El historial
+    solo crece, así que una página llena no cambia más: la clave lleva la
+    identidad del libro (Ledger.identidad) y las filas que cubre, y nunca
+    hace falta invalidarla.
+    """
+
+    def __init__(self, max_bytes=64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.aciertos = 0
+        self.fallos = 0
+        self._paginas = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._paginas)
+
+    def obtener(self, clave):
+        with self._lock:
+            pagina = self._paginas.get(clave)
+            if pagina is None:
+                self.fallos += 1
+                return None
+            self._paginas.move_to_end(clave)
+            self.aciertos += 1
+            return pagina[0]
+
+    def guardar(self, clave, lineas):
+        tamanio = sum(map(len, lineas))
+        if tamanio > self.max_bytes:
+            return
+        with self._lock:
+            anterior = self._paginas.pop(clave, None)
+            if anterior is not None:
+                self.bytes -= anterior[1]
+            self._paginas[clave] = (lineas, tamanio)
+            self.bytes += tamanio
+            while self.bytes > self.max_bytes:
+                _, (_, viejo) = self._paginas.popitem(last=False)
+                self.bytes -= viejo
+
+    def limpiar(self):
+        with self._lock:
+            self._paginas.clear()
+            self.bytes = 0
+
+
+CACHE_ESTADOS = StatementCache()
+
+
+def _nuevo_pdf():
+    # Configuración común de todos los reportes (individuales y masivos)
     pdf = FPDF()
+    pdf.set_auto_page_break(True, margin=15)
     pdf.add_page()
+    return pdf
+
+
+def _nombre_archivo(cliente, carpeta):
+    return os.path.join(
+        carpeta,
+        f"{cliente.dni} - {cliente.nombre} {cliente.apellido} - {datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf",
+    )
+
+
+def _escribir_cliente(pdf, cliente, cache=None):
     pdf.set_font("Helvetica", "B", 16)
     pdf.cell(0, 10, "Datos del Cliente", ln=True, align="C")
 
@@ -22,14 +99,139 @@ def generar_pdf(cliente):
         pdf.set_font("Helvetica", "B", 14)
         pdf.cell(0, 10, f"Cuenta N° {cuenta.numero} - Alias: {cuenta.alias}", ln=True)
         pdf.set_font("Helvetica", "", 12)
-        pdf.cell(0, 10, f"Saldo actual: ${cuenta.saldo:.2f}", ln=True)
+        pdf.cell(0, 10, f"Saldo actual: {formatear(cuenta.saldo_centavos)}", ln=True)
+        # Resumen desde los agregados de la cuenta: no recorre el historial
+        for linea in cuenta.estadisticas.lineas():
+            pdf.cell(0, ALTO_LINEA, f"  {linea}", ln=True)
         pdf.cell(0, 10, "Historial de transacciones:", ln=True)
-        if not cuenta.transacciones:
+        if not cuenta.movimientos:
             pdf.cell(0, 10, "  Sin movimientos.", ln=True)
+        elif cache is not None and len(cuenta.movimientos) > _lineas_por_pagina(pdf):
+            _escribir_paginas(pdf, cuenta, cache)
         else:
-            for t in cuenta.transacciones:
-                pdf.cell(0, 8, f"  - {t}", ln=True)
+            # El historial se recorre como generador: nunca se arma la lista completa
+            tanda = []
+            for t in cuenta.iterar_transacciones():
+                tanda.append(f"  - {t}")
+                if len(tanda) == TANDA_MOVIMIENTOS:
+                    _escribir_lineas(pdf, tanda)
+                    tanda = []
+            _escribir_lineas(pdf, tanda)
         pdf.ln(5)
 
+
+def _escribir_lineas(pdf, lineas):
+    for linea in lineas:
+        pdf.cell(0, ALTO_LINEA, linea, ln=True)
+
+
+def _lineas_por_pagina(pdf):
+    return int((pdf.page_break_trigger - pdf.t_margin) // ALTO_LINEA)
+
+
+def _escribir_paginas(pdf, cuenta, cache):
+    # Historiales largos: se recorren de a una página de movimientos. Las
+    # líneas de cada página llena quedan en el cache y se vuelven a escribir
+    # sin leer el libro ni formatear fechas y montos otra vez.
+    por_pagina = _lineas_por_pagina(pdf)
+    movimientos = cuenta.movimientos
+    total = len(movimientos)
+    for desde in range(0, total, por_pagina):
+        hasta = min(desde + por_pagina, total)
+        completa = hasta - desde == por_pagina
+        clave = (cuenta.libro.identidad, cuenta.numero, movimientos[desde], movimientos[hasta - 1])
+        lineas = cache.obtener(clave) if completa else None
+        if lineas is None:
+            transacciones = cuenta.iterar_transacciones(desde)
+            lineas = tuple(f"  - {next(transacciones)}" for _ in range(hasta - desde))
+            if completa:
+                cache.guardar(clave, lineas)
+        _escribir_pagina(pdf, lineas)
+
+
+def _escribir_pagina(pdf, lineas):
+    # Cada página de movimientos arranca en una hoja nueva: el alto de línea es
+    # fijo y cada línea se ubica con pdf.text, mucho más barato que cell (no
+    # mide ni parte el texto). Misma línea base que cell(0, ALTO_LINEA, ...).
+    pdf.add_page()
+    x = pdf.l_margin + pdf.c_margin
+    y = pdf.t_margin + 0.5 * ALTO_LINEA + 0.3 * pdf.font_size
+    for k, linea in enumerate(lineas):
+        pdf.text(x, y + k * ALTO_LINEA, linea)
+    pdf.set_xy(pdf.l_margin, pdf.t_margin + len(lineas) * ALTO_LINEA)
+
+
+@instrumentar("generar_pdf")
+def generar_pdf(cliente, carpeta=CARPETA_PDFS, cache=CACHE_ESTADOS):
+    """Genera el estado de cuenta del cliente y devuelve la ruta del PDF.
+
+    Las páginas completas de historiales largos se toman de `cache` si ya se
+    renderizaron; con cache=None se renderiza todo de nuevo.
+    """
+    os.makedirs(carpeta, exist_ok=True)
+    nombre_archivo = _nombre_archivo(cliente, carpeta)
+    pdf = _nuevo_pdf()
+    _escribir_cliente(pdf, cliente, cache)
     pdf.output(nombre_archivo)
     return nombre_archivo
+
+
+# ---------- Generación en segundo plano (UI) ----------
+_fondo = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pdf")
+
+
+def generar_pdf_en_segundo_plano(cliente, al_terminar=None, carpeta=CARPETA_PDFS):
+    """Genera el PDF sin bloquear a quien llama.
+
+    Devuelve un Future; si se pasa `al_terminar`, se lo llama con
+    (ruta, None) al terminar o con (None, excepción) si falló.
+    """
+    futuro = _fondo.submit(generar_pdf, cliente, carpeta)
+    if al_terminar is not None:
+        def avisar(f):
+            error = f.exception()
+            al_terminar(None if error else f.result(), error)
+        futuro.add_done_callback(avisar)
+    return futuro
+
+
+# ---------- Generación masiva en varios procesos ----------
+_banco_trabajador = None
+
+
+def _inicializar_trabajador(ruta_snapshot):
+    # Cada proceso abre el snapshot vía mmap y materializa solo los clientes que renderiza
+    global _banco_trabajador
+    from bank.manager import BankManager
+    _banco_trabajador = BankManager.cargar_snapshot(ruta_snapshot)
+
+
+def _renderizar_usuarios(usuarios, carpeta):
+    return [generar_pdf(_banco_trabajador.buscar_cliente(usuario), carpeta) for usuario in usuarios]
+
+
+def generar_pdfs(banco, usuarios=None, procesos=None, carpeta=CARPETA_PDFS, tamanio_tarea=32):
+    """Genera los estados de cuenta de varios clientes (o de todos) en paralelo.
+
+    El estado del banco se pasa a los procesos como un snapshot temporal.
+    Devuelve un dict con las rutas generadas, la duración y los PDFs por segundo.
+    """
+    if usuarios is None:
+        usuarios = [c.usuario for c in banco.clientes]
+    os.makedirs(carpeta, exist_ok=True)
+    inicio = time.perf_counter()
+    rutas = []
+    with tempfile.TemporaryDirectory() as temporal:
+        ruta_snapshot = os.path.join(temporal, "estado.snap")
+        banco.guardar_snapshot(ruta_snapshot)
+        tareas = [usuarios[k:k + tamanio_tarea] for k in range(0, len(usuarios), tamanio_tarea)]
+        with ProcessPoolExecutor(procesos, mp_context=get_context("spawn"),
+                                 initializer=_inicializar_trabajador, initargs=(ruta_snapshot,)) as pool:
+            for parcial in pool.map(_renderizar_usuarios, tareas, [carpeta] * len(tareas)):
+                rutas.extend(parcial)
+    duracion = time.perf_counter() - inicio
+    return {
+        "rutas": rutas,
+        "duracion": duracion,
+        "pdfs_por_segundo": len(rutas) / duracion if duracion else 0.0,
+    }
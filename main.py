@@ -1,10 +1,37 @@
 from bank.manager import BankManager
+from bank.metrics import METRICAS
+from bank.service import BankService
 from generator_pdf import generar_pdf
+from bank.limits import LIMITES
+from bank.ledger import COMISION, DEPOSITO, INTERES, RETIRO, TRANSFERENCIA_ENVIADA, TRANSFERENCIA_RECIBIDA
+from bank.money import a_centavos, formatear
+from datetime import date, datetime, timedelta
+import os
+
+RUTA_JOURNAL = os.path.join("datos", "banco.journal")
+RUTA_METRICAS = os.path.join("datos", "banco.prom")
+CLIENTES_POR_PAGINA = 20
+SUGERENCIAS_DESTINO = 10
+FORMATO_DIA = "%d/%m/%Y"
+TIPOS_CONSULTA = {
+    "1": (DEPOSITO,),
+    "2": (RETIRO,),
+    "3": (TRANSFERENCIA_ENVIADA, TRANSFERENCIA_RECIBIDA),
+    "4": (INTERES, COMISION),
+}
+# Periodicidad de las transferencias programadas: (días, meses)
+PERIODOS = {"1": (0, 0), "2": (7, 0), "3": (0, 1)}
+
 
 def main():
+    os.makedirs("datos", exist_ok=True)
     banco = BankManager()
+    banco.abrir_journal(RUTA_JOURNAL)
+    banco.configurar_limites(LIMITES)
+    servicio = BankService(banco, generar_pdf)
 
     while True:
+        ejecutar_ordenes(servicio)
         print("\n=== Sistema Bancario ===")
         print("1. Ingresar")
         print("2. Crear cliente")
@@ -20,29 +47,32 @@ def main():
 
             usuario = input("Usuario: ")
             pin = input("Pin: ")
-            cliente = banco.buscar_cliente(usuario)
+            cliente = servicio.ingresar(usuario, pin)
 
-            if not cliente or not cliente.validar_pin(pin):
+            if not cliente:
                 print("Usuario o PIN incorrecto.")
                 continue
 
-            menu_cliente(banco, cliente)
+            menu_cliente(servicio, cliente)
 
         elif opcion == "2":
-            crear_cliente(banco)
+            crear_cliente(servicio)
 
         elif opcion == "3":
-            print(banco.listar_clientes())
+            ver_clientes(servicio)
 
         elif opcion == "4":
             print("Saliendo...")
+            METRICAS.escribir_prometheus(RUTA_METRICAS)
+            banco.checkpoint()
+            banco.cerrar()
             break
 
         else:
             print("Opción no válida.")
 
 
-def crear_cliente(banco):
+def crear_cliente(servicio):
     try:
         nombre = input("Nombre: ").strip()
         apellido = input("Apellido: ").strip()
@@ -53,14 +83,30 @@ def crear_cliente(banco):
         if not pin.isdigit() or len(pin) != 4:
             raise ValueError("El PIN debe tener exactamente 4 dígitos numéricos.")
 
-        cliente = banco.crear_cliente(nombre, apellido, dni, usuario, pin)
+        cliente = servicio.crear_cliente(nombre, apellido, dni, usuario, pin)
         print(f"Cliente creado exitosamente: {cliente.mostrar_datos()}")
 
     except Exception as e:
         print(f"Error: {e}")
 
 
-def menu_cliente(banco, cliente):
+def ver_clientes(servicio):
+    if not servicio.banco.clientes:
+        print("No hay clientes registrados.")
+        return
+    ordenes = {"1": None, "2": "usuario", "3": "dni"}
+    orden = ordenes.get(input("Ordenar por: 1. Alta  2. Usuario  3. DNI: ").strip())
+    cursor, numero = None, 1
+    while True:
+        pagina, cursor = servicio.pagina_clientes(CLIENTES_POR_PAGINA, orden, cursor)
+        for c in pagina:
+            print(f"{numero}. {c.usuario} - {c.nombre} {c.apellido} - DNI: {c.dni}")
+            numero += 1
+        if cursor is None or input("Enter para ver más, 'q' para volver: ").strip().lower() == "q":
+            break
+
+
+def menu_cliente(servicio, cliente):
     while True:
         print(f"\n=== Cliente: {cliente.nombre} {cliente.apellido} ===")
         print("1. Ingresar a cuentas")
@@ -74,15 +120,15 @@ def menu_cliente(banco, cliente):
             if not cliente.cuentas:
                 print("No hay cuentas registradas.")
                 continue
-            menu_cuentas(banco, cliente)
+            menu_cuentas(servicio, cliente)
 
         elif opcion == "2":
             alias = input("Alias para la nueva cuenta: ")
-            cuenta = banco.crear_cuenta(cliente, alias)
+            cuenta = servicio.crear_cuenta(cliente, alias)
             print(f"Cuenta creada con N° {cuenta.numero} - Alias: {alias}")
 
         elif opcion == "3":
-            path = generar_pdf(cliente)
+            path = servicio.generar_pdf(cliente)
             print(f"PDF generado: {path}")
 
         elif opcion == "4":
@@ -93,61 +139,139 @@ def menu_cliente(banco, cliente):
             print("Opción no válida.")
 
 
-def menu_cuentas(banco, cliente):
+def elegir_destino(servicio, texto, origen):
+    # Si el texto coincide con una sola cuenta se usa esa; si no, se muestran las candidatas
+    sugerencias = servicio.sugerir_destinos(texto, SUGERENCIAS_DESTINO, excluir=origen.numero)
+    if not sugerencias:
+        print("No se encontró cuenta con ese alias.")
+        return None
+    exactas = [d for d in sugerencias if d.alias == texto]
+    if len(exactas) == 1:
+        elegido = exactas[0]
+    elif len(sugerencias) == 1:
+        elegido = sugerencias[0]
+    else:
+        print("Cuentas disponibles:")
+        for i, d in enumerate(sugerencias, 1):
+            print(f"{i}. {d.alias} - N° {d.numero} - {d.titular}")
+        sel = int(input("Seleccione el destino: ")) - 1
+        if sel < 0:
+            raise IndexError
+        elegido = sugerencias[sel]
+    return servicio.buscar_cuenta(elegido.numero)
+
+
+def menu_cuentas(servicio, cliente):
     for i, c in enumerate(cliente.cuentas, 1):
         print(f"{i}. {c}")
     try:
         idx = int(input("Seleccione una cuenta: ")) - 1
         if idx < 0 or idx >= len(cliente.cuentas):
             raise IndexError
-        menu_transacciones(banco, cliente.cuentas[idx], banco)
+        menu_transacciones(servicio, cliente.cuentas[idx])
     except Exception:
         print("Selección inválida.")
 
 
-def menu_transacciones(banco, cuenta, _):
+def leer_dia(texto):
+    valor = input(texto).strip()
+    return datetime.strptime(valor, FORMATO_DIA) if valor else None
+
+
+def consultar_movimientos(servicio, cuenta):
+    desde = leer_dia("Desde (dd/mm/aaaa, vacío = sin límite): ")
+    hasta = leer_dia("Hasta inclusive (dd/mm/aaaa, vacío = sin límite): ")
+    if hasta is not None:
+        hasta += timedelta(days=1)
+    tipo = input("Tipo (1 depósitos, 2 retiros, 3 transferencias, 4 intereses y comisiones, vacío = todos): ").strip()
+    minimo = input("Monto mínimo (vacío = sin límite): ").strip()
+    movimientos = servicio.consultar(cuenta, desde, hasta, TIPOS_CONSULTA.get(tipo),
+                                     a_centavos(minimo) if minimo else None)
+    if not movimientos:
+        print("No hay movimientos con esos filtros.")
+    for t in movimientos:
+        print(t)
+
+
+def mostrar_resumen(servicio, cuenta):
+    estadisticas = servicio.estadisticas(cuenta)
+    hoy = date.today()
+    mes = estadisticas.entre(hoy.replace(day=1), hoy + timedelta(days=1))
+    print(f"Este mes: {mes.cantidad()} movimientos; depositado {formatear(mes.total(DEPOSITO))}, "
+          f"retirado {formatear(mes.total(RETIRO))}")
+    for linea in estadisticas.lineas() or ["Sin movimientos."]:
+        print(linea)
+    for limite, disponible in servicio.limites_disponibles(cuenta):
+        print(f"Límite de {limite}; disponible: {formatear(disponible) if limite.por_monto else disponible}")
+
+
+def ejecutar_ordenes(servicio):
+    # Solo mira las órdenes vencidas: se puede llamar en cada vuelta del menú
+    resultado = servicio.ejecutar_ordenes()
+    if resultado.vencidas:
+        print(resultado)
+
+
+def programar_transferencia(servicio, cuenta):
+    texto = input("Alias destino (o el comienzo del alias): ")
+    destino = elegir_destino(servicio, texto, cuenta)
+    if destino is None:
+        return
+    monto = input("Monto a transferir: ")
+    inicio = leer_dia("Primera fecha (dd/mm/aaaa, vacío = hoy): ")
+    dias, meses = PERIODOS.get(input("Repetir: 1. No  2. Semanal  3. Mensual: ").strip(), (0, 0))
+    veces = input("Cantidad de veces (vacío = sin fin): ").strip() if dias or meses else ""
+    orden = servicio.programar_transferencia(cuenta, a_centavos(monto), destino, inicio, dias, meses,
+                                             int(veces) if veces else None)
+    print(f"Transferencia programada N° {orden.id}.")
+    ejecutar_ordenes(servicio)
+
+
+def menu_transacciones(servicio, cuenta):
     while True:
         print(f"\n=== Cuenta {cuenta.numero} ===")
-        print(f"Saldo: ${cuenta.saldo:.2f}")
+        print(f"Saldo: {formatear(cuenta.saldo_centavos)}")
         print("1. Ingresar dinero")
         print("2. Retirar dinero")
         print("3. Transferir")
-        print("4. Volver")
+        print("4. Consultar movimientos")
+        print("5. Resumen")
+        print("6. Programar transferencia")
+        print("7. Volver")
 
         opcion = input("Opción: ")
 
         try:
             if opcion == "1":
-                monto = float(input("Monto a ingresar: "))
-                cuenta.depositar(monto)
-                print(f"Depósito exitoso. Saldo actual: ${cuenta.saldo:.2f}")
+                monto = input("Monto a ingresar: ")
+                servicio.depositar(cuenta, a_centavos(monto))
+                print(f"Depósito exitoso. Saldo actual: {formatear(cuenta.saldo_centavos)}")
 
             elif opcion == "2":
-                monto = float(input("Monto a retirar: "))
-                cuenta.retirar(monto)
-                print(f"Retiro exitoso. Saldo actual: ${cuenta.saldo:.2f}")
+                monto = input("Monto a retirar: ")
+                servicio.retirar(cuenta, a_centavos(monto))
+                print(f"Retiro exitoso. Saldo actual: {formatear(cuenta.saldo_centavos)}")
 
             elif opcion == "3":
-                alias_destino = input("Alias destino: ")
-                destinos = banco.buscar_cuenta_por_alias(alias_destino)
-                if not destinos:
-                    print("No se encontró cuenta con ese alias.")
+                texto = input("Alias destino (o el comienzo del alias): ")
+                destino = elegir_destino(servicio, texto, cuenta)
+                if destino is None:
                     continue
 
-                if len(destinos) > 1:
-                    print("Cuentas disponibles:")
-                    for i, d in enumerate(destinos, 1):
-                        print(f"{i}. {d.alias} - N° {d.numero} - {d.cliente.nombre} {d.cliente.apellido}")
-                    sel = int(input("Seleccione el destino: ")) - 1
-                    destino = destinos[sel]
-                else:
-                    destino = destinos[0]
-
-                monto = float(input("Monto a transferir: "))
-                cuenta.transferir(monto, destino)
+                monto = input("Monto a transferir: ")
+                servicio.transferir(cuenta, a_centavos(monto), destino)
                 print("Transferencia realizada con éxito.")
 
             elif opcion == "4":
+                consultar_movimientos(servicio, cuenta)
+
+            elif opcion == "5":
+                mostrar_resumen(servicio, cuenta)
+
+            elif opcion == "6":
+                programar_transferencia(servicio, cuenta)
+
+            elif opcion == "7":
                 break
 
             else:
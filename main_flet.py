@@ -1,16 +1,34 @@
 # main_flet.py
-from typing import Optional, List
+from typing import Optional
 import flet
 from flet import (
     Page, Column, Row, Text, TextField, ElevatedButton, ListTile, IconButton,
-    Icons, SnackBar
+    Icons, SnackBar, Dropdown, dropdown, ListView
 )
+import os
+import threading
 import traceback
+from bank.limits import LIMITES
 from bank.manager import BankManager
-from generator_pdf import generar_pdf
+from bank.metrics import METRICAS
+from bank.money import parsear, formatear
+from bank.service import BankService
+from generator_pdf import generar_pdf, generar_pdf_en_segundo_plano
 
 # ---------------- Manager global ----------------
-manager = BankManager()
+os.makedirs("datos", exist_ok=True)
+manager = BankManager(concurrente=True)  # la versión web atiende varias sesiones
+manager.abrir_journal(os.path.join("datos", "banco.journal"))
+manager.configurar_limites(LIMITES)
+# Los índices de búsqueda se arman de entrada para que la primera tecla ya responda rápido
+threading.Thread(target=manager.preparar_busqueda, daemon=True).start()
+# Todas las vistas operan a través del servicio (tabla de despacho resuelta una vez)
+service = BankService(manager, generar_pdf, generar_pdf_en_segundo_plano)
+if os.environ.get("BANCO_METRICAS_PUERTO"):
+    METRICAS.servir_prometheus(puerto=int(os.environ["BANCO_METRICAS_PUERTO"]))
+if os.environ.get("BANCO_TIEMPOS"):
+    # Separa el tiempo del backend ("depositar") del de dibujar la vista ("render:...")
+    service.agregar_hook(lambda op, seg, err: print(f"[tiempo] {op}: {seg * 1000:.1f} ms" + (f" ({err})" if err else "")))
 
 # ---------- Utilidades ----------
 def show_snack(page: Page, text: str):
@@ -22,80 +40,12 @@ def show_snack(page: Page, text: str):
         # fallback sencillo
         print("SNACK:", text)
 
-def safe_float(val: str) -> Optional[float]:
+def safe_centavos(val: str) -> Optional[int]:
     try:
-        return float(val)
+        return parsear(val)
     except Exception:
         return None
 
-# ---------- Wrappers para compatibilidad con distintas APIs de BankManager ----------
-def wrap_create_client(first, last, dni, username, pin):
-    try:
-        if hasattr(manager, "create_client"):
-            return manager.create_client(first, last, dni, username, pin)
-        if hasattr(manager, "crear_cliente"):
-            return manager.crear_cliente(first, last, dni, username, pin)
-        raise AttributeError("El gestor no expone método de creación de cliente esperado.")
-    except Exception:
-        raise
-
-def wrap_get_clients() -> List:
-    """Devuelve la lista de clientes"""
-    if hasattr(manager, "clients") and callable(getattr(manager, "clients")):
-        return manager.clients()
-    if hasattr(manager, "clientes"):
-        attr = getattr(manager, "clientes")
-        if callable(attr):
-            return attr()
-        return attr
-    # fallback: inspeccionar atributos
-    for name in ("_clients", "_clientes", "clients_list"):
-        if hasattr(manager, name):
-            return getattr(manager, name)
-    return []
-
-def wrap_find_client_by_username(username: str):
-    """Busca cliente por username con distintos nombres de método."""
-    if hasattr(manager, "find_client_by_username"):
-        return manager.find_client_by_username(username)
-    if hasattr(manager, "find_client"):
-        return manager.find_client(username)
-    if hasattr(manager, "buscar_cliente"):
-        return manager.buscar_cliente(username)
-    # si no hay método, hacer búsqueda manual sobre wrap_get_clients
-    for c in wrap_get_clients():
-        uname = getattr(c, "username", None) or getattr(c, "usuario", None)
-        if uname == username:
-            return c
-    return None
-
-def wrap_create_account_for_client(client, alias: str):
-    if hasattr(manager, "create_account_for_client"):
-        return manager.create_account_for_client(client, alias)
-    if hasattr(manager, "crear_cuenta"):
-        return manager.crear_cuenta(client, alias)
-    raise AttributeError("El gestor no expone método para crear cuenta.")
-
-def wrap_find_accounts_by_alias(alias: str):
-    if hasattr(manager, "find_accounts_by_alias"):
-        return manager.find_accounts_by_alias(alias)
-    if hasattr(manager, "find_account_by_alias"):
-        return manager.find_account_by_alias(alias)
-    if hasattr(manager, "buscar_cuenta_por_alias"):
-        return manager.buscar_cuenta_por_alias(alias)
-    # fallback: buscar manualmente
-    res = []
-    for c in wrap_get_clients():
-        accs = getattr(c, "accounts", None)
-        if callable(accs):
-            accs = accs()
-        if not accs:
-            accs = getattr(c, "_accounts", []) or getattr(c, "cuentas", []) or getattr(c, "accounts", [])
-        for a in accs:
-            if getattr(a, "alias", None) == alias:
-                res.append(a)
-    return res
-
 # ---------- Vistas (menús) ----------
 def view_main_menu(page: Page):
     page.controls.clear()
@@ -120,16 +70,11 @@ def view_login_menu(page: Page):
             if not u or not p:
                 show_snack(page, "Completar todos los campos")
                 return
-            client = wrap_find_client_by_username(u)
+            client = service.buscar_cliente(u)
             if not client:
                 show_snack(page, "Usuario no encontrado")
                 return
-            # método verify_pin o validar_pin
-            verify = getattr(client, "verify_pin", None) or getattr(client, "validar_pin", None)
-            if not verify:
-                show_snack(page, "El objeto cliente no expone verificación de PIN.")
-                return
-            if not verify(p):
+            if not client.validar_pin(p):
                 show_snack(page, "PIN incorrecto")
                 return
             view_client_menu(page, client)
@@ -145,7 +90,6 @@ def view_login_menu(page: Page):
 
 # --- Crear cliente ---
 def view_create_client(page: Page):
-    global manager
     page.controls.clear()
     page.add(Text("Crear cliente", size=18))
     first = TextField(label="Nombre", width=300)
@@ -167,8 +111,7 @@ def view_create_client(page: Page):
             if not (p.isdigit() and len(p) == 4):
                 show_snack(page, "PIN debe ser numérico y 4 dígitos")
                 return
-            # usa wrapper que intenta distintos nombres
-            wrap_create_client(f, l, d, u, p)
+            service.crear_cliente(f, l, d, u, p)
             show_snack(page, f"Cliente {f} {l} creado")
             page.update()
             view_main_menu(page)
@@ -183,68 +126,106 @@ def view_create_client(page: Page):
     page.add(Row([ElevatedButton("Volver", on_click=lambda e: view_main_menu(page))]))
     page.update()
 
+# --- Listas perezosas ---
+ROW_HEIGHT = 48
+ROWS_PER_FETCH = 50
+
+def lazy_list(fetch, make_row):
+    """ListView que pide filas de a tandas con fetch(desde, cantidad) a medida que se scrollea.
+
+    Con altura de fila fija Flutter dibuja solo las visibles, y del lado de
+    Python solo se construyen las tandas ya alcanzadas. Devuelve (lista, reset);
+    reset(fetch) vacía la lista y la vuelve a llenar con otra consulta.
+    """
+    state = {"fetch": fetch, "done": False}
+    lv = ListView(expand=True, item_extent=ROW_HEIGHT)
+
+    def load_more():
+        items = state["fetch"](len(lv.controls), ROWS_PER_FETCH)
+        state["done"] = len(items) < ROWS_PER_FETCH
+        with service.medir("render:filas"):
+            lv.controls.extend(make_row(item) for item in items)
+
+    def on_scroll(e):
+        if not state["done"] and e.pixels >= e.max_scroll_extent - ROW_HEIGHT * 10:
+            load_more()
+            lv.update()
+
+    def reset(new_fetch):
+        state["fetch"] = new_fetch
+        lv.controls.clear()
+        load_more()
+        lv.update()
+
+    lv.on_scroll = on_scroll
+    load_more()
+    return lv, reset
+
 # --- Listar clientes ---
+SORT_OPTIONS = {"Alta": None, "Usuario": "usuario", "DNI": "dni"}
+
 def view_list_clients(page: Page):
     page.controls.clear()
     page.add(Row([ElevatedButton("Volver", on_click=lambda e: view_main_menu(page))]))  # botón arriba
     page.add(Text("Lista de clientes", size=18))
-    try:
-        clients = wrap_get_clients()
-    except Exception:
-        traceback.print_exc()
-        clients = []
-
-    if not clients:
+    if not manager.clientes:
         page.add(Text("No hay clientes."))
-        page.add(ElevatedButton("Volver", on_click=lambda e: view_main_menu(page)))  # botón abajo
         page.update()
         return
 
-    col = Column()
-    for c in clients:
-        try:
-            uname = getattr(c, "username", None) or getattr(c, "usuario", None) or "<sin usuario>"
-            fullname = getattr(c, "full_name", None)
-            if callable(fullname):
-                fullname = fullname()
-            else:
-                fullname = fullname or (getattr(c, "first_name", "") + " " + getattr(c, "last_name", ""))
-            subtitle = f"{len(getattr(c, 'accounts', [])() if callable(getattr(c, 'accounts', None)) else (getattr(c, 'accounts', []) or getattr(c, '_accounts', []) or getattr(c, 'cuentas', [])) )} cuentas - DNI: {getattr(c, 'dni', getattr(c, 'dni', ''))}"
-        except Exception:
-            fullname = str(c)
-            uname = getattr(c, "username", None) or getattr(c, "usuario", None)
-            subtitle = ""
+    search = TextField(label="Buscar por usuario, nombre, DNI o alias", width=400)
+    sort_dd = Dropdown(label="Ordenar por", width=200, value="Alta",
+                       options=[dropdown.Option(label) for label in SORT_OPTIONS])
+
+    def fetch_clients():
+        text = search.value or ""
+        if text.strip():
+            return lambda desde, n: service.buscar_clientes(text, n, desde)
+        orden = SORT_OPTIONS[sort_dd.value]
+        return lambda desde, n: list(service.iterar_clientes(n, desde, orden))
 
+    def make_row(c):
         # capturar variable en lambda con cli=c
         enter_btn = ElevatedButton("Entrar", on_click=lambda e, cli=c: view_client_menu(page, cli))
-        tile_row = Row([Text(f"{uname} - {fullname}", expand=True), enter_btn])
-        col.controls.append(tile_row)
-
-    page.add(col)
-    page.add(ElevatedButton("Volver", on_click=lambda e: view_main_menu(page)))  # botón final
+        label = f"{c.usuario} - {c.nombre} {c.apellido} ({len(c.cuentas)} cuentas - DNI: {c.dni})"
+        return Row([Text(label, expand=True), enter_btn])
+
+    results, reset = lazy_list(fetch_clients(), make_row)
+    # Cada tecla consulta los índices del gestor y reemplaza los resultados
+    search.on_change = lambda e: reset(fetch_clients())
+    sort_dd.on_change = lambda e: reset(fetch_clients())
+    page.add(Row([search, sort_dd]))
+    page.add(results)
     page.update()
 
 # --- Menú cliente ---
 def view_client_menu(page: Page, client):
     page.controls.clear()
-    # safe obtener nombre
-    try:
-        fullname = client.full_name() if callable(getattr(client, "full_name", None)) else (getattr(client, "full_name", None) or f"{getattr(client,'first_name','')} {getattr(client,'last_name','')}")
-    except Exception:
-        fullname = str(client)
     page.add(Row([ElevatedButton("Volver", on_click=lambda e: view_main_menu(page))]))  # botón arriba
-    page.add(Text(f"Sesión: {fullname}", size=18))
+    page.add(Text(f"Sesión: {client.nombre} {client.apellido}", size=18))
     page.add(ElevatedButton("Ingresar a cuentas", on_click=lambda e: view_accounts_list(page, client)))
     page.add(ElevatedButton("Crear cuenta", on_click=lambda e: view_create_account(page, client)))
-    page.add(ElevatedButton("Imprimir datos (PDF)", on_click=lambda e: generar_pdf(client)))
+    page.add(ElevatedButton("Imprimir datos (PDF)", on_click=lambda e: on_pdf(page, client)))
     page.add(ElevatedButton("Cerrar sesión", on_click=lambda e: view_main_menu(page)))
     page.update()
 
+def on_pdf(page: Page, client):
+    # El PDF se genera en segundo plano para no bloquear el manejador de eventos
+    def al_terminar(ruta, error):
+        if error is not None:
+            print("Error generando PDF:", error)
+            show_snack(page, "Error al generar el PDF (ver consola).")
+        else:
+            show_snack(page, f"PDF generado: {ruta}")
+
+    show_snack(page, "Generando PDF...")
+    service.generar_pdf_en_segundo_plano(client, al_terminar)
+
 # --- Crear cuenta ---
 def view_create_account(page: Page, client):
     page.controls.clear()
     page.add(Row([ElevatedButton("Volver", on_click=lambda e: view_client_menu(page, client))]))
-    page.add(Text(f"Crear cuenta para {client.full_name() if callable(getattr(client,'full_name',None)) else client}"))
+    page.add(Text(f"Crear cuenta para {client.nombre} {client.apellido}"))
     alias_field = TextField(label="Alias de la cuenta", width=300)
 
     def on_create(e):
@@ -253,7 +234,7 @@ def view_create_account(page: Page, client):
             if not alias:
                 show_snack(page, "Alias obligatorio")
                 return
-            wrap_create_account_for_client(client, alias)
+            service.crear_cuenta(client, alias)
             show_snack(page, f"Cuenta creada para {client}")
             view_client_menu(page, client)
         except Exception:
@@ -266,53 +247,49 @@ def view_create_account(page: Page, client):
     page.update()
 
 # --- Listado de cuentas ---
-def get_client_accounts(client):
-    accs = getattr(client, "accounts", None)
-    if callable(accs):
-        return accs()
-    # intentar atributos en español/privados
-    return getattr(client, "_accounts", None) or getattr(client, "cuentas", None) or []
-
 def view_accounts_list(page: Page, client):
     page.controls.clear()
     page.add(Row([ElevatedButton("Volver", on_click=lambda e: view_client_menu(page, client))]))
-    page.add(Text(f"Cuentas de {getattr(client,'full_name', lambda: str(client))()}", size=16) if callable(getattr(client,'full_name', None)) else Text(f"Cuentas de {client}"))
-    accs = get_client_accounts(client)
-    if not accs:
+    page.add(Text(f"Cuentas de {client.nombre} {client.apellido}", size=16))
+    if not client.cuentas:
         page.add(Text("El cliente no tiene cuentas."))
         page.add(ElevatedButton("Volver", on_click=lambda e: view_client_menu(page, client)))
         page.update()
         return
-    col = Column()
-    for i, a in enumerate(accs, start=1):
+
+    search = TextField(label="Buscar por alias o número", width=300)
+
+    def fetch_accounts():
+        text = search.value or ""
+        return lambda desde, n: service.buscar_cuentas(text, client, n, desde)
+
+    def make_row(a):
         btn = ElevatedButton("Abrir", on_click=lambda e, acc=a: view_account_menu(page, client, acc))
-        col.controls.append(Row([Text(f"{i}. N° {getattr(a,'account_number', getattr(a,'numero', ''))} - Alias: {getattr(a,'alias','') } - Saldo: ${getattr(a,'balance', getattr(a,'saldo',0)):.2f}", expand=True), btn]))
-    page.add(col)
-    page.add(ElevatedButton("Volver", on_click=lambda e: view_client_menu(page, client)))
+        return Row([Text(f"N° {a.numero} - Alias: {a.alias} - Saldo: {formatear(a.saldo_centavos)}", expand=True), btn])
+
+    results, reset = lazy_list(fetch_accounts(), make_row)
+    search.on_change = lambda e: reset(fetch_accounts())
+    page.add(search)
+    page.add(results)
     page.update()
 
 # --- Menú transacciones ---
 def view_account_menu(page: Page, client, account):
     page.controls.clear()
     page.add(Row([ElevatedButton("Volver", on_click=lambda e: view_accounts_list(page, client))]))
-    page.add(Text(f"Cuenta {getattr(account,'account_number', getattr(account,'numero',''))} - {getattr(account,'alias','')}", size=16))
-    balance = getattr(account, "balance", getattr(account, "saldo", 0.0))
-    page.add(Text(f"Saldo: ${balance:.2f}"))
+    page.add(Text(f"Cuenta {account.numero} - {account.alias}", size=16))
+    page.add(Text(f"Saldo: {formatear(account.saldo_centavos)}"))
+    for line in service.estadisticas(account).lineas():
+        page.add(Text(line, size=12))
     amt_field = TextField(label="Monto", width=200)
 
     def on_deposit(e):
         try:
-            amt = safe_float(amt_field.value or "")
+            amt = safe_centavos(amt_field.value or "")
             if amt is None or amt <= 0:
                 show_snack(page, "Monto inválido")
                 return
-            # deposit puede llamarse deposit o depositar
-            if hasattr(account, "deposit"):
-                account.deposit(amt)
-            elif hasattr(account, "depositar"):
-                account.depositar(amt)
-            else:
-                raise AttributeError("Método de depósito no disponible.")
+            service.depositar(account, amt)
             show_snack(page, "Depósito realizado")
             view_account_menu(page, client, account)
         except Exception:
@@ -321,16 +298,11 @@ def view_account_menu(page: Page, client, account):
 
     def on_withdraw(e):
         try:
-            amt = safe_float(amt_field.value or "")
+            amt = safe_centavos(amt_field.value or "")
             if amt is None or amt <= 0:
                 show_snack(page, "Monto inválido")
                 return
-            if hasattr(account, "withdraw"):
-                account.withdraw(amt)
-            elif hasattr(account, "retirar"):
-                account.retirar(amt)
-            else:
-                raise AttributeError("Método de retiro no disponible.")
+            service.retirar(account, amt)
             show_snack(page, "Retiro realizado")
             view_account_menu(page, client, account)
         except Exception:
@@ -343,40 +315,61 @@ def view_account_menu(page: Page, client, account):
     page.update()
 
 # --- Transferencias ---
+DESTINATION_SUGGESTIONS = 10
+
 def view_transfer_menu(page: Page, client, account):
     page.controls.clear()
     page.add(Row([ElevatedButton("Volver", on_click=lambda e: view_account_menu(page, client, account))]))
-    page.add(Text(f"Transferir desde cuenta {getattr(account,'account_number', getattr(account,'numero',''))}", size=16))
-    alias_field = TextField(label="Alias de destino", width=200)
+    page.add(Text(f"Transferir desde cuenta {account.numero}", size=16))
+    alias_field = TextField(label="Alias de destino", width=300)
     amount_field = TextField(label="Monto a transferir", width=200)
+    suggestions = Column()
+    chosen_text = Text("")
+    state = {"chosen": None}
+
+    def choose(dest):
+        state["chosen"] = dest
+        chosen_text.value = f"Destino: {dest.alias} - N° {dest.numero} - {dest.titular}"
+        page.update()
+
+    def on_alias_change(e):
+        # Autocompletado: las primeras cuentas cuyo alias empieza con lo tipeado
+        state["chosen"] = None
+        chosen_text.value = ""
+        text = alias_field.value or ""
+        found = service.sugerir_destinos(text, DESTINATION_SUGGESTIONS, excluir=account.numero) if text.strip() else []
+        suggestions.controls = [
+            Row([Text(f"{d.alias} - N° {d.numero} - {d.titular}", expand=True),
+                 ElevatedButton("Elegir", on_click=lambda e, dest=d: choose(dest))])
+            for d in found
+        ]
+        exact = [d for d in found if d.alias == text.strip()]
+        if len(exact) == 1:
+            choose(exact[0])
+        else:
+            page.update()
 
     def on_transfer(e):
         try:
-            alias = alias_field.value.strip()
-            amt = safe_float(amount_field.value or "")
-            if not alias or amt is None or amt <= 0:
-                show_snack(page, "Datos inválidos")
+            amt = safe_centavos(amount_field.value or "")
+            if amt is None or amt <= 0:
+                show_snack(page, "Monto inválido")
                 return
-            matches = wrap_find_accounts_by_alias(alias)
-            if not matches:
-                show_snack(page, "Alias no encontrado")
+            if state["chosen"] is None:
+                show_snack(page, "Elegí la cuenta de destino de la lista")
                 return
-            # si hay varias, tomo la primera (podemos mejorar con elección)
-            dest_acc = matches[0] if isinstance(matches, (list,tuple)) else matches
-            # transfer puede llamarse transfer_to o transferir
-            if hasattr(account, "transfer_to"):
-                account.transfer_to(dest_acc, amt)
-            elif hasattr(account, "transferir"):
-                account.transferir(amt, dest_acc)
-            else:
-                raise AttributeError("Método de transferencia no disponible.")
+            dest_acc = service.buscar_cuenta(state["chosen"].numero)
+            service.transferir(account, amt, dest_acc)
             show_snack(page, "Transferencia realizada")
             view_account_menu(page, client, account)
         except Exception:
             traceback.print_exc()
             show_snack(page, "Error en transferencia (ver consola).")
 
+    alias_field.on_change = on_alias_change
     page.add(alias_field)
+    page.add(suggestions)
+    page.add(chosen_text)
     page.add(amount_field)
     page.add(Row([ElevatedButton("Transferir", on_click=on_transfer), ElevatedButton("Volver", on_click=lambda e: view_account_menu(page, client, account))]))
     page.update()
@@ -0,0 +1,33 @@
+import pytest
+from bank.allocator import AccountNumberAllocator
+from bank.manager import BankManager
+
+
+def test_agota_el_espacio_sin_repetir():
+    asignador = AccountNumberAllocator(ancho=3)
+    numeros = {asignador.siguiente() for _ in range(asignador.capacidad)}
+    assert len(numeros) == 900
+    assert min(numeros) == 100 and max(numeros) == 999
+    with pytest.raises(ValueError):
+        asignador.siguiente()
+
+
+def test_estado_persistido_continua_la_secuencia(tmp_path):
+    original = AccountNumberAllocator(ancho=4, clave=1234)
+    emitidos = [original.siguiente() for _ in range(10)]
+    ruta = str(tmp_path / "asignador.json")
+    original.guardar(ruta)
+
+    restaurado = AccountNumberAllocator.cargar(ruta)
+    siguientes = [restaurado.siguiente() for _ in range(10)]
+    assert siguientes == [original.siguiente() for _ in range(10)]
+    assert not set(emitidos) & set(siguientes)
+
+
+def test_manager_usa_asignador():
+    banco = BankManager(AccountNumberAllocator(ancho=2))
+    c = banco.crear_cliente("Ana", "Lopez", "456", "anita", "2222")
+    cuentas = [banco.crear_cuenta(c, f"a{i}") for i in range(90)]
+    assert len({cuenta.numero for cuenta in cuentas}) == 90
+    with pytest.raises(ValueError):
+        banco.crear_cuenta(c, "sobra")
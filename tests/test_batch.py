@@ -0,0 +1,93 @@
+import pytest
+
+from bank.batch import LOTE_RECHAZADO, _validar_numpy, _validar_python
+from bank.ledger import Ledger
+from bank.manager import BankManager
+
+
+def _banco(saldos):
+    banco = BankManager()
+    cuentas = []
+    for i, saldo in enumerate(saldos):
+        cuenta = banco.crear_cuenta(banco.crear_cliente("N", "A", str(i), f"u{i}", "1111"), f"a{i}")
+        if saldo:
+            cuenta.depositar_centavos(saldo)
+        cuentas.append(cuenta)
+    return banco, cuentas
+
+
+def test_lote_valido_con_neteo():
+    banco, (a, b, c) = _banco([1000, 0, 0])
+    # b no tiene saldo propio, pero recibe antes de enviar dentro del mismo lote
+    resultado = banco.aplicar_lote([(a.numero, b.numero, 700), (b.numero, c.numero, 500)])
+    assert resultado == [None, None]
+    assert (a.saldo_centavos, b.saldo_centavos, c.saldo_centavos) == (300, 200, 500)
+    assert [t.tipo for t in b.transacciones] == ["Transferencia de a0", "Transferencia a a2"]
+    assert banco.libro.ids[b.movimientos[0]] == banco.libro.ids[a.movimientos[-1]]
+
+
+def test_lote_invalido_no_aplica_nada():
+    banco, (a, b) = _banco([1000, 0])
+    filas = len(banco.libro)
+    resultado = banco.aplicar_lote([
+        (a.numero, b.numero, 400),
+        (b.numero, b.numero, 10),
+        (a.numero, 1, 10),
+        (a.numero, b.numero, 0),
+        (b.numero, a.numero, 900),
+    ])
+    assert resultado == [
+        LOTE_RECHAZADO,
+        "No se puede transferir a la misma cuenta.",
+        "Cuenta inexistente.",
+        "El monto debe ser mayor a cero.",
+        "Saldo insuficiente.",
+    ]
+    assert (a.saldo_centavos, b.saldo_centavos) == (1000, 0)
+    assert len(banco.libro) == filas
+
+
+def test_validacion_vectorizada_coincide_con_python():
+    pytest.importorskip("numpy")
+    origenes, destinos, montos = [1, 2, 3, 1, 4], [2, 3, 1, 1, 1], [50, 80, 5, 1, 3]
+    saldos = {1: 10, 2: 40, 3: 0}
+    assert _validar_numpy(origenes, destinos, montos, saldos) == \
+        _validar_python(origenes, destinos, montos, saldos)
+
+
+def test_lote_se_reaplica_desde_el_journal(tmp_path):
+    ruta = str(tmp_path / "banco.journal")
+    banco = BankManager()
+    banco.abrir_journal(ruta)
+    a = banco.crear_cuenta(banco.crear_cliente("A", "B", "1", "u1", "1111"), "a")
+    b = banco.crear_cuenta(banco.crear_cliente("C", "D", "2", "u2", "2222"), "b")
+    a.depositar_centavos(500)
+    banco.aplicar_lote([(a.numero, b.numero, 100)] * 3)
+    banco.cerrar()
+
+    restaurado = BankManager()
+    restaurado.abrir_journal(ruta)
+    ra = restaurado.buscar_cuenta_por_numero(a.numero)
+    assert ra.saldo_centavos == 200
+    assert [str(t) for t in ra.transacciones] == [str(t) for t in a.transacciones]
+    restaurado.cerrar()
+
+
+def test_montos_invalidos_o_fuera_de_rango():
+    banco, (a, b) = _banco([1000, 2**63 - 11])
+    filas = len(banco.libro)
+    assert banco.aplicar_lote([(a.numero, b.numero, 1.5)]) == ["Monto inválido."]
+    assert banco.aplicar_lote([(a.numero, b.numero, 2**63), (b.numero, a.numero, 2**63)]) == \
+        ["Monto fuera de rango."] * 2
+    assert banco.aplicar_lote([(a.numero, b.numero, 20)]) == ["Saldo fuera de rango."]
+    assert (a.saldo_centavos, b.saldo_centavos, len(banco.libro)) == (1000, 2**63 - 11, filas)
+
+
+def test_el_libro_no_queda_a_medias_con_un_lote_invalido():
+    banco, _ = _banco([])
+    libro = banco.libro
+    for n in (1, 100):
+        with pytest.raises(TypeError):
+            libro.transferencias([1] * n, [2] * n, [10] * (n - 1) + [1.5])
+    assert {len(getattr(libro, nombre)) for nombre, _ in Ledger.COLUMNAS} == {0}
+    assert libro.transferencias([1], [2], [10]) == 0 and libro.ids[0] == 1
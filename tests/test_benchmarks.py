@@ -0,0 +1,27 @@
+import pytest
+
+pytest.importorskip("fpdf")
+
+from benchmarks.suite import OPERACIONES, comparar, correr, exponente, tabla
+
+
+def test_suite_mide_todas_las_operaciones():
+    resultados = correr((20, 40), salida=lambda _: None)
+    assert set(resultados) == {"20", "40"}
+    for medidas in resultados.values():
+        assert set(medidas) == {nombre for nombre, _ in OPERACIONES}
+        assert all(m["segundos"] > 0 and "pico_bytes" in m for m in medidas.values())
+    assert "crear_cliente" in tabla(resultados)
+
+
+def test_comparar_detecta_regresiones():
+    base = {"1000": {"depositar": {"entidades": 1000, "segundos": 1.0, "pico_bytes": 100}}}
+    igual = {"1000": {"depositar": {"entidades": 1000, "segundos": 1.1, "pico_bytes": 100}}}
+    lento = {"1000": {"depositar": {"entidades": 1000, "segundos": 2.0, "pico_bytes": 300}}}
+    assert comparar(igual, base, 0.25) == []
+    assert len(comparar(lento, base, 0.25)) == 2
+
+
+def test_exponente_distingue_cuadratico():
+    cuadratico = {str(n): {"op": {"entidades": n, "segundos": n * n * 1e-9}} for n in (1000, 100000)}
+    assert exponente(cuadratico, "op") == pytest.approx(2.0)
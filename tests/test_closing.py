@@ -0,0 +1,87 @@
+import pytest
+
+from bank import closing
+from bank.closing import ReglasCierre
+from bank.ledger import COMISION, INTERES
+from bank.manager import BankManager
+from bank.reconcile import conciliar
+from bank.stats import Estadisticas
+
+
+def _banco(saldos, concurrente=False):
+    banco = BankManager(concurrente=concurrente)
+    cuentas = []
+    for i, saldo in enumerate(saldos):
+        cuenta = banco.crear_cuenta(banco.crear_cliente("N", "A", str(i), f"u{i}", "1111"), f"a{i}")
+        if saldo:
+            cuenta.depositar_centavos(saldo)
+        cuentas.append(cuenta)
+    return banco, cuentas
+
+
+@pytest.mark.parametrize("con_numpy", [True, False])
+def test_calcula_intereses_y_comisiones(monkeypatch, con_numpy):
+    if not con_numpy:
+        monkeypatch.setattr(closing, "np", None)
+    # 36,5 % anual: 0,1 % por día; comisión de $5 a saldos menores a $1000
+    reglas = ReglasCierre(tasa_anual_pb=3650, minimo_interes=10_000, comision=500, exento_comision=100_000)
+    intereses, comisiones = reglas.calcular([0, 300, 10_000, 99_999, 100_000, 5_000_000])
+    assert intereses[0] == [2, 3, 4, 5] and list(intereses[1]) == [10, 99, 100, 5000]
+    # 99.999 + 99 de interés llega a $1000 y queda exenta; la cuenta 1 solo paga lo que tiene
+    assert comisiones[0] == [1, 2] and list(comisiones[1]) == [300, 500]
+
+
+def test_reglas_invalidas():
+    with pytest.raises(ValueError):
+        ReglasCierre(tasa_anual_pb=-1)
+
+
+@pytest.mark.parametrize("concurrente", [False, True])
+def test_cierre_aplica_movimientos_y_concilia(concurrente):
+    banco, cuentas = _banco([0, 300, 1_000_000, 5_000_000], concurrente)
+    cuentas[2].estadisticas
+    total = banco.estadisticas.total()
+    reglas = ReglasCierre(tasa_anual_pb=3650, comision=500, exento_comision=2_000_000)
+    cierre = banco.cerrar_dia(reglas, fecha=1_700_000_000.0)
+
+    assert [c.saldo_centavos for c in cuentas] == [0, 0, 1_000_000 + 1000 - 500, 5_005_000]
+    assert cierre.cuentas == 4 and cierre.movimientos == 4
+    assert cierre.intereses == 6000 and cierre.comisiones == 800
+    assert "4 cuentas" in str(cierre)
+    assert conciliar(banco).ok
+    movimientos = cuentas[2].transacciones
+    assert [t.tipo for t in movimientos[-2:]] == ["Interés", "Comisión de mantenimiento"]
+    assert movimientos[-1].instante == 1_700_000_000.0
+    # Agregados de la cuenta y del banco al día sin recalcular
+    assert cuentas[2].estadisticas.total(INTERES) == 1000
+    assert cuentas[2].estadisticas.neto == cuentas[2].saldo_centavos
+    assert banco.estadisticas.total() == total + 6800
+    assert banco.estadisticas.neto == Estadisticas.del_libro(banco.libro).neto
+    assert list(banco.consultar_movimientos(tipos=[COMISION]))[0][0] == cuentas[1].numero
+
+
+def test_cierre_se_reaplica_desde_el_journal(tmp_path):
+    ruta = str(tmp_path / "banco.journal")
+    banco = BankManager()
+    banco.abrir_journal(ruta)
+    cuenta = banco.crear_cuenta(banco.crear_cliente("N", "A", "1", "u1", "1111"), "a1")
+    cuenta.depositar_centavos(1_000_000)
+    banco.cerrar_dia(ReglasCierre(tasa_anual_pb=365, comision=100))
+    banco.cerrar()
+
+    restaurado = BankManager()
+    restaurado.abrir_journal(ruta, verificar=True)
+    assert restaurado.buscar_cuenta_por_numero(cuenta.numero).saldo_centavos == 1_000_000 + 100 - 100
+    assert len(restaurado.libro) == 3
+    restaurado.cerrar()
+
+
+def test_cierre_sobre_snapshot_materializa_solo_las_cuentas_movidas(tmp_path):
+    banco, cuentas = _banco([0, 0, 1_000_000])
+    banco.guardar_snapshot(str(tmp_path / "banco.snap"))
+    cargado = BankManager.cargar_snapshot(str(tmp_path / "banco.snap"))
+    cierre = cargado.cerrar_dia(ReglasCierre(tasa_anual_pb=3650))
+    assert cierre.movimientos == 1
+    assert len(cargado._cuentas_snapshot) == 1
+    assert cargado.buscar_cuenta_por_numero(cuentas[2].numero).saldo_centavos == 1_001_000
+    assert conciliar(cargado).ok
@@ -0,0 +1,76 @@
+import random
+from concurrent.futures import ThreadPoolExecutor
+from bank.manager import BankManager
+
+
+def _banco(n_cuentas):
+    banco = BankManager(concurrente=True)
+    cuentas = []
+    for i in range(n_cuentas):
+        cliente = banco.crear_cliente("N", "A", str(i), f"u{i}", "1111")
+        cuenta = banco.crear_cuenta(cliente, f"a{i}")
+        cuenta.depositar(1000)
+        cuentas.append(cuenta)
+    return banco, cuentas
+
+
+def _transferencias_al_azar(cuentas, n, semilla):
+    azar = random.Random(semilla)
+    for _ in range(n):
+        origen, destino = azar.sample(cuentas, 2)
+        try:
+            origen.transferir_centavos(azar.randint(1, 50000), destino)
+        except ValueError:
+            pass  # saldo insuficiente
+
+
+def test_transferencias_concurrentes_conservan_el_dinero():
+    banco, cuentas = _banco(6)
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(lambda s: _transferencias_al_azar(cuentas, 2000, s), range(8)))
+
+    assert banco.saldo_total_centavos() == 6 * 100000
+    for cuenta in cuentas:
+        assert cuenta.saldo_centavos >= 0
+        # El saldo coincide con la suma de sus movimientos en el libro
+        signos = {1: 1, 2: -1, 3: -1, 4: 1}
+        libro = banco.libro
+        assert cuenta.saldo_centavos == sum(signos[libro.tipos[i]] * libro.montos[i] for i in cuenta.movimientos)
+
+
+def test_transferencias_cruzadas_no_se_bloquean():
+    _, (a, b) = _banco(2)
+
+    def ida_y_vuelta(desde, hacia):
+        for _ in range(5000):
+            desde.transferir_centavos(1, hacia)
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        futuros = [pool.submit(ida_y_vuelta, a, b), pool.submit(ida_y_vuelta, b, a)]
+        for futuro in futuros:
+            futuro.result(timeout=30)
+    assert a.saldo_centavos == b.saldo_centavos == 100000
+
+
+def test_checkpoint_con_escrituras_concurrentes_no_pierde_registros(tmp_path):
+    ruta = str(tmp_path / "banco.journal")
+    banco = BankManager(concurrente=True)
+    banco.abrir_journal(ruta)
+    cuentas = []
+    for i in range(4):
+        cuenta = banco.crear_cuenta(banco.crear_cliente("N", "A", str(i), f"u{i}", "1111"), f"a{i}")
+        cuenta.depositar_centavos(10_000)
+        cuentas.append(cuenta)
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        tareas = [pool.submit(_transferencias_al_azar, cuentas, 1500, s) for s in range(3)]
+        while not all(t.done() for t in tareas):
+            banco.checkpoint()
+        for t in tareas:
+            t.result()
+    saldos = [c.saldo_centavos for c in cuentas]
+    banco.cerrar()
+
+    restaurado = BankManager()
+    restaurado.abrir_journal(ruta)
+    assert [restaurado.buscar_cuenta_por_numero(c.numero).saldo_centavos for c in cuentas] == saldos
+    restaurado.cerrar()
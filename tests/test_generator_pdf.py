@@ -0,0 +1,76 @@
+import os
+import threading
+
+import pytest
+
+pytest.importorskip("fpdf")
+
+from bank.manager import BankManager
+from generator_pdf import StatementCache, generar_pdf, generar_pdf_en_segundo_plano, generar_pdfs
+
+
+def _banco():
+    banco = BankManager()
+    for i in range(3):
+        cuenta = banco.crear_cuenta(banco.crear_cliente("N", "A", str(i), f"u{i}", "1111"), f"a{i}")
+        cuenta.depositar(10 + i)
+    return banco
+
+
+def test_pdf_en_segundo_plano(tmp_path):
+    avisos = []
+    listo = threading.Event()
+
+    def al_terminar(ruta, error):
+        avisos.append((ruta, error))
+        listo.set()
+
+    generar_pdf_en_segundo_plano(_banco().buscar_cliente("u0"), al_terminar, str(tmp_path))
+    assert listo.wait(30)
+    ruta, error = avisos[0]
+    assert error is None and os.path.exists(ruta)
+
+
+def test_generacion_masiva(tmp_path):
+    resultado = generar_pdfs(_banco(), procesos=1, carpeta=str(tmp_path))
+    assert len(resultado["rutas"]) == 3
+    assert resultado["pdfs_por_segundo"] > 0
+
+
+def test_cache_reutiliza_paginas_completas(tmp_path):
+    banco = _banco()
+    cliente = banco.buscar_cliente("u0")
+    cuenta = cliente.cuentas[0]
+    for _ in range(100):
+        cuenta.depositar_centavos(100)
+    cache = StatementCache()
+    primera = generar_pdf(cliente, str(tmp_path / "a"), cache)
+    assert cache.aciertos == 0 and len(cache) == 2  # 101 movimientos: 2 páginas llenas de 34
+    cuenta.depositar_centavos(5)
+    segunda = generar_pdf(cliente, str(tmp_path / "b"), cache)
+    assert cache.aciertos == 2
+    en_frio = generar_pdf(cliente, str(tmp_path / "c"), StatementCache())
+    assert os.path.getsize(segunda) == os.path.getsize(en_frio)
+    assert os.path.getsize(segunda) > os.path.getsize(primera)
+
+
+def test_cache_desaloja_por_tamanio():
+    cache = StatementCache(max_bytes=10)
+    cache.guardar("a", ("12", "345"))
+    cache.guardar("b", ("12345",))
+    cache.obtener("a")
+    cache.guardar("c", ("123", "45"))  # se va "b", el menos usado
+    assert cache.obtener("b") is None
+    assert cache.obtener("a") is not None and cache.obtener("c") is not None
+    assert cache.bytes == 10
+
+
+def test_cache_no_mezcla_libros(tmp_path):
+    cache = StatementCache()
+    for carpeta in ("a", "b"):
+        # Mismos números de cuenta y mismas filas, pero otro libro: no hay páginas para reusar
+        cliente = _banco().buscar_cliente("u0")
+        for _ in range(100):
+            cliente.cuentas[0].depositar_centavos(100)
+        generar_pdf(cliente, str(tmp_path / carpeta), cache)
+    assert cache.aciertos == 0 and len(cache) == 4
@@ -0,0 +1,76 @@
+from bank.journal import Journal
+from bank.manager import BankManager
+
+
+def _operar(banco):
+    c1 = banco.crear_cliente("Ana", "Lopez", "456", "anita", "2222")
+    c2 = banco.crear_cliente("Luis", "Gomez", "789", "luis", "3333")
+    a1 = banco.crear_cuenta(c1, "ana")
+    a2 = banco.crear_cuenta(c2, "luis")
+    a1.depositar(300)
+    a1.retirar(50)
+    a1.transferir(100, a2)
+    return a1, a2
+
+
+def test_replay_reconstruye_estado(tmp_path):
+    ruta = str(tmp_path / "banco.journal")
+    banco = BankManager()
+    banco.abrir_journal(ruta)
+    a1, a2 = _operar(banco)
+    banco.cerrar()
+
+    restaurado = BankManager()
+    restaurado.abrir_journal(ruta)
+    r1 = restaurado.buscar_cuenta_por_numero(a1.numero)
+    r2 = restaurado.buscar_cuenta_por_numero(a2.numero)
+    assert restaurado.buscar_cliente("anita").validar_pin("2222")
+    assert (r1.saldo, r2.saldo) == (150, 100)
+    assert [str(t) for t in r1.transacciones] == [str(t) for t in a1.transacciones]
+    assert restaurado.asignador.posicion == banco.asignador.posicion
+    restaurado.cerrar()
+
+
+def test_el_journal_no_guarda_el_pin_en_claro(tmp_path):
+    ruta = str(tmp_path / "banco.journal")
+    banco = BankManager()
+    banco.abrir_journal(ruta)
+    _operar(banco)
+    banco.cerrar()
+    claves = [r[5] for r in Journal.leer(ruta)[0] if r[0] == "C"]
+    assert len(claves) == 2
+    assert all(c.startswith("pbkdf2_sha256$") for c in claves)
+
+
+def test_checkpoint_trunca_y_conserva_estado(tmp_path):
+    ruta = str(tmp_path / "banco.journal")
+    banco = BankManager()
+    banco.abrir_journal(ruta)
+    a1, a2 = _operar(banco)
+    banco.checkpoint()
+    assert len(Journal.leer(ruta)[0]) == 1  # solo la cabecera
+    a2.depositar(10)
+    banco.cerrar()
+
+    restaurado = BankManager()
+    restaurado.abrir_journal(ruta)
+    assert restaurado.buscar_cuenta_por_numero(a1.numero).saldo == 150
+    assert restaurado.buscar_cuenta_por_numero(a2.numero).saldo == 110
+    nueva = restaurado.crear_cuenta(restaurado.buscar_cliente("luis"), "otra")
+    assert nueva.numero not in (a1.numero, a2.numero)
+    restaurado.cerrar()
+
+
+def test_ignora_linea_incompleta(tmp_path):
+    ruta = str(tmp_path / "banco.journal")
+    banco = BankManager()
+    banco.abrir_journal(ruta, lote=1)
+    banco.crear_cliente("Ana", "Lopez", "456", "anita", "2222")
+    banco.cerrar()
+    with open(ruta, "ab") as f:
+        f.write(b'["C","Luis"')
+
+    restaurado = BankManager()
+    restaurado.abrir_journal(ruta)
+    assert [c.usuario for c in restaurado.clientes] == ["anita"]
+    restaurado.cerrar()
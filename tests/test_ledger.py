@@ -0,0 +1,108 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import pytest
+
+from bank.ledger import Ledger, DEPOSITO, RETIRO, TRANSFERENCIA_ENVIADA, TRANSFERENCIA_RECIBIDA
+from bank.manager import BankManager
+
+
+def test_transferencia_escribe_ambas_patas():
+    banco = BankManager()
+    a1 = banco.crear_cuenta(banco.crear_cliente("A", "B", "1", "u1", "1111"), "alias1")
+    a2 = banco.crear_cuenta(banco.crear_cliente("C", "D", "2", "u2", "2222"), "alias2")
+    a1.depositar(200)
+    a1.transferir(80, a2)
+
+    libro = banco.libro
+    assert len(libro) == 3
+    salida, entrada = a1.movimientos[-1], a2.movimientos[-1]
+    assert libro.ids[salida] == libro.ids[entrada]
+    assert (libro.tipos[salida], libro.numeros[salida], libro.contrapartes[salida]) == \
+        (TRANSFERENCIA_ENVIADA, a1.numero, a2.numero)
+    assert (libro.tipos[entrada], libro.numeros[entrada], libro.contrapartes[entrada]) == \
+        (TRANSFERENCIA_RECIBIDA, a2.numero, a1.numero)
+    assert [t.tipo for t in a1.transacciones] == ["Depósito", "Transferencia a alias2"]
+    assert [t.tipo for t in a2.transacciones] == ["Transferencia de alias1"]
+
+
+def test_columnas_ida_y_vuelta():
+    libro = Ledger()
+    libro.movimiento(10, DEPOSITO, 550, fecha=1700000000.0)
+    libro.transferencia(10, 20, 200, fecha=1700000001.0)
+
+    copia = Ledger()
+    antes = copia.identidad
+    copia.cargar_columnas(libro.columnas_bytes())
+    assert len({libro.identidad, antes, copia.identidad}) == 3
+    assert [copia.fila(i) for i in range(3)] == [libro.fila(i) for i in range(3)]
+    assert copia.movimiento(10, DEPOSITO, 100) == 3
+    assert copia.ids[3] == 3
+
+
+def _libro_de_prueba():
+    libro = Ledger()
+    for k in range(2000):
+        tipo = RETIRO if k % 3 == 0 else DEPOSITO
+        libro.movimiento(10 + k % 2, tipo, 100 * (k % 50), fecha=1000.0 + k)
+    return libro
+
+
+def _esperadas(libro, desde, hasta, tipos, minimo, maximo):
+    return [i for i in range(len(libro))
+            if desde <= libro.fechas[i] < hasta and libro.tipos[i] in tipos
+            and minimo <= libro.montos[i] <= maximo]
+
+
+def test_consultar_por_fecha_tipo_y_monto():
+    libro = _libro_de_prueba()
+    assert list(libro.consultar(1100, 1110)) == list(range(100, 110))
+    # Tramo de montos más corto que el de fechas: se resuelve con el índice por monto
+    assert list(libro.consultar(tipos=RETIRO, minimo=4800)) == \
+        _esperadas(libro, 0, 1e9, {RETIRO}, 4800, 10**9)
+    assert list(libro.consultar(1500, 1600, tipos=(DEPOSITO,), minimo=1000, maximo=2000)) == \
+        _esperadas(libro, 1500, 1600, {DEPOSITO}, 1000, 2000)
+    desde = datetime.fromtimestamp(1990.0)
+    assert list(libro.consultar(desde)) == list(range(990, 2000))
+
+
+def test_consultar_con_fechas_fuera_de_orden():
+    libro = _libro_de_prueba()
+    assert list(libro.consultar(1000, 1003)) == [0, 1, 2]
+    libro.movimiento(10, DEPOSITO, 500, fecha=1001.5)  # reloj hacia atrás
+    assert list(libro.consultar(1000, 1003)) == [0, 1, 2000, 2]
+    assert list(libro.filtrar(range(0, 2001, 2), 1000, 1003)) == [0, 2000, 2]
+    copia = Ledger()
+    copia.cargar_columnas(libro.columnas_bytes())
+    assert list(copia.consultar(1001, 1002, tipos=DEPOSITO)) == [1, 2000]
+
+
+def test_las_fechas_quedan_en_orden_con_escrituras_concurrentes():
+    libro = Ledger()
+
+    def escribir(k):
+        for _ in range(200):
+            if k % 2:
+                libro.transferencias([1, 2], [2, 1], [10, 20])
+            else:
+                libro.movimiento(1, DEPOSITO, 10)
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        list(pool.map(escribir, range(4)))
+    assert list(libro.fechas) == sorted(libro.fechas)
+
+
+def test_una_escritura_invalida_no_deja_el_libro_a_medias():
+    banco = BankManager()
+    cuenta = banco.crear_cuenta(banco.crear_cliente("A", "B", "1", "a", "1111"), "a")
+    libro = banco.libro
+    for escribir in (lambda: libro.movimiento(1, DEPOSITO, 1.5),
+                     lambda: libro.transferencia(1, 2, 1.5),
+                     lambda: libro.movimientos([1, 2], DEPOSITO, [10, 1.5])):
+        with pytest.raises(TypeError):
+            escribir()
+    with pytest.raises(ValueError, match="Monto inválido"):
+        cuenta.depositar_centavos(1.5)
+    assert {len(getattr(libro, nombre)) for nombre, _ in Ledger.COLUMNAS} == {0}
+    cuenta.depositar_centavos(100)
+    assert libro.fila(0)[0] == 1 and cuenta.saldo_centavos == 100
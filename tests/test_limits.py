@@ -0,0 +1,144 @@
+import pytest
+
+from bank.batch import LOTE_RECHAZADO
+from bank.ledger import DEPOSITO, RETIRO, TRANSFERENCIA_ENVIADA
+from bank.limits import DIA, MINUTO, Limite, Ventana
+from bank.manager import BankManager
+from bank.service import BankService
+
+AHORA = 1_700_000_000.0
+
+
+def _banco(limites, concurrente=False):
+    banco = BankManager(concurrente=concurrente)
+    a = banco.crear_cuenta(banco.crear_cliente("A", "B", "1", "a", "1111"), "a")
+    b = banco.crear_cuenta(banco.crear_cliente("C", "D", "2", "b", "2222"), "b")
+    a.depositar_centavos(10_000_000)
+    banco.configurar_limites(limites)
+    return banco, a, b
+
+
+def test_ventana_vacia_los_baldes_que_salen():
+    ventana = Ventana(Limite.monto([RETIRO], 10, 100, baldes=10))
+    for balde in range(5):
+        ventana.avanzar(balde)
+        ventana.sumar(1)
+    ventana.avanzar(10)
+    assert ventana.total == 5  # con el balde actual la ventana cubre 11 baldes
+    ventana.avanzar(13)
+    assert ventana.total == 2
+    ventana.avanzar(100)
+    assert ventana.total == 0 and not any(ventana.sumas)
+
+
+def test_tope_de_monto_por_dia():
+    banco, a, b = _banco([Limite.monto([RETIRO], DIA, 100_000)])
+    a.retirar_centavos(60_000, AHORA)
+    a.retirar_centavos(40_000, AHORA + 3600)
+    with pytest.raises(ValueError, match="Límite excedido"):
+        a.retirar_centavos(1, AHORA + 7200)
+    # Las transferencias no cuentan para este límite y el rechazo no deja rastro
+    a.transferir_centavos(500_000, b, AHORA + 7200)
+    assert a.saldo_centavos == 10_000_000 - 600_000 and len(a.movimientos) == 4
+    # Pasadas 24 h (más un balde) el primer retiro ya no cuenta
+    a.retirar_centavos(60_000, AHORA + DIA + DIA / 60)
+
+
+def test_tope_de_cantidad_por_minuto_y_varios_limites():
+    banco, a, b = _banco([
+        Limite.cantidad([TRANSFERENCIA_ENVIADA], MINUTO, 3),
+        Limite.monto([RETIRO, TRANSFERENCIA_ENVIADA], DIA, 1_000_000),
+    ])
+    for k in range(3):
+        a.transferir_centavos(100, b, AHORA + k)
+    with pytest.raises(ValueError, match="3 operaciones cada 1 min"):
+        a.transferir_centavos(100, b, AHORA + 10)
+    a.transferir_centavos(100, b, AHORA + 62)
+    with pytest.raises(ValueError, match=r"\$10000.00 cada 1 d"):
+        a.retirar_centavos(1_000_000, AHORA + 70)
+    assert [d for _, d in banco.limites.disponible(a, AHORA + 70)] == [2, 1_000_000 - 400]
+    # Si falla el segundo límite, lo sumado al primero se deshace
+    with pytest.raises(ValueError, match="cada 1 d"):
+        a.transferir_centavos(999_700, b, AHORA + 200)
+    assert [d for _, d in banco.limites.disponible(a, AHORA + 200)] == [3, 1_000_000 - 400]
+
+
+def test_las_ventanas_se_arman_desde_el_historial():
+    banco, a, b = _banco([])
+    a.retirar_centavos(70_000, AHORA)
+    a.depositar_centavos(1, AHORA + 1)
+    banco.configurar_limites([Limite.monto([RETIRO], DIA, 100_000)])
+    with pytest.raises(ValueError):
+        a.retirar_centavos(40_000, AHORA + 10)
+    assert banco.limites.disponible(a, AHORA + 10)[0][1] == 30_000
+
+
+def test_lotes_y_ordenes_cuentan_y_el_replay_no_controla(tmp_path):
+    ruta = str(tmp_path / "banco.journal")
+    banco = BankManager()
+    banco.abrir_journal(ruta)
+    a = banco.crear_cuenta(banco.crear_cliente("A", "B", "1", "a", "1111"), "a")
+    b = banco.crear_cuenta(banco.crear_cliente("C", "D", "2", "b", "2222"), "b")
+    a.depositar_centavos(1_000_000)
+    banco.configurar_limites([Limite.monto([TRANSFERENCIA_ENVIADA], DIA, 500_000)])
+    a.transferir_centavos(100_000, b)
+    banco.aplicar_lote([(a.numero, b.numero, 300_000)])
+    with pytest.raises(ValueError, match="Límite excedido"):
+        a.transferir_centavos(200_000, b)
+    orden = banco.programar_transferencia(a, b, 200_000)
+    assert banco.ejecutar_ordenes().reintentos == 1 and orden.intentos == 1
+    banco.cerrar()
+
+    # Con límites más estrictos el journal se reaplica igual
+    restaurado = BankManager()
+    restaurado.configurar_limites([Limite.monto([TRANSFERENCIA_ENVIADA], DIA, 1)])
+    restaurado.abrir_journal(ruta, verificar=True)
+    assert restaurado.buscar_cuenta_por_numero(b.numero).saldo_centavos == 400_000
+    with pytest.raises(ValueError):
+        restaurado.buscar_cuenta_por_numero(a.numero).transferir_centavos(1, restaurado.buscar_cuenta_por_numero(b.numero))
+    restaurado.cerrar()
+
+
+def test_limites_invalidos_y_servicio():
+    with pytest.raises(ValueError):
+        Limite.monto([DEPOSITO], DIA, 1)
+    with pytest.raises(ValueError):
+        Limite.cantidad([RETIRO], 0, 1)
+    banco, a, _ = _banco([Limite.cantidad([RETIRO], MINUTO, 2)], concurrente=True)
+    servicio = BankService(banco)
+    assert [d for _, d in servicio.limites_disponibles(a)] == [2]
+    banco.configurar_limites(None)
+    assert servicio.limites_disponibles(a) == []
+
+
+def test_un_lote_que_excede_un_limite_se_rechaza_entero():
+    banco, a, b = _banco([Limite.monto([TRANSFERENCIA_ENVIADA], DIA, 500_000)])
+    a.transferir_centavos(100_000, b, AHORA)
+    errores = banco.aplicar_lote([(a.numero, b.numero, 300_000), (a.numero, b.numero, 150_000)], AHORA + 1)
+    assert errores[0] == LOTE_RECHAZADO and "Límite excedido" in errores[1]
+    assert b.saldo_centavos == 100_000
+    # Lo consumido por la primera transferencia del lote rechazado se devolvió
+    assert banco.limites.disponible(a, AHORA + 1)[0][1] == 400_000
+    assert banco.aplicar_lote([(a.numero, b.numero, 400_000)], AHORA + 2) == [None]
+    with pytest.raises(ValueError, match="Límite excedido"):
+        a.transferir_centavos(1, b, AHORA + 3)
+
+
+def test_una_escritura_fallida_devuelve_lo_consumido(monkeypatch):
+    banco, a, b = _banco([Limite.cantidad([RETIRO], MINUTO, 1),
+                          Limite.cantidad([TRANSFERENCIA_ENVIADA], MINUTO, 1)])
+
+    def falla(*args, **kwargs):
+        raise OSError("disco lleno")
+
+    with monkeypatch.context() as m:
+        m.setattr(banco.libro, "movimiento", falla)
+        m.setattr(banco.libro, "transferencia", falla)
+        with pytest.raises(OSError):
+            a.retirar_centavos(100, AHORA)
+        with pytest.raises(OSError):
+            a.transferir_centavos(100, b, AHORA)
+    # Lo que falló no cuenta: la única operación permitida por minuto sigue disponible
+    a.retirar_centavos(100, AHORA + 1)
+    a.transferir_centavos(100, b, AHORA + 1)
+    assert a.saldo_centavos == 10_000_000 - 200
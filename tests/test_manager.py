@@ -1,4 +1,5 @@
 import pytest
+from bank.ledger import DEPOSITO, RETIRO, TRANSFERENCIA_ENVIADA, TRANSFERENCIA_RECIBIDA
 from bank.manager import BankManager
 
 
@@ -15,3 +16,129 @@ def test_crear_cuenta():
     c = banco.crear_cliente("Ana", "Lopez", "456", "anita", "2222")
     cuenta = banco.crear_cuenta(c, "alias_ana")
     assert cuenta in c.cuentas
+
+
+def test_usuario_duplicado():
+    banco = BankManager()
+    banco.crear_cliente("Juan", "Perez", "123", "jp", "1111")
+    with pytest.raises(ValueError):
+        banco.crear_cliente("Otro", "Juan", "999", "jp", "2222")
+
+
+def test_buscar_cuenta_por_numero_y_alias():
+    banco = BankManager()
+    c1 = banco.crear_cliente("Ana", "Lopez", "456", "anita", "2222")
+    c2 = banco.crear_cliente("Luis", "Gomez", "789", "luis", "3333")
+    a1 = banco.crear_cuenta(c1, "compartido")
+    a2 = banco.crear_cuenta(c2, "compartido")
+    assert banco.buscar_cuenta_por_numero(a1.numero) is a1
+    assert banco.buscar_cuenta_por_numero(1) is None
+    assert banco.buscar_cuenta_por_alias("compartido") == [a1, a2]
+    assert banco.buscar_cuenta_por_alias("inexistente") == []
+
+
+def _banco_para_listar():
+    banco = BankManager()
+    for usuario, dni in (("carla", "30"), ("ana", "10"), ("beto", "30"), ("dario", "20")):
+        banco.crear_cliente("N", "A", dni, usuario, "1111")
+    return banco
+
+
+def test_listar_clientes():
+    banco = _banco_para_listar()
+    assert banco.listar_clientes().splitlines()[0] == "1. carla - N A - DNI: 30"
+    assert banco.listar_clientes(limite=1, desde=1, orden="usuario") == "2. beto - N A - DNI: 30"
+    assert BankManager().listar_clientes() == "No hay clientes registrados."
+
+
+def test_iterar_clientes_con_orden_y_offset():
+    banco = _banco_para_listar()
+    assert [c.usuario for c in banco.iterar_clientes()] == ["carla", "ana", "beto", "dario"]
+    assert [c.usuario for c in banco.iterar_clientes(orden="usuario")] == ["ana", "beto", "carla", "dario"]
+    # DNIs repetidos: desempata el orden de alta
+    assert [c.usuario for c in banco.iterar_clientes(orden="dni")] == ["ana", "dario", "carla", "beto"]
+    assert [c.usuario for c in banco.iterar_clientes(limite=2, desde=1, orden="dni")] == ["dario", "carla"]
+    with pytest.raises(ValueError):
+        list(banco.iterar_clientes(orden="nombre"))
+
+
+@pytest.mark.parametrize("orden", [None, "usuario", "dni"])
+def test_paginas_con_cursor(orden):
+    banco = _banco_para_listar()
+    esperado = [c.usuario for c in banco.iterar_clientes(orden=orden)]
+    vistos, cursor = [], None
+    while True:
+        pagina, cursor = banco.pagina_clientes(3, orden, cursor)
+        vistos.extend(c.usuario for c in pagina)
+        if cursor is None:
+            break
+    assert vistos == esperado
+
+
+def test_cursor_sobrevive_a_altas_nuevas():
+    banco = _banco_para_listar()
+    pagina, cursor = banco.pagina_clientes(2, "usuario")
+    assert [c.usuario for c in pagina] == ["ana", "beto"]
+    banco.crear_cliente("N", "A", "5", "aaron", "1111")  # queda antes del cursor
+    banco.crear_cliente("N", "A", "6", "bruno", "1111")
+    pagina, cursor = banco.pagina_clientes(10, "usuario", cursor)
+    assert [c.usuario for c in pagina] == ["bruno", "carla", "dario"] and cursor is None
+
+
+def test_buscar_clientes_por_prefijo():
+    banco = BankManager()
+    ana = banco.crear_cliente("Ana", "Lopez", "456", "anita", "2222")
+    luis = banco.crear_cliente("Luis", "Anaya", "789", "luis", "3333")
+    banco.crear_cuenta(luis, "ahorro")
+    assert banco.buscar_clientes("AN") == [ana, luis]  # usuario, luego apellido
+    assert banco.buscar_clientes("luis g") == []
+    assert banco.buscar_clientes("luis a") == [luis]
+    assert banco.buscar_clientes("45") == [ana]
+    assert banco.buscar_clientes("ahor") == [luis]
+    assert banco.buscar_clientes("an", limite=1, desde=1) == [luis]
+    # Los índices ya armados incorporan las altas nuevas
+    nuevo = banco.crear_cliente("Andrea", "Sosa", "111", "andy", "4444")
+    assert banco.buscar_clientes("and") == [nuevo]
+
+
+def test_buscar_cuentas_por_prefijo():
+    banco = BankManager()
+    c = banco.crear_cliente("Ana", "Lopez", "456", "anita", "2222")
+    sueldo = banco.crear_cuenta(c, "Sueldo")
+    ahorro = banco.crear_cuenta(c, "ahorro")
+    otra = banco.crear_cuenta(banco.crear_cliente("L", "G", "1", "l", "1"), "sueldo2")
+    assert banco.buscar_cuentas("suel") == [sueldo, otra]
+    assert banco.buscar_cuentas("suel", cliente=c) == [sueldo]
+    assert banco.buscar_cuentas(str(ahorro.numero)[:6], cliente=c) == [ahorro]
+
+
+def test_sugerir_destinos():
+    banco = BankManager()
+    ana = banco.crear_cliente("Ana", "Lopez", "456", "anita", "2222")
+    luis = banco.crear_cliente("Luis", "Gomez", "789", "luis", "3333")
+    propia = banco.crear_cuenta(ana, "sueldo")
+    otra = banco.crear_cuenta(luis, "sueldo")
+    larga = banco.crear_cuenta(luis, "sueldo_luis")
+    sugerencias = banco.sugerir_destinos("Suel")
+    assert [d.numero for d in sugerencias] == [propia.numero, otra.numero, larga.numero]
+    assert sugerencias[1].titular == "Luis Gomez" and sugerencias[1].alias == "sueldo"
+    assert banco.sugerir_destinos("sueldo", excluir=propia.numero)[0].numero == otra.numero
+    assert len(banco.sugerir_destinos("s", limite=2)) == 2
+    assert banco.sugerir_destinos("x") == []
+
+
+def test_consultar_movimientos_por_cuenta_y_banco():
+    banco = BankManager()
+    c = banco.crear_cliente("A", "B", "1", "u1", "1111")
+    a1, a2 = banco.crear_cuenta(c, "alias1"), banco.crear_cuenta(c, "alias2")
+    a1.depositar(100)
+    a1.retirar(30)
+    a1.transferir(50, a2)
+    inicio = banco.libro.fechas[0]
+
+    assert [t.tipo for t in a1.consultar(desde=inicio)] == ["Depósito", "Retiro", "Transferencia a alias2"]
+    assert [t.centavos for t in a1.consultar(tipos=(DEPOSITO, RETIRO), maximo=5000)] == [3000]
+    assert list(a2.consultar(hasta=inicio)) == []
+    movimientos = list(banco.consultar_movimientos(minimo=4000))
+    assert [(numero, t.codigo) for numero, t in movimientos] == \
+        [(a1.numero, DEPOSITO), (a1.numero, TRANSFERENCIA_ENVIADA), (a2.numero, TRANSFERENCIA_RECIBIDA)]
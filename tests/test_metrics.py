@@ -0,0 +1,116 @@
+import threading
+import time
+import urllib.request
+
+import pytest
+
+from bank.manager import BankManager
+from bank.metrics import METRICAS, Metricas, instrumentar
+
+
+def _cuenta(op):
+    return METRICAS.instantanea().get(op, {}).get("cuenta", 0)
+
+
+def test_operaciones_del_banco_quedan_registradas():
+    antes = {op: _cuenta(op) for op in ("crear_cliente", "crear_cuenta", "depositar", "retirar", "buscar_cliente")}
+    fallos_antes = METRICAS.instantanea().get("retirar", {}).get("fallos", 0)
+    banco = BankManager()
+    cuenta = banco.crear_cuenta(banco.crear_cliente("Ana", "Lopez", "1", "ana", "1111"), "ana")
+    cuenta.depositar(10)
+    with pytest.raises(ValueError):
+        cuenta.retirar(50)
+    banco.buscar_cliente("ana")
+    despues = {op: _cuenta(op) for op in antes}
+    assert all(despues[op] == antes[op] + 1 for op in antes)
+    assert METRICAS.instantanea()["retirar"]["fallos"] == fallos_antes + 1
+
+
+def test_histograma_y_prometheus(tmp_path):
+    metricas = Metricas()
+    for segundos in (0.0004, 0.0004, 0.003, 2.0):
+        metricas.registrar("depositar", segundos)
+    metricas.registrar("depositar", 0.001, fallo=True)
+    datos = metricas.instantanea()["depositar"]
+    assert datos["cuenta"] == 5 and datos["fallos"] == 1
+    assert datos["p50"] == 0.001 and datos["p99"] == 2.5
+
+    texto = metricas.texto_prometheus()
+    assert 'banco_operaciones_total{operacion="depositar"} 5' in texto
+    assert 'banco_latencia_segundos_bucket{operacion="depositar",le="0.0005"} 2' in texto
+    assert 'banco_latencia_segundos_bucket{operacion="depositar",le="+Inf"} 5' in texto
+    ruta = tmp_path / "banco.prom"
+    metricas.escribir_prometheus(str(ruta))
+    assert ruta.read_text(encoding="utf-8") == texto
+
+    servidor = metricas.servir_prometheus(puerto=0)
+    try:
+        url = f"http://127.0.0.1:{servidor.server_address[1]}/metrics"
+        assert urllib.request.urlopen(url, timeout=5).read().decode() == texto
+    finally:
+        servidor.shutdown()
+
+    metricas.reiniciar()
+    assert metricas.instantanea()["depositar"]["cuenta"] == 0
+
+
+def test_perfilador_captura_operaciones_lentas():
+    metricas = Metricas()
+
+    @instrumentar("lenta", metricas)
+    def operacion_lenta():
+        time.sleep(0.15)
+
+    @instrumentar("rapida", metricas)
+    def operacion_rapida():
+        pass
+
+    perfilador = metricas.activar_perfilador(umbral=0.05, intervalo=0.01)
+    try:
+        operacion_rapida()
+        operacion_lenta()
+    finally:
+        metricas.desactivar_perfilador()
+    assert perfilador.muestras
+    assert {op for op, _, _ in perfilador.muestras} == {"lenta"}
+    (operacion, pila), _ = perfilador.resumen(1)[0]
+    assert "operacion_lenta" in pila
+
+
+def test_cada_hilo_cuenta_aparte_y_las_lecturas_suman():
+    metricas = Metricas()
+
+    @instrumentar("op", metricas)
+    def op():
+        pass
+
+    def trabajar():
+        for _ in range(1000):
+            op()
+
+    hilos = [threading.Thread(target=trabajar) for _ in range(4)]
+    for hilo in hilos:
+        hilo.start()
+    trabajar()
+    for hilo in hilos:
+        hilo.join()
+    assert metricas.instantanea()["op"]["cuenta"] == 5000
+    # Los hilos que terminaron se pliegan en la base sin perder nada
+    assert metricas.instantanea()["op"]["cuenta"] == 5000
+    assert len(metricas._de_hilos) == 1
+
+
+def test_el_replay_del_journal_no_cuenta(tmp_path):
+    ruta = str(tmp_path / "banco.journal")
+    banco = BankManager()
+    banco.abrir_journal(ruta)
+    banco.crear_cuenta(banco.crear_cliente("Ana", "Lopez", "1", "ana", "1111"), "ana").depositar(10)
+    banco.cerrar()
+    antes = {op: _cuenta(op) for op in ("crear_cliente", "crear_cuenta", "depositar")}
+    restaurado = BankManager()
+    restaurado.abrir_journal(ruta)
+    assert restaurado.buscar_cliente("ana").cuentas[0].saldo == 10
+    assert {op: _cuenta(op) for op in antes} == antes
+    restaurado.buscar_cliente("ana").cuentas[0].depositar(5)
+    assert _cuenta("depositar") == antes["depositar"] + 1
+    restaurado.cerrar()
@@ -1,5 +1,6 @@
 import pytest
-from bank.models import Client, Account
+from bank.ledger import DEPOSITO, TRANSFERENCIA_ENVIADA, formatear_fecha
+from bank.models import Client, Account, Transaction, Deposit, Withdrawal, Transfer
 
 
 def test_crear_cliente():
@@ -8,6 +9,17 @@ def test_crear_cliente():
     assert not c.validar_pin("0000")
 
 
+def test_el_pin_se_guarda_hasheado_con_sal():
+    c1 = Client("A", "B", "1", "u1", "1234")
+    c2 = Client("C", "D", "2", "u2", "1234")
+    assert "1234" not in c1.exportar()
+    assert c1.exportar()[4] != c2.exportar()[4]
+    restaurado = Client("A", "B", "1", "u1", pin_hash=c1.exportar()[4])
+    assert restaurado.validar_pin("1234") and not restaurado.validar_pin("4321")
+    # Datos viejos con el PIN en claro se siguen aceptando
+    assert Client("A", "B", "1", "u1", pin_hash="1234").validar_pin("1234")
+
+
 def test_cuenta_deposito_y_retiro():
     c = Client("Ana", "Lopez", "98765432", "anita", "4321")
     cuenta = Account(1, "mi_alias", c)
@@ -26,3 +38,53 @@ def test_transferencia():
     a1.transferir(100, a2)
     assert a1.saldo == 100
     assert a2.saldo == 100
+
+
+def test_modelos_sin_dict():
+    c = Client("A", "B", "1", "u1", "1111")
+    cuenta = Account(1, "alias1", c)
+    for objeto in (c, cuenta, Deposit(10), Withdrawal(5), Transfer(1, cuenta)):
+        assert not hasattr(objeto, "__dict__")
+    with pytest.raises(AttributeError):
+        c.otro = 1
+
+
+def test_transaction_formatea_al_mostrar():
+    t = Transaction(DEPOSITO, 1050, 0.0)
+    assert (t.codigo, t.centavos, t.instante) == (DEPOSITO, 1050, 0.0)
+    assert str(t) == f"{formatear_fecha(0.0)} - Depósito: $10.50"
+    assert Withdrawal("2.5").tipo == "Retiro"
+
+
+def test_transfer_con_cuenta_numero_o_alias():
+    c = Client("A", "B", "1", "u1", "1111")
+    destino = Account(7, "alias7", c)
+    assert Transfer(1, destino).tipo == "Transferencia a alias7"
+    assert Transfer(1, 7).tipo == "Transferencia a N° 7"
+    assert Transfer(1, "otro").tipo == "Transferencia a otro"
+
+
+def test_historial_guarda_la_cuenta_destino():
+    c = Client("A", "B", "1", "u1", "1111")
+    a1 = Account(1, "alias1", c)
+    a2 = Account(2, "alias2", c)
+    a1.depositar(200)
+    a1.transferir(100, a2)
+    enviada = a1.transacciones[-1]
+    assert enviada.codigo == TRANSFERENCIA_ENVIADA and enviada.contraparte is a2
+    assert a2.transacciones[-1].tipo == "Transferencia de alias1"
+
+
+def test_cuentas_independientes_con_el_mismo_numero_no_se_pisan():
+    c = Client("A", "B", "1", "u1", "1111")
+    a = Account(1, "primera", c)
+    b = Account(1, "segunda", c)
+    otra = Account(2, "otra", c)
+    a.depositar(100)
+    b.depositar(100)
+    a.transferir(10, otra)
+    b.transferir(20, otra)
+    assert a.libro is not b.libro
+    assert [t.centavos for t in a.transacciones] == [10000, 1000]
+    assert [t.centavos for t in b.transacciones] == [10000, 2000]
+    assert a.transacciones[-1].contraparte is otra and b.transacciones[-1].contraparte is otra
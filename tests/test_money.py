@@ -0,0 +1,55 @@
+import pytest
+from decimal import Decimal
+from array import array
+from bank.money import parsear, a_centavos, formatear, sumar
+from bank.models import Client, Account
+
+
+def test_parsear_texto():
+    assert parsear("1500") == 150000
+    assert parsear(" $12.5 ") == 1250
+    assert parsear("12,05") == 1205
+    assert parsear(".5") == 50
+    for invalido in ("", "$", "abc", "1.234,5", "0.125"):
+        with pytest.raises(ValueError):
+            parsear(invalido)
+
+
+def test_conversiones_y_formato():
+    assert a_centavos(100) == 10000
+    assert a_centavos(0.29) == 29
+    assert a_centavos(Decimal("3.10")) == 310
+    assert formatear(123456) == "$1234.56"
+    assert sumar(array("q", [10, 20, 30])) == sumar([10, 20, 30]) == 60
+    assert sumar(array("q")) == 0
+    # En int64 estas sumas desbordan: el total tiene que ser exacto igual
+    assert sumar(array("q", [2**63 - 1] * 3)) == 3 * (2**63 - 1)
+    assert sumar(array("q", [-2**63, -1])) == -2**63 - 1
+
+
+def test_sin_deriva_de_redondeo():
+    cuenta = Account(1, "alias", Client("A", "B", "1", "u", "1111"))
+    for _ in range(1000):
+        cuenta.depositar(0.1)
+    assert cuenta.saldo_centavos == 10000
+    cuenta.retirar("99.99")
+    assert cuenta.saldo == Decimal("0.01")
+    assert str(cuenta).endswith("Saldo: $0.01")
+
+
+def test_montos_fuera_de_rango_no_tocan_saldo_ni_historial():
+    for monto in (10**17, 1e30, Decimal("1e20"), "100000000000000000"):
+        with pytest.raises(ValueError, match="fuera de rango"):
+            a_centavos(monto)
+    cuenta = Account(1, "a", Client("A", "B", "1", "u", "1111"))
+    otra = Account(2, "b", Client("C", "D", "2", "v", "2222"))
+    with pytest.raises(ValueError, match="fuera de rango"):
+        cuenta.depositar_centavos(10**19)
+    cuenta.depositar_centavos(2**63 - 1)
+    with pytest.raises(ValueError, match="fuera de rango"):
+        cuenta.depositar_centavos(1)
+    otra.depositar_centavos(1)
+    with pytest.raises(ValueError, match="fuera de rango"):
+        otra.transferir_centavos(1, cuenta)
+    assert (cuenta.saldo_centavos, len(cuenta.movimientos)) == (2**63 - 1, 1)
+    assert (otra.saldo_centavos, len(otra.movimientos)) == (1, 1)
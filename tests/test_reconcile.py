@@ -0,0 +1,68 @@
+import pytest
+
+from bank import reconcile
+from bank.ledger import DEPOSITO
+from bank.manager import BankManager
+from bank.reconcile import Discrepancia, conciliar, conciliar_snapshot
+
+
+def _banco():
+    banco = BankManager()
+    cuentas = []
+    for i in range(20):
+        cliente = banco.crear_cliente("N", "A", str(i), f"u{i}", "1111")
+        cuentas.append(banco.crear_cuenta(cliente, f"alias{i}"))
+    for i, cuenta in enumerate(cuentas):
+        cuenta.depositar_centavos(1000 + i)
+        cuenta.transferir_centavos(100, cuentas[i - 1])
+    cuentas[0].retirar_centavos(50)
+    banco.aplicar_lote([(cuentas[1].numero, cuentas[2].numero, 7)] * 100)
+    return banco, cuentas
+
+
+@pytest.mark.parametrize("modo", ["tabla", "busqueda", "sin_numpy"])
+def test_concilia_y_reporta_diferencias(monkeypatch, modo):
+    if modo == "busqueda":
+        monkeypatch.setattr(reconcile, "TABLA_MAXIMA", 0)
+    elif modo == "sin_numpy":
+        monkeypatch.setattr(reconcile, "np", None)
+    banco, cuentas = _banco()
+    assert conciliar(banco).ok
+
+    cuentas[3].saldo_centavos += 5
+    banco.libro.movimiento(999, DEPOSITO, 10)
+    resultado = conciliar(banco)
+    assert resultado.discrepancias == [Discrepancia(cuentas[3].numero, 1003 + 5, 1003)]
+    assert resultado.huerfanas == 1 and not resultado.ok
+    assert "según el libro $10.03" in str(resultado)
+
+
+def test_concilia_en_procesos_sobre_snapshot(tmp_path):
+    banco, cuentas = _banco()
+    cuentas[5].saldo_centavos = 0
+    ruta = str(tmp_path / "estado.snap")
+    banco.guardar_snapshot(ruta)
+    for resultado in (conciliar(banco, procesos=2), conciliar_snapshot(ruta, procesos=2)):
+        assert [d.numero for d in resultado.discrepancias] == [cuentas[5].numero]
+        assert resultado.filas == len(banco.libro)
+
+
+def test_verifica_el_estado_tras_reiniciar(tmp_path):
+    ruta = str(tmp_path / "banco.journal")
+    banco = BankManager()
+    banco.abrir_journal(ruta)
+    a = banco.crear_cuenta(banco.crear_cliente("A", "B", "1", "u1", "1111"), "a")
+    b = banco.crear_cuenta(banco.crear_cliente("C", "D", "2", "u2", "2222"), "b")
+    a.depositar(100)
+    banco.checkpoint()
+    a.transferir(30, b)
+    banco.cerrar()
+
+    restaurado = BankManager()
+    restaurado.abrir_journal(ruta, verificar=True)
+    # Un saldo tocado por fuera del libro queda en el próximo checkpoint
+    restaurado.buscar_cuenta_por_numero(b.numero).saldo_centavos += 1
+    restaurado.checkpoint()
+    restaurado.cerrar()
+    with pytest.raises(ValueError, match="no concilia"):
+        BankManager().abrir_journal(ruta, verificar=True)
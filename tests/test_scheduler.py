@@ -0,0 +1,141 @@
+import asyncio
+import json
+from datetime import datetime
+
+from bank.manager import BankManager
+from bank.reconcile import conciliar
+from bank.scheduler import Programador, ocurrencia
+from bank.server import BankServer
+
+INICIO = datetime(2024, 1, 31, 9).timestamp()
+
+
+def _banco():
+    banco = BankManager()
+    a = banco.crear_cuenta(banco.crear_cliente("A", "B", "1", "a", "1111"), "inquilino")
+    b = banco.crear_cuenta(banco.crear_cliente("C", "D", "2", "b", "2222"), "duenio")
+    return banco, a, b
+
+
+def test_ocurrencia_mensual_respeta_el_fin_de_mes():
+    fechas = [datetime.fromtimestamp(ocurrencia(INICIO, 0, 1, n)) for n in range(4)]
+    assert [(f.month, f.day, f.hour) for f in fechas] == [(1, 31, 9), (2, 29, 9), (3, 31, 9), (4, 30, 9)]
+    assert ocurrencia(INICIO, 7, 0, 2) == datetime(2024, 2, 14, 9).timestamp()
+
+
+def test_ejecuta_solo_las_vencidas_y_pone_al_dia_las_atrasadas():
+    banco, a, b = _banco()
+    a.depositar_centavos(100_000)
+    alquiler = banco.programar_transferencia(a, b, 30_000, INICIO, meses=1)
+    banco.programar_transferencia(a, b, 1, datetime(2030, 1, 1))
+
+    assert banco.ejecutar_ordenes(INICIO - 1).vencidas == 0
+    # Al 15 de marzo vencieron enero y febrero
+    resultado = banco.ejecutar_ordenes(datetime(2024, 3, 15))
+    assert resultado.ejecutadas == 2
+    assert (a.saldo_centavos, b.saldo_centavos) == (40_000, 60_000)
+    assert alquiler.hechas == 2 and datetime.fromtimestamp(alquiler.proxima).day == 31
+    assert banco.programador.proxima() == alquiler.proxima
+    assert "Transferencia a duenio" in [t.tipo for t in a.transacciones]
+    assert conciliar(banco).ok
+
+
+def test_tandas_y_ordenes_unicas():
+    banco, a, b = _banco()
+    a.depositar_centavos(1000)
+    for _ in range(10):
+        banco.programar_transferencia(a, b, 10, INICIO)
+    resultado = banco.programador.ejecutar(INICIO, tanda=4)
+    assert resultado.ejecutadas == 10 and resultado.tandas == 3
+    assert len(banco.programador) == 0 and b.saldo_centavos == 100
+
+
+def test_reintenta_por_saldo_insuficiente_y_despues_omite():
+    banco, a, b = _banco()
+    banco.programador.reintentos = 2
+    orden = banco.programar_transferencia(a, b, 500, INICIO, dias=1, veces=3)
+    assert banco.ejecutar_ordenes(INICIO).reintentos == 1
+    assert orden.intentos == 1 and orden.proxima == INICIO + banco.programador.espera
+
+    a.depositar_centavos(500)
+    assert banco.ejecutar_ordenes(orden.proxima).ejecutadas == 1
+    assert orden.hechas == 1 and orden.intentos == 0
+
+    ahora = orden.proxima
+    for _ in range(3):
+        resultado = banco.ejecutar_ordenes(ahora)
+        ahora += banco.programador.espera
+    assert resultado.omitidas == 1 and orden.hechas == 2 and orden.intentos == 0
+    assert orden.proxima == ocurrencia(INICIO, 1, 0, 2)
+
+
+def test_cancelar_y_cuenta_inexistente():
+    banco, a, b = _banco()
+    orden = banco.programar_transferencia(a, b, 10, INICIO)
+    assert banco.programador.cancelar(orden.id) and not banco.programador.cancelar(orden.id)
+    banco.programar_transferencia(a, 999, 10, INICIO)
+    assert banco.ejecutar_ordenes(INICIO).canceladas == 1
+    assert banco.programador.proxima() is None
+
+
+def test_el_programa_sobrevive_reinicios_y_checkpoints(tmp_path):
+    ruta = str(tmp_path / "banco.journal")
+    banco = BankManager()
+    banco.abrir_journal(ruta)
+    a = banco.crear_cuenta(banco.crear_cliente("A", "B", "1", "a", "1111"), "a")
+    b = banco.crear_cuenta(banco.crear_cliente("C", "D", "2", "b", "2222"), "b")
+    a.depositar_centavos(1000)
+    mensual = banco.programar_transferencia(a, b, 300, INICIO, meses=1)
+    fallida = banco.programar_transferencia(b, a, 5000, INICIO, dias=7)
+    banco.ejecutar_ordenes(INICIO)
+    banco.cerrar()
+
+    restaurado = BankManager()
+    restaurado.abrir_journal(ruta, verificar=True)
+    ordenes = restaurado.programador.ordenes
+    assert (ordenes[mensual.id].hechas, ordenes[mensual.id].proxima) == (1, mensual.proxima)
+    assert (ordenes[fallida.id].intentos, ordenes[fallida.id].proxima) == (1, fallida.proxima)
+    restaurado.checkpoint()
+    restaurado.ejecutar_ordenes(mensual.proxima)
+    restaurado.cerrar()
+
+    otro = BankManager()
+    otro.abrir_journal(ruta, verificar=True)
+    assert otro.programador.ordenes[mensual.id].hechas == 2
+    assert otro.buscar_cuenta_por_numero(b.numero).saldo_centavos == 600
+    assert otro.programar_transferencia(a.numero, b.numero, 1).id == fallida.id + 1
+    otro.cerrar()
+
+
+def test_guardar_y_cargar(tmp_path):
+    banco, a, b = _banco()
+    for k in range(100):
+        banco.programar_transferencia(a, b, k + 1, INICIO + k, dias=k % 3, veces=None if k % 2 else 5)
+    banco.programador.guardar(str(tmp_path / "ordenes"))
+    copia = Programador(banco)
+    copia.cargar(str(tmp_path / "ordenes"))
+    assert len(copia) == 100 and copia.proxima() == INICIO
+    original, cargada = banco.programador.ordenes[8], copia.ordenes[8]
+    assert [getattr(cargada, c) for c in original.__slots__] == [getattr(original, c) for c in original.__slots__]
+
+
+def test_el_servidor_dispara_las_vencidas():
+    async def escenario():
+        banco, a, b = _banco()
+        a.depositar_centavos(100)
+        servidor = BankServer(banco, intervalo_ordenes=0.01)
+        host, puerto = await servidor.iniciar("127.0.0.1", 0)
+        lector, escritor = await asyncio.open_connection(host, puerto)
+        escritor.write(json.dumps({"id": 1, "op": "programar_transferencia", "origen": a.numero,
+                                   "destino": b.numero, "centavos": 40}).encode() + b"\n")
+        respuesta = json.loads(await lector.readline())
+        for _ in range(100):
+            if b.saldo_centavos:
+                break
+            await asyncio.sleep(0.01)
+        escritor.close()
+        await servidor.detener()
+        return respuesta, b.saldo_centavos
+
+    respuesta, saldo = asyncio.run(escenario())
+    assert respuesta["ok"] and saldo == 40
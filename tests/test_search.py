@@ -0,0 +1,18 @@
+from bank.search import SortedIndex, normalizar
+
+
+def test_prefijos_y_altas_incrementales():
+    palabras = ["pera", "manzana", "perro", "mango"]
+    indice = SortedIndex(lambda i: palabras[i])
+    indice.actualizar(len(palabras))
+    assert [palabras[i] for i in indice.con_prefijo("pe")] == ["pera", "perro"]
+    assert [palabras[i] for i in indice.con_prefijo("man")] == ["mango", "manzana"]
+    palabras.append("pepino")
+    indice.actualizar(len(palabras))
+    assert [palabras[i] for i in indice.con_prefijo("pe")] == ["pepino", "pera", "perro"]
+    assert list(indice.con_prefijo("z")) == []
+    assert [palabras[i] for i in indice.con_prefijo("", desde=4)] == ["perro"]
+
+
+def test_normalizar():
+    assert normalizar("  ÁnGel ") == "ángel"
@@ -0,0 +1,98 @@
+import asyncio
+import json
+
+from bank.manager import BankManager
+from bank.server import BankServer
+
+
+async def _conversar(pedidos):
+    banco = BankManager()
+    servidor = BankServer(banco)
+    host, puerto = await servidor.iniciar("127.0.0.1", 0)
+    try:
+        lector, escritor = await asyncio.open_connection(host, puerto)
+        # Pipelining: se mandan todos los pedidos antes de leer respuestas
+        escritor.write(b"".join(json.dumps(p).encode() + b"\n" for p in pedidos))
+        await escritor.drain()
+        respuestas = [json.loads(await lector.readline()) for _ in pedidos]
+        escritor.close()
+        return banco, respuestas
+    finally:
+        await servidor.detener()
+
+
+def test_pedidos_en_pipeline():
+    pedidos = [
+        {"id": 1, "op": "crear_cliente", "nombre": "Ana", "apellido": "Lopez", "dni": "1",
+         "usuario": "ana", "pin": "1111"},
+        {"id": 2, "op": "crear_cuenta", "usuario": "ana", "alias": "ana.cuenta"},
+        {"id": 3, "op": "buscar_cliente", "usuario": "ana"},
+        {"id": 4, "op": "crear_cuenta", "usuario": "ana", "alias": "ahorro"},
+        {"id": 5, "op": "buscar_alias", "alias": "ana.cuenta"},
+        {"id": 6, "op": "retirar", "numero": 1, "monto": "5"},
+        {"id": 7, "op": "inexistente"},
+    ]
+    banco, respuestas = asyncio.run(_conversar(pedidos))
+    assert [r["id"] for r in respuestas] == [1, 2, 3, 4, 5, 6, 7]
+    numero = respuestas[1]["resultado"]
+    assert respuestas[2]["resultado"]["cuentas"] == [numero]
+    assert respuestas[4]["resultado"][0]["numero"] == numero
+    assert respuestas[5] == {"id": 6, "ok": False, "error": "Cuenta inexistente."}
+    assert respuestas[6]["ok"] is False
+    assert len(banco.buscar_cliente("ana").cuentas) == 2
+
+
+def test_movimientos_por_la_red():
+    async def escenario():
+        banco = BankManager()
+        a = banco.crear_cuenta(banco.crear_cliente("A", "B", "1", "a", "1111"), "a")
+        b = banco.crear_cuenta(banco.crear_cliente("C", "D", "2", "b", "2222"), "b")
+        servidor = BankServer(banco)
+        host, puerto = await servidor.iniciar("127.0.0.1", 0)
+        lector, escritor = await asyncio.open_connection(host, puerto)
+        pedidos = [
+            {"id": 1, "op": "depositar", "numero": a.numero, "monto": "100,50"},
+            {"id": 2, "op": "transferir", "origen": a.numero, "destino": b.numero, "centavos": 5050},
+            {"id": 3, "op": "retirar", "numero": b.numero, "monto": 100},
+            {"id": 4, "op": "buscar_cuenta", "numero": b.numero},
+        ]
+        for p in pedidos:
+            escritor.write(json.dumps(p).encode() + b"\n")
+        respuestas = [json.loads(await lector.readline()) for _ in pedidos]
+        escritor.close()
+        await servidor.detener()
+        return respuestas
+
+    respuestas = asyncio.run(escenario())
+    assert [r["ok"] for r in respuestas] == [True, True, False, True]
+    assert respuestas[0]["resultado"] == 10050
+    assert respuestas[2]["error"] == "Saldo insuficiente."
+    assert respuestas[3]["resultado"]["saldo_centavos"] == 5050
+
+
+def test_un_pedido_que_falla_no_detiene_al_aplicador():
+    async def escenario():
+        banco = BankManager()
+        cuenta = banco.crear_cuenta(banco.crear_cliente("A", "B", "1", "a", "1111"), "a")
+        servidor = BankServer(banco)
+
+        def romper(p):
+            raise RuntimeError("falla inesperada")
+
+        servidor.operaciones["romper"] = romper
+        host, puerto = await servidor.iniciar("127.0.0.1", 0)
+        lector, escritor = await asyncio.open_connection(host, puerto)
+        respuestas = []
+        for p in ({"id": 1, "op": "depositar", "numero": cuenta.numero, "centavos": 1e30},
+                  {"id": 2, "op": "romper"},
+                  {"id": 3, "op": "depositar", "numero": cuenta.numero, "centavos": 500}):
+            escritor.write(json.dumps(p).encode() + b"\n")
+            respuestas.append(json.loads(await asyncio.wait_for(lector.readline(), 5)))
+        escritor.close()
+        await servidor.detener()
+        return respuestas
+
+    respuestas = asyncio.run(escenario())
+    assert [r["ok"] for r in respuestas] == [False, False, True]
+    assert respuestas[1]["error"] == "Error interno: falla inesperada"
+    assert respuestas[2]["resultado"] == 500
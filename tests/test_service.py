@@ -0,0 +1,44 @@
+import pytest
+
+from bank.manager import BankManager
+from bank.service import BankService
+
+
+def test_operaciones_y_hooks_de_tiempo():
+    servicio = BankService(BankManager())
+    tiempos = []
+    servicio.agregar_hook(lambda op, seg, err: tiempos.append((op, seg >= 0, err)))
+    cliente = servicio.crear_cliente("Ana", "Lopez", "456", "anita", "2222")
+    origen = servicio.crear_cuenta(cliente, "ana")
+    destino = servicio.crear_cuenta(cliente, "ahorro")
+    servicio.depositar(origen, 1000)
+    servicio.transferir(origen, 300, destino)
+    with pytest.raises(ValueError):
+        servicio.retirar(origen, 10_000)
+    assert destino.saldo_centavos == 300 and origen.saldo_centavos == 700
+    assert servicio.ingresar("anita", "2222") is cliente
+    assert servicio.ingresar("anita", "0000") is None
+    with servicio.medir("render:prueba"):
+        pass
+    operaciones = [op for op, _, _ in tiempos]
+    assert operaciones == ["crear_cliente", "crear_cuenta", "crear_cuenta", "depositar", "transferir",
+                           "retirar", "buscar_cliente", "buscar_cliente", "render:prueba"]
+    assert isinstance(tiempos[5][2], ValueError)
+
+
+def test_adaptadores_se_resuelven_al_construir():
+    class BackendViejo:
+        def __init__(self):
+            self.llamadas = 0
+
+        def find_client(self, usuario):
+            self.llamadas += 1
+            return usuario
+
+    backend = BackendViejo()
+    servicio = BankService(backend)
+    assert servicio.buscar_cliente("jp") == "jp" and backend.llamadas == 1
+    with pytest.raises(NotImplementedError):
+        servicio.crear_cliente("N", "A", "1", "u", "1111")
+    with pytest.raises(NotImplementedError):
+        servicio.generar_pdf(None)
@@ -0,0 +1,107 @@
+import pytest
+from bank.ledger import TRANSFERENCIA_ENVIADA
+from bank.limits import DIA, Limite
+from bank.sharding import ShardedBank, _Shard
+from bank.stats import Estadisticas
+
+
+@pytest.fixture(scope="module")
+def banco():
+    with ShardedBank(n_shards=2) as banco:
+        yield banco
+
+
+def _cuentas_en_shards_distintos(banco, usuario):
+    banco.crear_cliente("N", "A", "1", usuario, "1111")
+    por_shard = {}
+    while len(por_shard) < 2:
+        numero = banco.crear_cuenta(usuario, "alias")
+        por_shard.setdefault(banco.shard_de(numero), numero)
+    return por_shard[0], por_shard[1]
+
+
+def test_transferencia_entre_shards(banco):
+    a, b = _cuentas_en_shards_distintos(banco, "u1")
+    banco.depositar(a, 1000)
+    banco.transferir(a, b, 400)
+    assert (banco.saldo(a), banco.saldo(b)) == (600, 400)
+    with pytest.raises(ValueError, match="Saldo insuficiente"):
+        banco.transferir(a, b, 10_000)
+    with pytest.raises(ValueError, match="Cuenta inexistente"):
+        banco.transferir(a, 1, 100)
+    # Los abortos liberan la retención del débito
+    assert (banco.saldo(a), banco.saldo(b)) == (600, 400)
+
+
+def test_lote_mixto_conserva_el_dinero(banco):
+    a, b = _cuentas_en_shards_distintos(banco, "u2")
+    total = banco.saldo_total_centavos()
+    resultados = banco.ejecutar([
+        ("depositar", a, 500),
+        ("depositar", b, 500),
+        ("transferir", a, b, 300),
+        ("transferir", b, a, 800),  # el crédito de la anterior aún no llegó
+        ("retirar", b, 100),
+        ("saldo", a),
+    ])
+    assert [ok for ok, _ in resultados] == [True, True, True, False, True, True]
+    assert resultados[3][1] == "Saldo insuficiente."
+    assert banco.saldo(a) == 200 and banco.saldo(b) == 700
+    assert banco.saldo_total_centavos() == total + 900
+
+
+def _shards_con_cuentas():
+    origen, destino = _Shard(), _Shard()
+    for shard, numero in ((origen, 10), (destino, 11)):
+        shard.op_cliente("N", "A", "1", "u", "1111")
+        shard.op_cuenta("u", f"c{numero}", numero)
+    origen.op_depositar(10, 1000)
+    return origen, destino
+
+
+def test_dos_fases_mantiene_estadisticas_y_limites():
+    origen, destino = _shards_con_cuentas()
+    a, b = origen.banco.buscar_cuenta_por_numero(10), destino.banco.buscar_cuenta_por_numero(11)
+    assert (a.estadisticas.cantidad(), b.estadisticas.cantidad()) == (1, 0)  # agregados ya armados
+    origen.op_limites([Limite.monto([TRANSFERENCIA_ENVIADA], DIA, 500)])
+    for tx, centavos in ((1, 300), (2, 100)):
+        origen.op_preparar_debito(tx, 10, centavos, 11)
+        destino.op_preparar_credito(tx, 11, centavos, 10)
+    origen.op_confirmar(1)
+    destino.op_confirmar(1)
+    origen.op_abortar(2)
+    destino.op_abortar(2)
+    for cuenta in (a, b):
+        assert cuenta.estadisticas.resumen() == Estadisticas.de_filas(cuenta.libro, cuenta.movimientos).resumen()
+    # El débito abortado devolvió lo consumido: quedan 200 de los 500
+    assert origen.ejecutar(("preparar_debito", 3, 10, 201, 11)) == (False, f"Límite excedido ({origen.banco.limites.limites[0]}).")
+    assert origen.ejecutar(("preparar_debito", 4, 10, 200, 11)) == (True, None)
+    assert a.saldo_centavos == 500
+
+
+def test_limites_en_todos_los_shards(banco):
+    a, b = _cuentas_en_shards_distintos(banco, "u3")
+    banco.depositar(a, 1000)
+    banco.configurar_limites([Limite.cantidad([TRANSFERENCIA_ENVIADA], DIA, 1)])
+    try:
+        banco.transferir(a, b, 100)
+        with pytest.raises(ValueError, match="Límite excedido"):
+            banco.transferir(a, b, 100)
+    finally:
+        banco.configurar_limites(None)
+    assert (banco.saldo(a), banco.saldo(b)) == (900, 100)
+
+
+def test_operaciones_invalidas_no_matan_al_trabajador(banco):
+    a, b = _cuentas_en_shards_distintos(banco, "u4")
+    banco.depositar(a, 1000)
+    resultados = banco.ejecutar([
+        ("depositar", a, "100"),
+        ("inexistente", a),
+        ("depositar", a),
+        ("transferir", a, b, "100"),
+        ("transferir", a, b, 300),
+    ])
+    assert [ok for ok, _ in resultados] == [False, False, False, False, True]
+    assert resultados[1] == (False, "Operación desconocida.")
+    assert (banco.saldo(a), banco.saldo(b)) == (700, 300)
@@ -0,0 +1,123 @@
+from bank.manager import BankManager
+from bank.snapshot import SnapshotView
+
+
+def _banco_de_prueba():
+    banco = BankManager()
+    for i in range(20):
+        cliente = banco.crear_cliente(f"Nombre{i}", f"Apellido{i}", str(1000 + i), f"user{i}", "1234")
+        cuenta = banco.crear_cuenta(cliente, "sueldo" if i % 2 else f"alias{i}")
+        cuenta.depositar(100 + i)
+    banco.buscar_cliente("user3").cuentas[0].transferir(50, banco.buscar_cliente("user4").cuentas[0])
+    return banco
+
+
+def test_snapshot_ida_y_vuelta(tmp_path):
+    original = _banco_de_prueba()
+    ruta = str(tmp_path / "banco.snap")
+    original.guardar_snapshot(ruta)
+
+    cargado = BankManager.cargar_snapshot(ruta)
+    assert len(cargado.clientes) == 20 and len(cargado.cuentas) == 20
+    assert cargado._clientes_snapshot == {}  # nada materializado todavía
+
+    cliente = cargado.buscar_cliente("user3")
+    assert cliente.validar_pin("1234") and cliente.dni == "1003"
+    assert list(cargado._clientes_snapshot) == [3]
+    cuenta = cliente.cuentas[0]
+    origen = original.buscar_cliente("user3").cuentas[0]
+    assert cuenta.numero == origen.numero and cuenta.saldo == origen.saldo
+    assert [str(t) for t in cuenta.transacciones] == [str(t) for t in origen.transacciones]
+    assert cargado.buscar_cuenta_por_numero(cuenta.numero) is cuenta
+    assert len(cargado.buscar_cuenta_por_alias("sueldo")) == 10
+    assert cargado.buscar_cliente("nadie") is None
+
+
+def test_el_snapshot_no_guarda_el_pin_en_claro(tmp_path):
+    ruta = str(tmp_path / "banco.snap")
+    _banco_de_prueba().guardar_snapshot(ruta)
+    vista = SnapshotView(ruta)
+    assert all(vista.cliente(i)[4].startswith("pbkdf2_sha256$") for i in range(vista.n_clientes))
+    vista.cerrar()
+
+
+def test_el_libro_se_copia_recien_en_la_primera_escritura(tmp_path):
+    ruta = str(tmp_path / "banco.snap")
+    original = _banco_de_prueba()
+    original.guardar_snapshot(ruta)
+    cargado = BankManager.cargar_snapshot(ruta)
+    assert isinstance(cargado.libro.montos, memoryview)
+    assert list(cargado.libro.montos) == list(original.libro.montos)
+
+    filas = len(cargado.libro)
+    cargado.buscar_cliente("user5").cuentas[0].depositar(7)
+    assert not isinstance(cargado.libro.montos, memoryview)
+    assert len(cargado.libro) == filas + 1
+    assert list(cargado.libro.montos[:filas]) == list(original.libro.montos)
+    assert cargado.libro.ids[-1] == original.libro.ids[-1] + 1
+
+
+def test_altas_despues_de_cargar(tmp_path):
+    ruta = str(tmp_path / "banco.snap")
+    _banco_de_prueba().guardar_snapshot(ruta)
+    cargado = BankManager.cargar_snapshot(ruta)
+
+    nuevo = cargado.crear_cliente("Nueva", "Persona", "9999", "nueva", "4321")
+    cuenta = cargado.crear_cuenta(nuevo, "sueldo")
+    assert cargado.clientes[-1] is nuevo and len(cargado.clientes) == 21
+    assert cuenta in cargado.buscar_cuenta_por_alias("sueldo")
+    assert cuenta.numero not in {c.numero for c in cargado.cuentas[:20]}
+
+
+def test_checkpoint_binario_con_journal(tmp_path):
+    ruta = str(tmp_path / "banco.journal")
+    banco = BankManager()
+    banco.abrir_journal(ruta)
+    cliente = banco.crear_cliente("Ana", "Lopez", "456", "anita", "2222")
+    cuenta = banco.crear_cuenta(cliente, "ana")
+    cuenta.depositar(80)
+    banco.checkpoint()
+    cuenta.retirar(30)
+    banco.cerrar()
+
+    restaurado = BankManager()
+    restaurado.abrir_journal(ruta)
+    assert restaurado.buscar_cuenta_por_numero(cuenta.numero).saldo == 50
+    restaurado.checkpoint()
+    assert restaurado._checkpoints(ruta) == [ruta + ".ckpt.2", ruta + ".ckpt.1"]
+    restaurado.cerrar()
+
+
+def test_listado_ordenado_desde_snapshot(tmp_path):
+    ruta = str(tmp_path / "banco.snap")
+    original = _banco_de_prueba()
+    original.guardar_snapshot(ruta)
+    cargado = BankManager.cargar_snapshot(ruta)
+    cargado.crear_cliente("Nueva", "Persona", "0999", "user10b", "4321")
+
+    pagina, cursor = cargado.pagina_clientes(5, "usuario")
+    assert [c.usuario for c in pagina] == ["user0", "user1", "user10", "user10b", "user11"]
+    pagina, _ = cargado.pagina_clientes(2, "dni", cursor=None)
+    assert [c.dni for c in pagina] == ["0999", "1000"]
+    # Ordenar no materializa clientes: solo los de las páginas (más uno de anticipo)
+    assert sorted(cargado._clientes_snapshot) == [0, 1, 10, 11, 12]
+
+
+def test_busqueda_desde_snapshot(tmp_path):
+    ruta = str(tmp_path / "banco.snap")
+    _banco_de_prueba().guardar_snapshot(ruta)
+    cargado = BankManager.cargar_snapshot(ruta)
+    cargado.crear_cliente("Nueva", "Persona", "9999", "user1x", "4321")
+    assert [c.usuario for c in cargado.buscar_clientes("USER1")][:3] == ["user1", "user10", "user11"]
+    assert [c.usuario for c in cargado.buscar_clientes("user1x")] == ["user1x"]
+    assert len(cargado.buscar_cuentas("sueldo")) == 10
+
+
+def test_sugerir_destinos_sin_materializar(tmp_path):
+    ruta = str(tmp_path / "banco.snap")
+    _banco_de_prueba().guardar_snapshot(ruta)
+    cargado = BankManager.cargar_snapshot(ruta)
+    sugerencias = cargado.sugerir_destinos("sueldo", limite=3)
+    assert [d.titular for d in sugerencias] == ["Nombre1 Apellido1", "Nombre3 Apellido3", "Nombre5 Apellido5"]
+    assert cargado._clientes_snapshot == {}
+    assert cargado.buscar_cuenta_por_numero(sugerencias[0].numero).alias == "sueldo"
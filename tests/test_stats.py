@@ -0,0 +1,69 @@
+from datetime import date, datetime
+
+from bank.ledger import DEPOSITO, RETIRO, TRANSFERENCIA_ENVIADA, TRANSFERENCIA_RECIBIDA
+from bank.manager import BankManager
+from bank.stats import Estadisticas
+
+
+def _ts(dia, hora=12):
+    return datetime(2024, 3, dia, hora).timestamp()
+
+
+def test_totales_minimos_maximos_y_dias():
+    e = Estadisticas()
+    e.registrar(DEPOSITO, 500, _ts(1))
+    e.registrar(DEPOSITO, 200, _ts(1, 23))
+    e.registrar(RETIRO, 100, _ts(2))
+    e.registrar_lote(TRANSFERENCIA_ENVIADA, [50, 70], _ts(31))
+
+    assert (e.cantidad(DEPOSITO), e.total(DEPOSITO)) == (2, 700)
+    assert (e.minimo(DEPOSITO), e.maximo(DEPOSITO)) == (200, 500)
+    assert (e.minimo(TRANSFERENCIA_ENVIADA), e.maximo(TRANSFERENCIA_ENVIADA)) == (50, 70)
+    assert e.cantidad() == 5 and e.neto == 700 - 100 - 120
+    assert [(dia, balde.cantidad()) for dia, balde in e.por_dia()] == \
+        [(date(2024, 3, 1), 2), (date(2024, 3, 2), 1), (date(2024, 3, 31), 2)]
+    assert e.entre(date(2024, 3, 1), date(2024, 3, 2)).total(DEPOSITO) == 700
+    assert e.entre(date(2024, 3, 1), date(2024, 4, 1)).cantidad() == 5
+    assert e.resumen()["Retiros"] == {"cantidad": 1, "total": 100, "minimo": 100, "maximo": 100}
+    assert e.lineas()[0] == "Depósitos: 2 por $7.00 (mín. $2.00, máx. $5.00)"
+
+
+def _recalculadas(cuenta):
+    return Estadisticas.de_filas(cuenta.libro, cuenta.movimientos)
+
+
+def test_cuentas_y_banco_se_actualizan_con_cada_movimiento():
+    banco = BankManager()
+    c = banco.crear_cliente("A", "B", "1", "u1", "1111")
+    a1, a2 = banco.crear_cuenta(c, "alias1"), banco.crear_cuenta(c, "alias2")
+    a1.depositar(100)
+    assert a1.estadisticas.total(DEPOSITO) == 10000  # se arma desde el historial
+    total = banco.estadisticas
+
+    a1.retirar(10)
+    a1.transferir(20, a2)
+    assert a2.estadisticas.cantidad(TRANSFERENCIA_RECIBIDA) == 1
+    banco.aplicar_lote([(a1.numero, a2.numero, 500), (a2.numero, a1.numero, 300)])
+
+    for cuenta in (a1, a2):
+        assert cuenta.estadisticas.resumen() == _recalculadas(cuenta).resumen()
+        assert cuenta.estadisticas.neto == cuenta.saldo_centavos
+    assert banco.estadisticas is total
+    assert total.resumen() == Estadisticas.del_libro(banco.libro).resumen()
+    assert total.neto == banco.saldo_total_centavos()
+
+
+def test_replay_conserva_las_fechas_de_los_agregados(tmp_path):
+    ruta = str(tmp_path / "banco.journal")
+    banco = BankManager()
+    banco.abrir_journal(ruta)
+    cuenta = banco.crear_cuenta(banco.crear_cliente("A", "B", "1", "u1", "1111"), "alias1")
+    cuenta.depositar_centavos(1000, fecha=_ts(5))
+    cuenta.retirar_centavos(400, fecha=_ts(6))
+    banco.cerrar()
+
+    restaurado = BankManager()
+    restaurado.abrir_journal(ruta)
+    dias = restaurado.estadisticas.por_dia()
+    assert [(dia, balde.total()) for dia, balde in dias] == [(date(2024, 3, 5), 1000), (date(2024, 3, 6), 400)]
+    restaurado.cerrar()